@@ -0,0 +1,197 @@
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from typing import Any, Callable
+
+from autopack.catalog import clear_catalog_cache
+from autopack.get_pack import get_all_installed_packs, get_all_pack_info
+from autopack.pack_response import PackResponse
+from autopack.selection import functions_bulleted_list, parse_selection_response, select_packs_prompt
+from autopack.utils import estimate_tokens, write_metadata_file
+
+CATEGORIES = [
+    "Web",
+    "Files",
+    "Programming",
+    "System",
+    "Communication",
+    "Text",
+    "Math",
+    "Finance",
+    "Weather",
+    "Productivity",
+    "Images",
+    "Audio",
+    "Databases",
+    "Cloud",
+    "Security",
+    "Knowledge",
+    "News",
+    "Travel",
+    "Shopping",
+    "Social Media",
+]
+VERBS = ["get", "search", "create", "delete", "update", "list", "convert", "analyze", "summarize", "send", "fetch"]
+NOUNS = ["file", "page", "email", "event", "image", "record", "report", "price", "forecast", "message", "repository"]
+ARGS = [
+    ("query", "string", "The search terms to look for"),
+    ("url", "string", "The URL of the resource"),
+    ("path", "string", "The path of the file, relative to the workspace"),
+    ("limit", "integer", "The maximum number of results to return"),
+    ("recursive", "boolean", "Whether to include nested results"),
+    ("content", "string", "The text content to use"),
+    ("language", "string", "The language code, e.g. 'en' or 'fr'"),
+]
+
+BENCHMARK_REPO_URL = "https://github.com/AutoPackAI/benchmark.git"
+
+STUB_SELECTION_SIZE = 5
+
+
+def generate_catalog(size: int, seed: int = 0) -> list[PackResponse]:
+    """Generate a deterministic synthetic catalog of `size` packs with realistic names, args and categories"""
+    rng = random.Random(seed)
+    catalog = []
+    for index in range(size):
+        verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+        name = f"{verb}_{noun}_{index}"
+        args = rng.sample(ARGS, rng.randint(0, 3))
+        catalog.append(
+            PackResponse(
+                pack_id=f"autopack/benchmark/{name}",
+                package_path="benchmark_packs",
+                class_name=f"BenchmarkPack{index}",
+                repo_url=BENCHMARK_REPO_URL,
+                name=name,
+                description=f"{verb.title()} the {noun} matching the given arguments using a {rng.choice(NOUNS)} index",
+                run_args={arg: {"name": arg, "type": arg_type, "description": text} for arg, arg_type, text in args},
+                categories=rng.sample(CATEGORIES, rng.randint(1, 2)),
+            )
+        )
+
+    return catalog
+
+
+def stub_llm(prompt: str) -> str:
+    """A deterministic stand-in for an LLM which selects the first few functions listed in the prompt"""
+    return ", ".join(re.findall(r"^- (\w+)\(", prompt, flags=re.MULTILINE)[:STUB_SELECTION_SIZE])
+
+
+def time_call(function: Callable[[], Any], repeat: int, setup: Callable[[], Any] = None) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return {"min": min(timings), "mean": statistics.mean(timings)}
+
+
+def write_benchmark_packs(autopack_dir: str, catalog: list[PackResponse], module_name: str):
+    """Write a module defining a Pack class for each pack in the catalog, plus the metadata to load them"""
+    lines = ["from autopack import Pack", ""]
+    for pack in catalog:
+        lines.extend(
+            [
+                f"class {pack.class_name}(Pack):",
+                f"    name = {pack.name!r}",
+                f"    description = {pack.description!r}",
+                f"    categories = {pack.categories!r}",
+                "",
+                "    def _run(self, **kwargs):",
+                "        return ''",
+                "",
+                "    async def _arun(self, **kwargs):",
+                "        return ''",
+                "",
+            ]
+        )
+
+    package_dir = os.path.join(autopack_dir, "benchmark")
+    os.makedirs(package_dir, exist_ok=True)
+    with open(os.path.join(package_dir, f"{module_name}.py"), "w") as f:
+        f.write("\n".join(lines))
+
+    metadata = {}
+    for pack in catalog:
+        metadata[pack.pack_id] = replace(pack, package_path=module_name).__dict__
+    write_metadata_file(metadata)
+
+
+def benchmark_selection_size(size: int, installed_size: int, repeat: int) -> dict[str, Any]:
+    catalog = generate_catalog(size)
+    installed = catalog[: min(size, installed_size)]
+    module_name = f"benchmark_packs_{size}"
+
+    with open(os.path.join(os.environ["AUTOPACK_DIR"], "pack_info_cache.json"), "w") as f:
+        json.dump([pack.__dict__ for pack in catalog], f)
+    write_benchmark_packs(os.environ["AUTOPACK_DIR"], installed, module_name)
+
+    prompt = select_packs_prompt(catalog, "Find the weather forecast and email it to me")
+    response = stub_llm(select_packs_prompt(installed, "Find the weather forecast and email it to me"))
+
+    timings = {
+        "functions_bulleted_list (cold)": time_call(
+            lambda: functions_bulleted_list(catalog), repeat, setup=clear_catalog_cache
+        ),
+        "functions_bulleted_list (warm)": time_call(lambda: functions_bulleted_list(catalog), repeat),
+        "select_packs_prompt (warm)": time_call(lambda: select_packs_prompt(catalog, "Find the weather"), repeat),
+        "get_all_pack_info (cache load)": time_call(get_all_pack_info, repeat),
+        "get_all_installed_packs": time_call(get_all_installed_packs, repeat),
+        "parse_selection_response": time_call(lambda: parse_selection_response(response), repeat),
+    }
+
+    sys.modules.pop(module_name, None)
+
+    return {
+        "size": size,
+        "installed": len(installed),
+        "prompt_characters": len(prompt),
+        "prompt_tokens": estimate_tokens(prompt),
+        "timings": timings,
+    }
+
+
+def benchmark_selection(sizes: list[int], installed_size: int = 200, repeat: int = 3) -> list[dict[str, Any]]:
+    """
+    Benchmark the selection path against synthetic catalogs of the given sizes, using a deterministic stub LLM.
+    Everything runs in a temporary .autopack directory, so no network access or installed packs are needed.
+
+    Args:
+        sizes (list[int]): The catalog sizes to benchmark
+        installed_size (int): How many packs of each catalog are installed (loading installed packs is much slower)
+        repeat (int): The number of times each measurement is repeated
+
+    Returns:
+        list[dict[str, Any]]: The prompt size and timings (in seconds) for each catalog size
+    """
+    previous_autopack_dir = os.environ.get("AUTOPACK_DIR")
+    try:
+        results = []
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as autopack_dir:
+                os.environ["AUTOPACK_DIR"] = autopack_dir
+                results.append(benchmark_selection_size(size, installed_size, repeat))
+        return results
+    finally:
+        if previous_autopack_dir is None:
+            os.environ.pop("AUTOPACK_DIR", None)
+        else:
+            os.environ["AUTOPACK_DIR"] = previous_autopack_dir
+
+
+def print_benchmark(results: list[dict[str, Any]]):
+    for result in results:
+        print("--------")
+        print(f"Catalog size:   {result['size']} ({result['installed']} installed)")
+        print(f"Prompt size:    {result['prompt_characters']} characters, ~{result['prompt_tokens']} tokens")
+        for name, timing in result["timings"].items():
+            print(f"{name + ':':<35} min {timing['min'] * 1000:10.2f}ms  mean {timing['mean'] * 1000:10.2f}ms")
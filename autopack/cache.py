@@ -0,0 +1,245 @@
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from json import JSONDecodeError
+from threading import RLock
+from typing import Any, Hashable, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where JSONFileStore writes aren't locked
+    fcntl = None
+
+
+class CacheStore(ABC):
+    """A persistent backing store for an LRUCache. Keys are strings and values must be JSON-serializable."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[tuple[Any, Optional[float]]]:
+        """Return the stored (value, expiry timestamp) pair, or None if the key isn't stored"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, expires_at: Optional[float]):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class JSONFileStore(CacheStore):
+    """Stores cache entries in a single JSON file. Meant for small caches, as every write rewrites the file. Writes
+    re-read the file under a file lock (on POSIX systems), so processes sharing the file keep each other's entries."""
+
+    def __init__(self, path: str, max_size: Optional[int] = 1024):
+        self.path = path
+        self.max_size = max_size
+        self._entries: Optional[dict[str, list[Any]]] = None
+        # The modification time and size of the file when it was last read or written
+        self._file_version: Optional[tuple[int, int]] = None
+        self._lock = RLock()
+
+    def _current_version(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, reread: bool = False) -> dict[str, list[Any]]:
+        """Return the entries, reading the file again if it changed since (or if `reread` is set)"""
+        version = self._current_version()
+        if self._entries is None or reread or version != self._file_version:
+            self._entries = {}
+            if version is not None:
+                with open(self.path, "r") as f:
+                    try:
+                        self._entries = json.load(f)
+                    except JSONDecodeError:
+                        pass
+            self._file_version = version
+        return self._entries
+
+    def _write(self):
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(temporary_path, self.path)
+        self._file_version = self._current_version()
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key: str) -> Optional[tuple[Any, Optional[float]]]:
+        with self._lock:
+            entry = self._load().get(key)
+            return (entry[0], entry[1]) if entry else None
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock, self._file_lock():
+            entries = self._load(reread=True)
+            entries.pop(key, None)
+            entries[key] = [value, expires_at]
+            if self.max_size is not None:
+                for stale_key in list(entries.keys())[: max(0, len(entries) - self.max_size)]:
+                    del entries[stale_key]
+            self._write()
+
+    def delete(self, key: str):
+        with self._lock, self._file_lock():
+            if self._load(reread=True).pop(key, None) is not None:
+                self._write()
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            self._entries = {}
+            self._write()
+
+
+class SQLiteStore(CacheStore):
+    """Stores cache entries in a SQLite database. Writes only touch the changed row, so it suits larger caches. Once
+    there are more than `max_size` entries, the least recently written ones are removed."""
+
+    def __init__(self, path: str, max_size: Optional[int] = 10000):
+        self.path = path
+        self.max_size = max_size
+        self._lock = RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires_at REAL, written_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_written_at ON entries (written_at)")
+
+    def get(self, key: str) -> Optional[tuple[Any, Optional[float]]]:
+        with self._lock:
+            row = self._connection.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, json.dumps(value), expires_at, time.time())
+            )
+            if self.max_size is None:
+                return
+
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+            if count > self.max_size:
+                # The oldest entries are found through the written_at index, without sorting the table
+                self._connection.execute(
+                    "DELETE FROM entries WHERE rowid IN "
+                    "(SELECT rowid FROM entries ORDER BY written_at, rowid LIMIT ?)",
+                    (count - self.max_size,),
+                )
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class LRUCache:
+    """
+    A small thread-safe least-recently-used cache with hit/miss counters. Once `max_size` entries are stored the least
+    recently used one is evicted, and entries older than `ttl` seconds are treated as missing. If a `store` is given,
+    entries are also written to it and looked up there when they're not in memory.
+    """
+
+    def __init__(self, max_size: Optional[int] = 128, ttl: Optional[float] = None, store: Optional[CacheStore] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _lookup(self, key: Hashable) -> Optional[tuple[Any, Optional[float]]]:
+        entry = self._entries.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self._insert(key, entry)
+
+        if entry is not None and entry[1] is not None and entry[1] < time.time():
+            self._entries.pop(key, None)
+            if self.store is not None:
+                self.store.delete(key)
+            return None
+
+        return entry
+
+    def _insert(self, key: Hashable, entry: tuple[Any, Optional[float]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            expires_at = time.time() + self.ttl if self.ttl is not None else None
+            self._insert(key, (value, expires_at))
+            if self.store is not None:
+                self.store.set(key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.store is not None:
+                self.store.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
@@ -0,0 +1,174 @@
+import bisect
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from autopack.pack import Pack
+
+# Upper bounds (in seconds) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class PackCallbackHandler:
+    """
+    Base class for hooks into Pack execution. Override the methods you're interested in and add the handler to
+    `PackConfig.callbacks` (every Pack using that config) or to a Pack's own `callbacks`.
+
+    `kwargs` are the arguments the pack is executed with. `duration` is measured in seconds.
+    """
+
+    def before_run(self, pack: "Pack", kwargs: dict[str, Any]):
+        """Called after the arguments are validated, just before the pack is executed"""
+        pass
+
+    def after_run(self, pack: "Pack", kwargs: dict[str, Any], result: str, duration: float):
+        """Called after the pack has executed successfully"""
+        pass
+
+    def after_stream(self, pack: "Pack", kwargs: dict[str, Any], output_length: int, duration: float):
+        """Called instead of `after_run` after the pack has streamed its output successfully (see `Pack.stream`),
+        which isn't held on to, so only its length in characters is passed"""
+        pass
+
+    def on_error(self, pack: "Pack", kwargs: dict[str, Any], error: Exception, duration: float):
+        """Called if the pack raised an exception, or with a pydantic ValidationError if the arguments were invalid
+        (in which case the pack never ran and `before_run` wasn't called)"""
+        pass
+
+    def on_llm_call(self, pack: "Pack", prompt: str, response: str, duration: float):
+        """Called after the pack called its LLM through `call_llm` or `acall_llm`"""
+        pass
+
+
+class PackMetrics:
+    """The metrics collected for a single pack"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.calls = 0
+        self.errors = 0
+        self.validation_failures = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.output_characters = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(buckets) + 1)
+
+    def observe_latency(self, buckets: tuple[float, ...], duration: float):
+        self.latency_sum += duration
+        self.latency_buckets[bisect.bisect_left(buckets, duration)] += 1
+
+    def to_dict(self, buckets: tuple[float, ...]) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "validation_failures": self.validation_failures,
+            "latency_seconds": {
+                "sum": self.latency_sum,
+                "count": sum(self.latency_buckets),
+                # Counts per bucket upper bound (not cumulative), keyed by string so the dict can be serialized as JSON
+                "buckets": dict(zip([*map(str, buckets), "+Inf"], self.latency_buckets)),
+            },
+            "llm_calls": self.llm_calls,
+            "llm_seconds": self.llm_seconds,
+            "output_characters": self.output_characters,
+        }
+
+
+class MetricsCollector(PackCallbackHandler):
+    """
+    Collects per-pack call counts, latency histograms, errors, validation failures, LLM calls and output sizes.
+    Latencies include both successful and failed runs. Thread-safe, so one collector can be shared by all packs.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._metrics: dict[str, PackMetrics] = {}
+        self._lock = Lock()
+
+    def _pack_metrics(self, pack: "Pack") -> PackMetrics:
+        if pack.name not in self._metrics:
+            self._metrics[pack.name] = PackMetrics(self.buckets)
+        return self._metrics[pack.name]
+
+    def after_run(self, pack: "Pack", kwargs: dict[str, Any], result: str, duration: float):
+        self.after_stream(pack, kwargs, len(result) if isinstance(result, str) else 0, duration)
+
+    def after_stream(self, pack: "Pack", kwargs: dict[str, Any], output_length: int, duration: float):
+        with self._lock:
+            metrics = self._pack_metrics(pack)
+            metrics.calls += 1
+            metrics.observe_latency(self.buckets, duration)
+            metrics.output_characters += output_length
+
+    def on_error(self, pack: "Pack", kwargs: dict[str, Any], error: Exception, duration: float):
+        from pydantic import ValidationError
+
+        with self._lock:
+            metrics = self._pack_metrics(pack)
+            if isinstance(error, ValidationError):
+                metrics.validation_failures += 1
+                return
+
+            metrics.calls += 1
+            metrics.errors += 1
+            metrics.observe_latency(self.buckets, duration)
+
+    def on_llm_call(self, pack: "Pack", prompt: str, response: str, duration: float):
+        with self._lock:
+            metrics = self._pack_metrics(pack)
+            metrics.llm_calls += 1
+            metrics.llm_seconds += duration
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def to_dict(self, pack_name: Optional[str] = None) -> dict[str, Any]:
+        """Return the metrics of every pack by pack name, or only those of `pack_name`"""
+        with self._lock:
+            if pack_name is not None:
+                metrics = self._metrics.get(pack_name) or PackMetrics(self.buckets)
+                return metrics.to_dict(self.buckets)
+            return {name: metrics.to_dict(self.buckets) for name, metrics in self._metrics.items()}
+
+    def to_prometheus(self, prefix: str = "autopack") -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics_by_pack = sorted(self._metrics.items())
+            counters = [
+                ("pack_calls_total", "Number of pack runs", lambda m: m.calls),
+                ("pack_errors_total", "Number of pack runs that raised an exception", lambda m: m.errors),
+                (
+                    "pack_validation_failures_total",
+                    "Number of calls with invalid arguments",
+                    lambda m: m.validation_failures,
+                ),
+                ("pack_llm_calls_total", "Number of LLM calls made by packs", lambda m: m.llm_calls),
+                ("pack_llm_seconds_total", "Time packs spent waiting on LLM calls", lambda m: m.llm_seconds),
+                ("pack_output_characters_total", "Total length of pack results", lambda m: m.output_characters),
+            ]
+
+            lines = []
+            for name, help_text, value in counters:
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for pack_name, metrics in metrics_by_pack:
+                    lines.append(f'{prefix}_{name}{{pack="{_escape_label(pack_name)}"}} {value(metrics)}')
+
+            histogram = f"{prefix}_pack_duration_seconds"
+            lines.append(f"# HELP {histogram} Pack run latency")
+            lines.append(f"# TYPE {histogram} histogram")
+            for pack_name, metrics in metrics_by_pack:
+                label = _escape_label(pack_name)
+                cumulative = 0
+                for bound, count in zip([*self.buckets, "+Inf"], metrics.latency_buckets):
+                    cumulative += count
+                    lines.append(f'{histogram}_bucket{{pack="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{histogram}_sum{{pack="{label}"}} {metrics.latency_sum}')
+                lines.append(f'{histogram}_count{{pack="{label}"}} {cumulative}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
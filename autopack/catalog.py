@@ -0,0 +1,135 @@
+import hashlib
+from typing import TYPE_CHECKING, Any, Union
+
+from autopack.cache import LRUCache
+from autopack.pack_response import PackResponse
+from autopack.utils import run_args_from_args_schema
+
+if TYPE_CHECKING:
+    from autopack.pack import Pack
+
+# The rendered catalog rarely changes between selections, so rendering is memoized on the content of the packs.
+_line_cache = LRUCache(max_size=50_000)
+_section_cache = LRUCache(max_size=1_000)
+_catalog_cache = LRUCache(max_size=32)
+
+
+def pack_run_args(pack: Union[PackResponse, type["Pack"]]) -> dict[str, dict[str, Any]]:
+    """Return the run args of a PackResponse or Pack class as a dict keyed by argument name"""
+    if isinstance(pack, PackResponse):
+        args = pack.run_args or {}
+    elif getattr(pack, "args_schema", None):
+        args = run_args_from_args_schema(pack.args_schema)
+    else:
+        args = {}
+
+    if isinstance(args, list):
+        # Some metadata stores run args as a list of arg dicts
+        return {arg.get("name"): arg for arg in args}
+    return args
+
+
+def pack_fingerprint(pack: Union[PackResponse, type["Pack"]]) -> str:
+    """A string which changes whenever anything rendered in the catalog for this pack changes"""
+    if isinstance(pack, PackResponse):
+        return repr((pack.pack_id, pack.name, pack.description, pack.categories, pack.run_args))
+
+    # Classes created at runtime (e.g. remote packs) can share a module and qualname, so the args are included too
+    return repr((pack.__module__, pack.__qualname__, pack.name, pack.description, pack.categories, pack_run_args(pack)))
+
+
+def catalog_hash(packs: list[Union[PackResponse, type["Pack"]]]) -> str:
+    """A content hash of an (ordered) pack pool"""
+    digest = hashlib.sha256()
+    for pack in packs:
+        digest.update(pack_fingerprint(pack).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def group_by_category(
+    packs: list[Union[PackResponse, type["Pack"]]]
+) -> dict[str, list[Union[PackResponse, type["Pack"]]]]:
+    """Group packs by category, in order of first appearance. Packs without categories are left out."""
+    grouped_packs: dict[str, list[Union[PackResponse, type["Pack"]]]] = {}
+    for pack in packs:
+        if not pack.categories:
+            continue
+
+        for category in pack.categories:
+            if category not in grouped_packs:
+                grouped_packs[category] = []
+            grouped_packs[category].append(pack)
+
+    return grouped_packs
+
+
+def render_pack_line(pack: Union[PackResponse, type["Pack"]]) -> str:
+    fingerprint = pack_fingerprint(pack)
+    line = _line_cache.get(fingerprint)
+    if line is not None:
+        return line
+
+    args = pack_run_args(pack)
+    args_signature = ", ".join([f"{name}: {arg.get('type')}" for name, arg in args.items()])
+    args_descriptions = (
+        "; ".join([f"{name} ({arg.get('type')}): {arg.get('description')}" for name, arg in args.items()]) or "None."
+    )
+    line = f"- {pack.name}({args_signature}): {pack.description} | Arguments: {args_descriptions}"
+
+    _line_cache.set(fingerprint, line)
+    return line
+
+
+def render_category_section(category: str, packs: list[Union[PackResponse, type["Pack"]]]) -> str:
+    sorted_by_name = sorted(packs, key=lambda p: p.name)
+    key = (category, catalog_hash(sorted_by_name))
+    section = _section_cache.get(key)
+    if section is not None:
+        return section
+
+    section = "\n".join([f"\n## {category}"] + [render_pack_line(pack) for pack in sorted_by_name])
+
+    _section_cache.set(key, section)
+    return section
+
+
+def category_sections(packs: list[Union[PackResponse, type["Pack"]]]) -> dict[str, str]:
+    """Return the rendered catalog section of each category, in catalog order"""
+    return {
+        category: render_category_section(category, members) for category, members in group_by_category(packs).items()
+    }
+
+
+def render_category_summaries(packs: list[Union[PackResponse, type["Pack"]]], max_examples: int = 5) -> str:
+    """Render a short bulleted summary of each category: its name, size and a few of its functions"""
+    lines = []
+    for category, members in group_by_category(packs).items():
+        names = sorted(pack.name for pack in members)
+        examples = ", ".join(names[:max_examples]) + (", ..." if len(names) > max_examples else "")
+        lines.append(f"- {category} ({len(names)} functions, e.g. {examples})")
+
+    return "\n".join(lines)
+
+
+def render_catalog(packs: list[Union[PackResponse, type["Pack"]]]) -> str:
+    """
+    Render the packs as a bulleted list of functions grouped by category, for use in selection prompts.
+
+    The result is cached on a content hash of the pack pool, so repeated calls with an unchanged pool only pay for
+    hashing.
+    """
+    key = catalog_hash(packs)
+    catalog = _catalog_cache.get(key)
+    if catalog is not None:
+        return catalog
+
+    catalog = "\n".join(category_sections(packs).values())
+
+    _catalog_cache.set(key, catalog)
+    return catalog
+
+
+def clear_catalog_cache():
+    for cache in (_line_cache, _section_cache, _catalog_cache):
+        cache.clear()
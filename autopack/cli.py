@@ -1,6 +1,6 @@
 import argparse
 
-from autopack.installation import install_pack
+from autopack.installation import compile_installed_packs, install_pack
 from autopack.search import print_search
 
 
@@ -14,6 +14,27 @@ def parse_args():
     search_parser = subparsers.add_parser("search", help="Search for packs")
     search_parser.add_argument("query", help="The search query")
 
+    compile_parser = subparsers.add_parser("compile", help="Compile the bytecode of all installed packs")
+    compile_parser.add_argument(
+        "--unchecked-hash",
+        help="Don't validate the bytecode against the source on import. Only for immutable installations.",
+        action="store_true",
+    )
+
+    bench_parser = subparsers.add_parser("bench", help="Run performance benchmarks")
+    bench_parser.add_argument("target", choices=["selection"], help="What to benchmark")
+    bench_parser.add_argument(
+        "--sizes",
+        help="Comma-separated synthetic catalog sizes",
+        default="100,1000,10000,50000",
+    )
+    bench_parser.add_argument("--installed", help="Number of installed packs per catalog", type=int, default=200)
+    bench_parser.add_argument("--repeat", help="Number of times to repeat each measurement", type=int, default=3)
+
+    serve_parser = subparsers.add_parser("serve", help="Keep the installed packs loaded and run them for clients")
+    serve_parser.add_argument("--host", help="The interface to listen on", default="127.0.0.1")
+    serve_parser.add_argument("--port", help="The port to listen on", type=int, default=8765)
+
     parser.add_argument(
         "-f",
         "--force",
@@ -37,6 +58,23 @@ def main():
     if args.command == "search":
         print_search(args.query)
 
+    if args.command == "bench":
+        from autopack.benchmark import benchmark_selection, print_benchmark
+
+        sizes = [int(size) for size in args.sizes.split(",")]
+        print_benchmark(benchmark_selection(sizes, installed_size=args.installed, repeat=args.repeat))
+
+    if args.command == "serve":
+        from autopack.server import serve
+
+        serve(host=args.host, port=args.port)
+
+    if args.command == "compile":
+        if compile_installed_packs(unchecked_hash=args.unchecked_hash, quiet=False):
+            print("Compilation completed")
+        else:
+            print("Compilation failed")
+
 
 if __name__ == "__main__":
     main()
@@ -20,3 +20,7 @@ class AutoPackLoadError(AutoPackError):
 
 class AutoPackInstallationError(AutoPackError):
     pass
+
+
+class AutoPackTimeoutError(AutoPackError, TimeoutError):
+    pass
@@ -19,7 +19,7 @@ class FileManager(ABC):
         pass
 
     @abstractmethod
-    def aread_file(self, file_path: str) -> str:
+    async def aread_file(self, file_path: str) -> str:
         pass
 
     @abstractmethod
@@ -35,7 +35,7 @@ class FileManager(ABC):
         pass
 
     @abstractmethod
-    def adelete_file(self, file_path: str) -> str:
+    async def adelete_file(self, file_path: str) -> str:
         pass
 
     @abstractmethod
@@ -43,5 +43,5 @@ class FileManager(ABC):
         pass
 
     @abstractmethod
-    def alist_files(self, dir_path: str) -> str:
+    async def alist_files(self, dir_path: str) -> str:
         pass
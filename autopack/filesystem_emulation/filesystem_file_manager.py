@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 import aiofiles
 
@@ -12,7 +13,7 @@ class FileSystemManager(FileManager):
     This class provides unrestricted file operations on the local file system.
     """
 
-    def __init__(self, config: PackConfig = PackConfig.global_config()):
+    def __init__(self, config: Optional[PackConfig] = None):
         super().__init__(config)
 
     def read_file(self, file_path: str) -> str:
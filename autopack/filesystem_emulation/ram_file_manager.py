@@ -1,16 +1,229 @@
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Any, Iterator, Mapping, Optional
+
 from autopack.filesystem_emulation.file_manager import FileManager
 from autopack.pack_config import PackConfig
 
 
+def normalize_path(path: str) -> str:
+    """Normalize a path, e.g. `a/./b//c` to `a/b/c`. Unlike `posixpath.normpath`, a leading `//` becomes `/`."""
+    normalized = posixpath.normpath(path)
+    return "/" + normalized.lstrip("/") if normalized.startswith("/") else normalized
+
+
+def split_path(path: str) -> tuple[str, ...]:
+    """Split a path into its normalized components, e.g. `/a/./b//c` into `("a", "b", "c")`"""
+    return tuple(part for part in normalize_path(path).split("/") if part and part != ".")
+
+
+class _Directory:
+    """A node of the directory tree, holding the paths of its files and its subdirectories by name"""
+
+    __slots__ = ("files", "directories")
+
+    def __init__(self):
+        self.files: dict[str, str] = {}
+        self.directories: dict[str, "_Directory"] = {}
+
+    def walk(self) -> Iterator[str]:
+        yield from self.files.values()
+        for directory in self.directories.values():
+            yield from directory.walk()
+
+
+class _StoredFile:
+    """
+    A file of a RAMFileManager, in one of three states: its `text` in memory, its UTF-8 `data` in memory (compressed if
+    that makes it smaller), or its data spilled to `spill_path`
+    """
+
+    __slots__ = ("size", "text", "data", "compressed", "spill_path")
+
+    def __init__(self, text: str, size: int):
+        self.size = size
+        self.text: Optional[str] = text
+        self.data: Optional[bytes] = None
+        self.compressed = False
+        self.spill_path: Optional[str] = None
+
+    def content(self) -> str:
+        data = self.data
+        if data is None:
+            with open(self.spill_path, "rb") as file:
+                data = file.read()
+        return (zlib.decompress(data) if self.compressed else data).decode("utf-8")
+
+
+class _FilesView(Mapping[str, str]):
+    """A read-only view of the contents of a RAMFileManager by path, which doesn't count as using the files"""
+
+    def __init__(self, file_manager: "RAMFileManager"):
+        self._file_manager = file_manager
+
+    def __getitem__(self, path: str) -> str:
+        with self._file_manager._lock:
+            stored_file = self._file_manager._stored_files[path]
+            return stored_file.text if stored_file.text is not None else stored_file.content()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._file_manager._stored_files))
+
+    def __len__(self) -> int:
+        return len(self._file_manager._stored_files)
+
+
 class RAMFileManager(FileManager):
     """
     This class emulates a filesystem in RAM, storing files in a dictionary where keys are file paths and values are
     file content. Recommended for sandboxing or for testing.
+
+    Paths are normalized (`a/./b//c` is `a/b/c`) and indexed in a directory tree, so listing a directory only visits
+    what is inside it. A directory exists for as long as it contains a file.
+
+    With `PackConfig.ram_files_memory_budget_mb` set, memory use is bounded: files of at least
+    `ram_files_compress_min_bytes` are compressed as they're written, and once the budget is exceeded the least
+    recently used files are compressed, then spilled to a temporary directory. This is invisible to Packs, apart from
+    the time it takes to read a cold file. See `stats` for how much is held where.
     """
 
-    def __init__(self, config: PackConfig = PackConfig.global_config()):
+    def __init__(self, config: Optional[PackConfig] = None):
         super().__init__(config)
-        self.files = {}
+        budget_mb = self.config.ram_files_memory_budget_mb
+        self.memory_budget = int(budget_mb * 1024 * 1024) if budget_mb is not None else None
+        self.compress_min_bytes = self.config.ram_files_compress_min_bytes
+        self._stored_files: dict[str, _StoredFile] = {}
+        # The files held in memory, from least to most recently used
+        self._text_files: OrderedDict[str, _StoredFile] = OrderedDict()
+        self._data_files: OrderedDict[str, _StoredFile] = OrderedDict()
+        self._size = 0
+        self._text_bytes = 0
+        self._data_bytes = 0
+        self._spilled_bytes = 0
+        self._spill_dir: Optional[str] = None
+        self._spill_count = 0
+        self._lock = threading.RLock()
+        # Absolute and relative paths are separate trees, so listing "." doesn't include "/"
+        self._absolute_root = _Directory()
+        self._relative_root = _Directory()
+
+    @property
+    def files(self) -> Mapping[str, str]:
+        return _FilesView(self)
+
+    @property
+    def memory_used(self) -> int:
+        """The number of bytes of file content held in memory"""
+        return self._text_bytes + self._data_bytes
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._stored_files),
+                "size": self._size,
+                "memory_budget": self.memory_budget,
+                "bytes_held": self.memory_used,
+                "text_files": len(self._text_files),
+                "text_bytes": self._text_bytes,
+                "compressed_files": len(self._data_files),
+                "compressed_bytes": self._data_bytes,
+                "spilled_files": len(self._stored_files) - len(self._text_files) - len(self._data_files),
+                "spilled_bytes": self._spilled_bytes,
+            }
+
+    def close(self):
+        """Delete all files, including those spilled to disk"""
+        with self._lock:
+            self._stored_files.clear()
+            self._text_files.clear()
+            self._data_files.clear()
+            self._size = self._text_bytes = self._data_bytes = self._spilled_bytes = 0
+            self._absolute_root = _Directory()
+            self._relative_root = _Directory()
+            if self._spill_dir is not None:
+                self._remove_spill_dir()
+                self._spill_dir = None
+
+    def _root(self, path: str) -> _Directory:
+        return self._absolute_root if posixpath.isabs(path) else self._relative_root
+
+    def _find_directory(self, dir_path: str) -> Optional[_Directory]:
+        directory = self._root(dir_path)
+        for part in split_path(dir_path):
+            directory = directory.directories.get(part)
+            if directory is None:
+                return None
+        return directory
+
+    def _store_data(self, path: str, stored_file: _StoredFile, data: bytes):
+        compressed_data = zlib.compress(data)
+        stored_file.compressed = len(compressed_data) < len(data)
+        stored_file.data = compressed_data if stored_file.compressed else data
+        stored_file.text = None
+        self._data_files[path] = stored_file
+        self._data_bytes += len(stored_file.data)
+
+    def _spill(self, path: str, stored_file: _StoredFile):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="autopack-ram-files-")
+            self._remove_spill_dir = weakref.finalize(self, shutil.rmtree, self._spill_dir, ignore_errors=True)
+
+        self._spill_count += 1
+        stored_file.spill_path = os.path.join(self._spill_dir, str(self._spill_count))
+        with open(stored_file.spill_path, "wb") as file:
+            file.write(stored_file.data)
+
+        del self._data_files[path]
+        self._data_bytes -= len(stored_file.data)
+        self._spilled_bytes += len(stored_file.data)
+        stored_file.data = None
+
+    def _unspill(self, path: str, stored_file: _StoredFile):
+        with open(stored_file.spill_path, "rb") as file:
+            stored_file.data = file.read()
+        os.remove(stored_file.spill_path)
+        stored_file.spill_path = None
+
+        self._spilled_bytes -= len(stored_file.data)
+        self._data_files[path] = stored_file
+        self._data_bytes += len(stored_file.data)
+
+    def _enforce_budget(self):
+        if self.memory_budget is None:
+            return
+
+        # Compress the coldest files first, as they can be read again without touching the disk
+        compressed = []
+        while self.memory_used > self.memory_budget and self._text_files:
+            path, stored_file = self._text_files.popitem(last=False)
+            self._text_bytes -= stored_file.size
+            self._store_data(path, stored_file, stored_file.text.encode("utf-8"))
+            compressed.append(path)
+        # They stay colder than the files which were already compressed
+        for path in reversed(compressed):
+            self._data_files.move_to_end(path, last=False)
+
+        while self.memory_used > self.memory_budget and self._data_files:
+            path, stored_file = next(iter(self._data_files.items()))
+            self._spill(path, stored_file)
+
+    def _forget(self, path: str, stored_file: _StoredFile):
+        self._size -= stored_file.size
+        if stored_file.text is not None:
+            del self._text_files[path]
+            self._text_bytes -= stored_file.size
+        elif stored_file.data is not None:
+            del self._data_files[path]
+            self._data_bytes -= len(stored_file.data)
+        else:
+            self._spilled_bytes -= os.path.getsize(stored_file.spill_path)
+            os.remove(stored_file.spill_path)
 
     def read_file(self, file_path: str) -> str:
         """Reads a file from the virtual file system in RAM.
@@ -21,10 +234,23 @@ class RAMFileManager(FileManager):
         Returns:
             str: The content of the file. If the file does not exist, returns an error message.
         """
-        if file_path in self.files:
-            return self.files[file_path]
-        else:
-            return "Error: File not found"
+        path = normalize_path(file_path)
+        with self._lock:
+            stored_file = self._stored_files.get(path)
+            if stored_file is None:
+                return "Error: File not found"
+
+            if stored_file.text is not None:
+                self._text_files.move_to_end(path)
+                return stored_file.text
+
+            if stored_file.data is None:
+                self._unspill(path, stored_file)
+            else:
+                self._data_files.move_to_end(path)
+            content = stored_file.content()
+            self._enforce_budget()
+            return content
 
     async def aread_file(self, file_path: str) -> str:
         return self.read_file(file_path)
@@ -39,8 +265,46 @@ class RAMFileManager(FileManager):
         Returns:
             str: A success message indicating the file was written.
         """
-        self.files[file_path] = content
-        return f"Successfully wrote {len(content.encode('utf-8'))} bytes to {file_path}"
+        path = normalize_path(file_path)
+        parts = split_path(path)
+        # Paths outside of the top level, like `../x`, have nowhere to go
+        if not parts or parts[0] == "..":
+            return f"Error: Invalid file path '{file_path}'"
+
+        data = content.encode("utf-8")
+        with self._lock:
+            previous_file = self._stored_files.get(path)
+            if previous_file is not None:
+                self._forget(path, previous_file)
+            else:
+                *dir_parts, name = parts
+                # A path can't be both a file and a directory, so check before creating any directories
+                directory = self._root(path)
+                for part in dir_parts:
+                    if part in directory.files:
+                        return f"Error: Cannot write '{file_path}', '{directory.files[part]}' is a file"
+                    directory = directory.directories.get(part)
+                    if directory is None:
+                        break
+                else:
+                    if name in directory.directories:
+                        return f"Error: Cannot write '{file_path}', '{path}' is a directory"
+
+                directory = self._root(path)
+                for part in dir_parts:
+                    directory = directory.directories.setdefault(part, _Directory())
+                directory.files[name] = path
+
+            stored_file = self._stored_files[path] = _StoredFile(content, len(data))
+            self._size += stored_file.size
+            if self.memory_budget is not None and len(data) >= self.compress_min_bytes:
+                self._store_data(path, stored_file, data)
+            else:
+                self._text_files[path] = stored_file
+                self._text_bytes += stored_file.size
+            self._enforce_budget()
+
+        return f"Successfully wrote {len(data)} bytes to {file_path}"
 
     async def awrite_file(self, file_path: str, content: str) -> str:
         return self.write_file(file_path, content)
@@ -54,35 +318,54 @@ class RAMFileManager(FileManager):
         Returns:
             str: A success message indicating the file was deleted. If the file does not exist, returns an error message.
         """
-        if file_path in self.files:
-            del self.files[file_path]
-            return f"Successfully deleted file {file_path}."
-        else:
-            return f"Error: File not found '{file_path}'"
+        path = normalize_path(file_path)
+        with self._lock:
+            stored_file = self._stored_files.pop(path, None)
+            if stored_file is None:
+                return f"Error: File not found '{file_path}'"
+
+            self._forget(path, stored_file)
+            *dir_parts, name = split_path(path)
+            parents = [self._root(path)]
+            for part in dir_parts:
+                parents.append(parents[-1].directories[part])
+            del parents[-1].files[name]
+
+            # Remove the directories the file leaves empty
+            for part, parent, directory in zip(reversed(dir_parts), reversed(parents[:-1]), reversed(parents[1:])):
+                if directory.files or directory.directories:
+                    break
+                del parent.directories[part]
+
+        return f"Successfully deleted file {file_path}."
 
     async def adelete_file(self, file_path: str) -> str:
         return self.delete_file(file_path)
 
-    def list_files(self, dir_path: str) -> str:
+    def list_files(self, dir_path: str, recursive: bool = True) -> str:
         """Lists all files in the specified directory in the virtual file system in RAM.
 
         Args:
-            dir_path (str): The path to the directory to list files from.
+            dir_path (str): The path to the directory to list files from. Use "." for the top level.
+            recursive (bool): If True, lists the files of all subdirectories as well. Otherwise only lists the files
+                directly in the directory, followed by its subdirectories with a trailing "/".
 
         Returns:
             str: A list of all files in the directory. If the directory does not exist, returns an error message.
         """
-        # For simplicity, let's assume that all keys in `self.files` are file paths, and to list files in a directory,
-        # we just need to find all keys that start with `dir_path`.
-        files_in_dir = [
-            file_path
-            for file_path in self.files.keys()
-            if file_path.startswith(dir_path) and file_path not in self.IGNORE_FILES
-        ]
-        if files_in_dir:
-            return "\n".join(files_in_dir)
-        else:
-            return f"Error: No such directory {dir_path}."
+        with self._lock:
+            directory = self._find_directory(dir_path)
+            if directory is None or not (directory.files or directory.directories):
+                return f"Error: No such directory {dir_path}."
+
+            if recursive:
+                files_in_dir = [path for path in directory.walk() if posixpath.basename(path) not in self.IGNORE_FILES]
+            else:
+                files_in_dir = [path for name, path in directory.files.items() if name not in self.IGNORE_FILES]
+                dir_prefix = normalize_path(dir_path)
+                dir_prefix = "" if dir_prefix == "." else dir_prefix
+                files_in_dir.extend(posixpath.join(dir_prefix, name, "") for name in directory.directories)
+        return "\n".join(files_in_dir)
 
-    def alist_files(self, dir_path: str) -> str:
-        return self.list_files(dir_path)
+    async def alist_files(self, dir_path: str, recursive: bool = True) -> str:
+        return self.list_files(dir_path, recursive)
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 import aiofiles as aiofiles
 
@@ -12,7 +13,7 @@ class WorkspaceFileManager(FileManager):
     This class provides file operations restricted to a workspace directory on the local file system.
     """
 
-    def __init__(self, config: PackConfig = PackConfig.global_config()):
+    def __init__(self, config: Optional[PackConfig] = None):
         super().__init__(config)
 
     @property
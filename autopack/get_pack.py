@@ -1,16 +1,18 @@
 import json
 import os
 from datetime import timedelta, datetime
-from typing import Union
+from typing import Optional, Union
 
 from autopack.api import get_pack_details, pack_search
 from autopack.errors import AutoPackError, AutoPackNotFoundError
+from autopack.local_packs import local_packs_by_id, local_packs_by_name
 from autopack.pack import Pack
+from autopack.pack_config import PackConfig
 from autopack.pack_response import PackResponse
 from autopack.utils import fetch_pack_object, load_metadata_file, find_or_create_autopack_dir
 
 
-def try_get_pack(pack_id: str, remote=False) -> Union[type[Pack], None]:
+def try_get_pack(pack_id: str, remote=False, config: Optional[PackConfig] = None) -> Union[type[Pack], None]:
     """
     Get a pack based on its ID. Same as `get_pack` but does not raise an Exception. If there is a problem finding or
     loading a pack it will return None.
@@ -19,13 +21,14 @@ def try_get_pack(pack_id: str, remote=False) -> Union[type[Pack], None]:
         pack_id (str): The ID of the pack to fetch.
         quiet (bool, Optional): If True, won't print any output
         remote (bool, Optional): If True, will make network requests to fetch pack metadata
+        config (PackConfig): Custom config to use, for its local packs
 
     Returns:
         Pack or None: The fetched pack, None if the pack could not be loaded
     """
-
+    config = config or PackConfig.global_config()
     try:
-        return get_pack(pack_id, remote=remote)
+        return get_pack(pack_id, remote=remote, config=config)
     except AutoPackError:
         return None
 
@@ -44,14 +47,18 @@ def get_all_pack_info():
     return results
 
 
-def get_all_installed_packs():
-    """Returns all of the packs that are currently installed"""
+def get_all_installed_packs(config: Optional[PackConfig] = None):
+    """Returns all of the packs that are currently installed, starting with the local packs of the config. Installed
+    packs with the same name as a local pack are left out."""
+    config = config or PackConfig.global_config()
+    local_packs = local_packs_by_name(config)
     metadata = load_metadata_file()
     pack_ids = list(metadata.keys())
-    return try_get_packs(pack_ids, remote=False)
+    installed_packs = [pack for pack in try_get_packs(pack_ids, remote=False) if pack.name not in local_packs]
+    return [*local_packs.values(), *installed_packs]
 
 
-def try_get_packs(pack_ids: list[str], remote=False) -> list[type[Pack]]:
+def try_get_packs(pack_ids: list[str], remote=False, config: Optional[PackConfig] = None) -> list[type[Pack]]:
     """
     Get a list of packs based on their IDs
 
@@ -59,26 +66,30 @@ def try_get_packs(pack_ids: list[str], remote=False) -> list[type[Pack]]:
         pack_ids (list[str]): The IDs of the packs to fetch.
         quiet (bool, Optional): If True, won't print any output
         remote (bool, Optional): If True, will make network requests to fetch pack metadata
+        config (PackConfig): Custom config to use, for its local packs
 
     Returns:
         list[Pack]: The successfully fetched packs
     """
+    config = config or PackConfig.global_config()
     packs = []
     for pack_id in pack_ids:
-        pack = try_get_pack(pack_id, remote)
+        pack = try_get_pack(pack_id, remote, config)
         if pack:
             packs.append(pack)
 
     return packs
 
 
-def get_pack(pack_id: str, remote=False) -> type[Pack]:
+def get_pack(pack_id: str, remote=False, config: Optional[PackConfig] = None) -> type[Pack]:
     """
-    Get a pack based on its ID.
+    Get a pack based on its ID. Local packs of the config (with IDs like `local/{name}`) are returned directly, without
+    touching the metadata file or importing anything.
 
     Args:
         pack_id (str): The ID of the pack to fetch.
         remote (bool, Optional): If True, will make network requests to fetch pack metadata
+        config (PackConfig): Custom config to use, for its local packs
 
     Returns:
         Pack: The fetched pack
@@ -89,6 +100,11 @@ def get_pack(pack_id: str, remote=False) -> type[Pack]:
         AutoPackNotFoundError: If no pack matching that ID was found.
         AutoPackLoadError: If the pack was found but there was an error importing or finding the pack class.
     """
+    config = config or PackConfig.global_config()
+    local_pack = local_packs_by_id(config).get(pack_id)
+    if local_pack:
+        return local_pack
+
     pack_data = get_pack_details(pack_id, remote=remote)
 
     if not pack_data:
@@ -1,7 +1,11 @@
+import compileall
 import importlib
 import os
+import py_compile
+import re
 import shutil
 import subprocess
+from typing import Optional
 
 from git import Repo
 
@@ -76,6 +80,42 @@ def install_from_git(pack_data: PackResponse, quiet=True) -> str:
     return pack_path
 
 
+def compile_pack_bytecode(pack_path: str, unchecked_hash=False, quiet=True) -> bool:
+    """
+    Compile all Python sources under `pack_path` to bytecode so that importing the pack doesn't have to.
+
+    Args:
+        pack_path (str): The directory containing the pack sources.
+        unchecked_hash (bool, Optional): If True, writes unchecked-hash pycs which are never validated against the
+            source. Only appropriate for installations that will not be modified afterwards (e.g. container images).
+        quiet (bool, Optional): If True, won't print any output
+
+    Returns:
+        bool: True if every file compiled successfully
+    """
+    if unchecked_hash:
+        invalidation_mode = py_compile.PycInvalidationMode.UNCHECKED_HASH
+    else:
+        invalidation_mode = py_compile.PycInvalidationMode.TIMESTAMP
+
+    # Failures (e.g. a read-only filesystem) are not fatal, the pack will simply be compiled on import
+    return bool(
+        compileall.compile_dir(
+            pack_path,
+            quiet=2 if quiet else 1,
+            rx=re.compile(r"[/\\]\.git[/\\]"),
+            # Up-to-date timestamp pycs (e.g. written on install) would otherwise be kept as they are
+            force=unchecked_hash,
+            invalidation_mode=invalidation_mode,
+        )
+    )
+
+
+def compile_installed_packs(unchecked_hash=False, quiet=True) -> bool:
+    """Compile the bytecode of every pack in the .autopack directory. Returns True if everything compiled."""
+    return compile_pack_bytecode(find_or_create_autopack_dir(), unchecked_hash=unchecked_hash, quiet=quiet)
+
+
 def update_metadata_file(pack_id: str, pack_response: PackResponse):
     metadata = load_metadata_file()
     metadata[pack_id] = pack_response.__dict__
@@ -83,7 +123,8 @@ def update_metadata_file(pack_id: str, pack_response: PackResponse):
     write_metadata_file(metadata)
 
 
-def install_pack(pack_id: str, quiet=True, config: PackConfig = PackConfig.global_config()) -> type[Pack]:
+def install_pack(pack_id: str, quiet=True, config: Optional[PackConfig] = None) -> type[Pack]:
+    config = config or PackConfig.global_config()
     if not quiet:
         print(f"Installing pack: {pack_id}")
 
@@ -108,6 +149,7 @@ def install_pack(pack_id: str, quiet=True, config: PackConfig = PackConfig.globa
 
     try:
         git_dir = install_from_git(pack_data, quiet=quiet)
+        compile_pack_bytecode(git_dir, unchecked_hash=config.unchecked_hash_bytecode, quiet=quiet)
 
         update_metadata_file(pack_id, pack_data)
         pack = get_pack(pack_id)
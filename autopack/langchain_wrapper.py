@@ -1,3 +1,6 @@
+from typing import AsyncIterator, Iterator, Optional, Union
+
+from langchain.callbacks.manager import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain.tools import BaseTool
 from pydantic import Field
 
@@ -16,11 +19,44 @@ class LangchainWrapper(BaseTool):
         kwargs["args_schema"] = pack.args_schema
         super().__init__(**kwargs)
 
-    def _run(self, *args, **kwargs):
-        return self.pack.run(*args, **kwargs)
-
-    async def _arun(self, *args, **kwargs):
-        return self.pack.arun(*args, **kwargs)
+    def _run(self, *args, run_manager: Optional[CallbackManagerForToolRun] = None, **kwargs):
+        if run_manager is None or not self.pack.streams_output():
+            return self.pack.run(*args, **kwargs)
+
+        # LangChain tools don't stream their output, so chunks are reported to the callbacks as they arrive instead
+        chunks = []
+        for chunk in self.pack.stream(*args, **kwargs):
+            run_manager.on_text(chunk)
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    async def _arun(self, *args, run_manager: Optional[AsyncCallbackManagerForToolRun] = None, **kwargs):
+        if run_manager is None or not self.pack.streams_output():
+            return await self.pack.arun(*args, **kwargs)
+
+        chunks = []
+        async for chunk in self.pack.astream(*args, **kwargs):
+            await run_manager.on_text(chunk)
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    def stream(self, input: Union[str, dict, None] = None, config: Optional[dict] = None, **kwargs) -> Iterator[str]:
+        """Stream the output of the pack for a tool input, like `run` takes. Keyword arguments are passed on as is."""
+        args, kwargs = self._stream_args(input, kwargs)
+        return self.pack.stream(*args, **kwargs)
+
+    def astream(
+        self, input: Union[str, dict, None] = None, config: Optional[dict] = None, **kwargs
+    ) -> AsyncIterator[str]:
+        """Asynchronous `stream`"""
+        args, kwargs = self._stream_args(input, kwargs)
+        return self.pack.astream(*args, **kwargs)
+
+    def _stream_args(self, tool_input: Union[str, dict, None], kwargs: dict) -> tuple[tuple, dict]:
+        if tool_input is None:
+            return (), kwargs
+        args, input_kwargs = self._to_args_and_kwargs(self._parse_input(tool_input))
+        return args, {**input_kwargs, **kwargs}
 
     def is_single_input(self) -> bool:
         return False
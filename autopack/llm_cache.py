@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+from typing import Any, Callable, Coroutine, Optional, Union
+
+from langchain.chat_models.base import BaseChatModel
+
+from autopack.cache import LRUCache, SQLiteStore
+from autopack.utils import find_or_create_autopack_dir, llm_identity
+
+
+class LLMResponseCache:
+    """
+    Caches LLM responses by prompt, so that identical prompts sent to the same LLM are only answered once. Used by
+    `call_llm` and `acall_llm` when passed in, which Packs and selection do when `PackConfig.llm_cache` (or a Pack's
+    own `llm_cache`) is set.
+
+    Entries are keyed on the exact prompt and the identity of the LLM (see `llm_identity`), so switching models never
+    returns another model's responses. Only use this for LLMs whose responses may be reused, e.g. with a temperature of
+    0. Persisted responses of callables other than chat models and module-level functions are only reused across
+    processes if the callable sets a `cache_namespace` attribute naming its model.
+
+    Args:
+        max_size (int): The maximum number of responses kept in memory (and on disk, if persisted)
+        ttl (Optional[float]): The number of seconds a response stays valid, forever if None
+        persist (bool): If True, responses are also stored in `llm_cache.sqlite3` in the .autopack directory
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None, persist: bool = False):
+        store = None
+        if persist:
+            store = SQLiteStore(os.path.join(find_or_create_autopack_dir(), "llm_cache.sqlite3"), max_size=max_size)
+        self._cache = LRUCache(max_size=max_size, ttl=ttl, store=store)
+
+    @staticmethod
+    def key(prompt: str, llm: Union[BaseChatModel, Callable[[str], str], Coroutine[Any, Any, str]]) -> str:
+        return hashlib.sha256(json.dumps([llm_identity(llm), prompt]).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, response: str):
+        self._cache.set(key, response)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
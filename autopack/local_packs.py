@@ -0,0 +1,35 @@
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from autopack.pack import Pack
+from autopack.pack_config import PackConfig
+
+LOCAL_PACK_ID_PREFIX = "local/"
+
+
+def local_pack_id(pack_class: type[Pack]) -> str:
+    """The pack ID of a local pack, which is its name in the `local/` namespace"""
+    return f"{LOCAL_PACK_ID_PREFIX}{pack_class.name}"
+
+
+@lru_cache(maxsize=32)
+def _index(pack_classes: tuple[type[Pack], ...]) -> tuple[Mapping[str, type[Pack]], Mapping[str, type[Pack]]]:
+    by_name = {}
+    for pack_class in pack_classes:
+        by_name.setdefault(pack_class.name, pack_class)
+    by_id = {local_pack_id(pack_class): pack_class for pack_class in by_name.values()}
+
+    return MappingProxyType(by_name), MappingProxyType(by_id)
+
+
+def local_packs_by_name(config: Optional[PackConfig] = None) -> Mapping[str, type[Pack]]:
+    """Index the local packs of a config by name. If two local packs share a name, the first one wins."""
+    config = config or PackConfig.global_config()
+    return _index(tuple(config.local_packs))[0]
+
+
+def local_packs_by_id(config: Optional[PackConfig] = None) -> Mapping[str, type[Pack]]:
+    """Index the local packs of a config by pack ID (see `local_pack_id`)"""
+    config = config or PackConfig.global_config()
+    return _index(tuple(config.local_packs))[1]
@@ -1,17 +1,35 @@
+import asyncio
+import queue
+import threading
+import time
 from abc import abstractmethod
 from asyncio import iscoroutinefunction
-from typing import ClassVar, Optional, Callable, Coroutine, Any, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import ClassVar, Optional, Callable, Coroutine, Any, Union, Iterator, AsyncIterator
 
 from pydantic import BaseModel, ValidationError, Field
 
+from autopack.callbacks import PackCallbackHandler
+from autopack.errors import AutoPackTimeoutError
 from autopack.filesystem_emulation.file_manager import FileManager
-from autopack.pack_config import PackConfig
-from autopack.utils import run_args_from_args_schema, acall_llm, call_llm
+from autopack.llm_cache import LLMResponseCache
+from autopack.pack_config import ExecutionMode, PackConfig
+from autopack.process_pool import WORKER_CONFIG_FIELDS, get_process_pool, module_import_root, run_pack_class
+from autopack.rate_limit import get_llm_rate_limiter
+from autopack.result_cache import get_result_cache, is_cacheable_result, result_cache_key
+from autopack.utils import run_args_from_args_schema, acall_llm, call_llm, compile_args_validator
+
+
+# How many chunks a timed `stream` produces ahead of its consumer
+STREAM_BUFFER_CHUNKS = 16
 
 
 class Pack(BaseModel):
     class Config:
         arbitrary_types_allowed = True
+        # Models holding a Pack (e.g. the LangChain wrapper) share the instance instead of copying it
+        copy_on_model_validation = "none"
 
     ## Required
 
@@ -32,6 +50,21 @@ class Pack(BaseModel):
     reversible: ClassVar[bool] = True
     # A Pydantic BaseModel describing the Pack's run arguments
     args_schema: ClassVar[Optional[type[BaseModel]]] = None
+    # If True, _run and _arun receive the validated (and type-coerced) arguments instead of the raw ones
+    pass_validated_args: ClassVar[bool] = False
+    # If True, results are cached per set of (validated) arguments. Only used for reversible, side-effect-free packs
+    cache_results: ClassVar[bool] = False
+    # How long cached results stay valid in seconds, forever if None
+    result_cache_ttl: ClassVar[Optional[float]] = None
+    # The maximum number of cached results
+    result_cache_max_size: ClassVar[int] = 256
+    # If True, cached results are also stored in the .autopack directory
+    result_cache_persist: ClassVar[bool] = False
+    # The time limit of a run in seconds, overriding the config's `run_timeout`
+    run_timeout: ClassVar[Optional[float]] = None
+    # Where _run is executed, overriding the config's `execution_mode`. In the process pool mode, _run runs in warm
+    # worker processes (without an LLM), which suits CPU-bound or untrusted packs
+    execution_mode: ClassVar[Optional[ExecutionMode]] = None
 
     llm: Optional[Callable[[str], str]] = Field(
         None, description="A callable function to call an LLM (string in string out)"
@@ -40,6 +73,12 @@ class Pack(BaseModel):
         None, description="An asynchronous callable function to call an LLM (string in string out)"
     )
     config: PackConfig = Field(default_factory=PackConfig.global_config)
+    llm_cache: Optional[LLMResponseCache] = Field(
+        None, description="A cache for the responses of this Pack's LLM calls, overriding config.llm_cache"
+    )
+    callbacks: list[PackCallbackHandler] = Field(
+        default_factory=list, description="Hooks called around the execution of this Pack, on top of config.callbacks"
+    )
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -58,52 +97,549 @@ class Pack(BaseModel):
             raise TypeError(f"Class {self.__class__.__name__} must define 'description' as a class variable")
 
     def run(self, *args, **kwargs) -> str:
-        """Execute the _run function of the subclass, verifying the arguments. (Will eventually do callbacks or some
-        such)
+        """Execute the _run function of the subclass, verifying the arguments and calling the callback handlers of the
+        Pack and its config.
 
         Args: **kwargs (dict): The arguments to pass to _run. Each key should be the name of an argument,
         and the value should be the value of the argument.
 
-        Returns: The response from the _run function of the subclass
+        Returns: The response from the _run function of the subclass, or an error message if the arguments are
+        invalid or the run exceeded its timeout
         """
-        try:
-            # Validate the arguments
-            self.validate_tool_args(**kwargs)
-        except ValidationError as e:
-            # If a ValidationError is raised, the arguments are invalid
-            error_list = ". ".join([f"{err['loc'][0]}: {err['msg']}" for err in e.errors()])
-            return f"Error: Invalid arguments. Details: {error_list}"
-
-        return self._run(*args, **kwargs)
+        return self.run_with_timeout(None, *args, **kwargs)
 
     async def arun(self, *args, **kwargs):
-        """Asynchronously execute the _arun function of the subclass, verifying the arguments. (Will eventually do
-        callbacks or some such)
+        """Asynchronously execute the _arun function of the subclass, verifying the arguments and calling the callback
+        handlers of the Pack and its config.
 
         Args:
             **kwargs (dict): The arguments to pass to _arun. Each key should be the name of an argument,
         and the value should be the value of the argument.
 
         Returns:
-            str: The response from the _arun function of the subclass
+            str: The response from the _arun function of the subclass, or an error message if the arguments are
+            invalid or the run exceeded its timeout
         """
+        return await self.arun_with_timeout(None, *args, **kwargs)
+
+    def run_with_timeout(self, timeout: Optional[float], /, *args, **kwargs) -> str:
+        """Like `run`, with a time limit in seconds for this call instead of the default `timeout`. The limit is
+        positional-only, so Packs can still have an argument named `timeout`."""
         try:
             # Validate the arguments
-            self.validate_tool_args(**kwargs)
+            kwargs, validated_args = self._validate_args(kwargs)
         except ValidationError as e:
             # If a ValidationError is raised, the arguments are invalid
-            error_list = ". ".join([f"{err['loc'][0]}: {err['msg']}" for err in e.errors()])
-            return f"Error: Invalid arguments. Details: {error_list}"
+            return self._invalid_arguments(kwargs, e)
+
+        return self._execute(args, kwargs, validated_args, timeout)
+
+    async def arun_with_timeout(self, timeout: Optional[float], /, *args, **kwargs) -> str:
+        """Like `arun`, with a time limit in seconds for this call instead of the default `timeout`. See
+        `run_with_timeout`."""
+        try:
+            # Validate the arguments
+            kwargs, validated_args = self._validate_args(kwargs)
+        except ValidationError as e:
+            # If a ValidationError is raised, the arguments are invalid
+            return self._invalid_arguments(kwargs, e)
+
+        return await self._aexecute(args, kwargs, validated_args, timeout)
+
+    def stream(self, *args, **kwargs) -> Iterator[str]:
+        """Execute the pack, yielding its output in chunks as they are produced. Packs which don't implement `_stream`,
+        and packs running in the process pool, yield the whole output of `run` as a single chunk. Like `run`, the
+        output is cached if the pack caches its results, and if the run exceeds the pack's `timeout` the output ends
+        with a timeout error message.
+
+        Args:
+            **kwargs (dict): The arguments to pass to _stream. Each key should be the name of an argument,
+        and the value should be the value of the argument.
+
+        Yields:
+            str: The chunks of the output, or a single error message if the arguments are invalid
+        """
+        try:
+            kwargs, validated_args = self._validate_args(kwargs)
+        except ValidationError as e:
+            yield self._invalid_arguments(kwargs, e)
+            return
+
+        if type(self)._stream is Pack._stream or self.uses_process_pool:
+            # Process pool runs return their output in one piece
+            yield self._execute(args, kwargs, validated_args)
+            return
+
+        result_cache = get_result_cache(type(self))
+        key = result_cache_key(self, args, validated_args) if result_cache is not None else None
+        handlers = self.callback_handlers
+        for handler in handlers:
+            handler.before_run(self, kwargs)
+        # The output is only held on to if it's going to be cached, handlers get its length
+        chunks = []
+        output_length = 0
+        start = time.perf_counter()
+        try:
+            cached_result = result_cache.get(key) if result_cache is not None else None
+            if cached_result is not None:
+                output_length = len(cached_result)
+                yield cached_result
+            else:
+                streamed = self._stream_with_timeout(args, kwargs, self.timeout)
+                try:
+                    for chunk in streamed:
+                        output_length += len(chunk)
+                        if result_cache is not None:
+                            chunks.append(chunk)
+                        yield chunk
+                finally:
+                    streamed.close()
+        except Exception as e:
+            for handler in handlers:
+                handler.on_error(self, kwargs, e, time.perf_counter() - start)
+            if isinstance(e, AutoPackTimeoutError):
+                yield timeout_message(e)
+                return
+            raise
+
+        if result_cache is not None and cached_result is None:
+            result = "".join(chunks)
+            if is_cacheable_result(result):
+                result_cache.set(key, result)
+        for handler in handlers:
+            handler.after_stream(self, kwargs, output_length, time.perf_counter() - start)
+
+    async def astream(self, *args, **kwargs) -> AsyncIterator[str]:
+        """Asynchronously execute the pack, yielding its output in chunks as they are produced. Packs which only
+        implement `_stream` have it iterated in `config.async_executor`; packs which implement neither yield the whole
+        output of `arun` as a single chunk. See `stream`.
+        """
+        try:
+            kwargs, validated_args = self._validate_args(kwargs)
+        except ValidationError as e:
+            yield self._invalid_arguments(kwargs, e)
+            return
+
+        if not self.streams_output() or self.uses_process_pool:
+            yield await self._aexecute(args, kwargs, validated_args)
+            return
+
+        result_cache = get_result_cache(type(self))
+        key = result_cache_key(self, args, validated_args) if result_cache is not None else None
+        handlers = self.callback_handlers
+        for handler in handlers:
+            handler.before_run(self, kwargs)
+        # The output is only held on to if it's going to be cached, handlers get its length
+        chunks = []
+        output_length = 0
+        start = time.perf_counter()
+        try:
+            cached_result = result_cache.get(key) if result_cache is not None else None
+            if cached_result is not None:
+                output_length = len(cached_result)
+                yield cached_result
+            else:
+                streamed = self._astream_with_timeout(args, kwargs, self.timeout)
+                try:
+                    async for chunk in streamed:
+                        output_length += len(chunk)
+                        if result_cache is not None:
+                            chunks.append(chunk)
+                        yield chunk
+                finally:
+                    await streamed.aclose()
+        except Exception as e:
+            for handler in handlers:
+                handler.on_error(self, kwargs, e, time.perf_counter() - start)
+            if isinstance(e, AutoPackTimeoutError):
+                yield timeout_message(e)
+                return
+            raise
+
+        if result_cache is not None and cached_result is None:
+            result = "".join(chunks)
+            if is_cacheable_result(result):
+                result_cache.set(key, result)
+        for handler in handlers:
+            handler.after_stream(self, kwargs, output_length, time.perf_counter() - start)
+
+    def _stream_with_timeout(self, args: tuple, kwargs: dict[str, Any], timeout: Optional[float]) -> Iterator[str]:
+        """Yield the chunks of `_stream`, raising AutoPackTimeoutError if they aren't all produced in time. Like
+        `_execute_with_watchdog`, the chunks are produced in a watched thread which is abandoned on timeout."""
+        if timeout is None:
+            yield from self._stream(*args, **kwargs)
+            return
+
+        # Bounded, so a producer running ahead of the consumer waits instead of buffering the whole output
+        produced: queue.Queue = queue.Queue(maxsize=STREAM_BUFFER_CHUNKS)
+        abandoned = threading.Event()
+        done = object()
+
+        def put(item: tuple) -> bool:
+            while not abandoned.is_set():
+                try:
+                    produced.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            chunks = self._stream(*args, **kwargs)
+            try:
+                for chunk in chunks:
+                    if not put((chunk, None)):
+                        return
+            except BaseException as e:
+                put((None, e))
+                return
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+            put((done, None))
+
+        threading.Thread(target=produce, name=f"autopack-{self.name}", daemon=True).start()
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    chunk, error = produced.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise AutoPackTimeoutError(f"{self.name} did not finish within {timeout} seconds")
+                if error is not None:
+                    raise error
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            # Stops the producer on timeout, and when the consumer stops early
+            abandoned.set()
+
+    async def _astream_with_timeout(
+        self, args: tuple, kwargs: dict[str, Any], timeout: Optional[float]
+    ) -> AsyncIterator[str]:
+        """Yield the chunks of `_astream`, raising AutoPackTimeoutError and cancelling it if they aren't all produced
+        in time"""
+        chunks = self._astream(*args, **kwargs)
+        if timeout is None:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise AutoPackTimeoutError(f"{self.name} did not finish within {timeout} seconds")
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    @classmethod
+    def streams_output(cls) -> bool:
+        """True if the Pack produces its output incrementally, i.e. implements `_stream` or `_astream`"""
+        return cls._stream is not Pack._stream or cls._astream is not Pack._astream
+
+    @property
+    def callback_handlers(self) -> list[PackCallbackHandler]:
+        return [*self.config.callbacks, *self.callbacks]
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """The default time limit of a run in seconds: the Pack's `run_timeout`, falling back to the config's"""
+        return self.run_timeout if self.run_timeout is not None else self.config.run_timeout
+
+    def _invalid_arguments(self, kwargs: dict[str, Any], error: ValidationError) -> str:
+        for handler in self.callback_handlers:
+            handler.on_error(self, kwargs, error, 0.0)
+        return invalid_arguments_message(error)
+
+    def _execute(
+        self, args: tuple, kwargs: dict[str, Any], validated_args: dict[str, Any], timeout: Optional[float] = None
+    ) -> str:
+        """Run the pack with already validated arguments, calling the callback handlers around it"""
+        handlers = self.callback_handlers
+        timeout = timeout if timeout is not None else self.timeout
+
+        for handler in handlers:
+            handler.before_run(self, kwargs)
+        start = time.perf_counter()
+        try:
+            if timeout is None or self.uses_process_pool:
+                # Process pool runs enforce their own timeout by killing the worker
+                result = self._execute_cached(args, kwargs, validated_args, timeout)
+            else:
+                result = self._execute_with_watchdog(args, kwargs, validated_args, timeout)
+        except Exception as e:
+            for handler in handlers:
+                handler.on_error(self, kwargs, e, time.perf_counter() - start)
+            if isinstance(e, AutoPackTimeoutError):
+                return timeout_message(e)
+            raise
+
+        for handler in handlers:
+            handler.after_run(self, kwargs, result, time.perf_counter() - start)
+        return result
+
+    async def _aexecute(
+        self, args: tuple, kwargs: dict[str, Any], validated_args: dict[str, Any], timeout: Optional[float] = None
+    ) -> str:
+        """Asynchronously run the pack with already validated arguments, calling the callback handlers around it"""
+        handlers = self.callback_handlers
+        timeout = timeout if timeout is not None else self.timeout
+
+        for handler in handlers:
+            handler.before_run(self, kwargs)
+        start = time.perf_counter()
+        try:
+            if timeout is None or self.uses_process_pool:
+                result = await self._aexecute_cached(args, kwargs, validated_args, timeout)
+            else:
+                try:
+                    # The run is cancelled once the timeout expires
+                    result = await asyncio.wait_for(self._aexecute_cached(args, kwargs, validated_args), timeout)
+                except asyncio.TimeoutError:
+                    raise AutoPackTimeoutError(f"{self.name} did not finish within {timeout} seconds")
+        except Exception as e:
+            for handler in handlers:
+                handler.on_error(self, kwargs, e, time.perf_counter() - start)
+            if isinstance(e, AutoPackTimeoutError):
+                return timeout_message(e)
+            raise
+
+        for handler in handlers:
+            handler.after_run(self, kwargs, result, time.perf_counter() - start)
+        return result
+
+    def _execute_with_watchdog(
+        self, args: tuple, kwargs: dict[str, Any], validated_args: dict[str, Any], timeout: float
+    ) -> str:
+        """Run the pack in a watched thread, raising AutoPackTimeoutError if it doesn't finish in time. Python threads
+        can't be killed, so a timed out run is abandoned: it keeps running in the background but no longer blocks the
+        caller."""
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = self._execute_cached(args, kwargs, validated_args)
+            except BaseException as e:
+                outcome["error"] = e
+
+        worker = threading.Thread(target=target, name=f"autopack-{self.name}", daemon=True)
+        worker.start()
+        worker.join(timeout)
+        if worker.is_alive():
+            raise AutoPackTimeoutError(f"{self.name} did not finish within {timeout} seconds")
+        if "error" in outcome:
+            raise outcome["error"]
+
+        return outcome["result"]
+
+    def _execute_cached(
+        self, args: tuple, kwargs: dict[str, Any], validated_args: dict[str, Any], timeout: Optional[float] = None
+    ) -> str:
+        """Run the pack with already validated arguments, using the result cache if the pack has one. The timeout is
+        only used by the process pool."""
+        result_cache = get_result_cache(type(self))
+        if result_cache is None:
+            return self._run_in_execution_mode(args, kwargs, timeout)
+
+        key = result_cache_key(self, args, validated_args)
+        result = result_cache.get(key)
+        if result is None:
+            result = self._run_in_execution_mode(args, kwargs, timeout)
+            if is_cacheable_result(result):
+                result_cache.set(key, result)
+
+        return result
+
+    async def _aexecute_cached(
+        self, args: tuple, kwargs: dict[str, Any], validated_args: dict[str, Any], timeout: Optional[float] = None
+    ) -> str:
+        """Asynchronously run the pack with already validated arguments, using the result cache if the pack has one.
+        The timeout is only used by the process pool."""
+        result_cache = get_result_cache(type(self))
+        if result_cache is None:
+            return await self._arun_in_execution_mode(args, kwargs, timeout)
+
+        key = result_cache_key(self, args, validated_args)
+        result = result_cache.get(key)
+        if result is None:
+            result = await self._arun_in_execution_mode(args, kwargs, timeout)
+            if is_cacheable_result(result):
+                result_cache.set(key, result)
+
+        return result
+
+    @property
+    def uses_process_pool(self) -> bool:
+        execution_mode = self.execution_mode or self.config.execution_mode
+        return execution_mode == ExecutionMode.process_pool
+
+    def _run_in_execution_mode(self, args: tuple, kwargs: dict[str, Any], timeout: Optional[float]) -> str:
+        if not self.uses_process_pool:
+            return self._run(*args, **kwargs)
+        return get_process_pool(type(self), self.config).run(args, kwargs, timeout)
+
+    async def _arun_in_execution_mode(self, args: tuple, kwargs: dict[str, Any], timeout: Optional[float]) -> str:
+        if not self.uses_process_pool:
+            return await self._arun(*args, **kwargs)
+        return await asyncio.to_thread(get_process_pool(type(self), self.config).run, args, kwargs, timeout)
+
+    def _prepare_many(
+        self, arg_sets: list[dict[str, Any]]
+    ) -> tuple[dict[int, str], dict[int, tuple[dict[str, Any], dict[str, Any]]]]:
+        """Validate every argument set up front, returning the error messages and the prepared arguments by index"""
+        errors, prepared = {}, {}
+        for index, kwargs in enumerate(arg_sets):
+            try:
+                prepared[index] = self._validate_args(kwargs)
+            except ValidationError as e:
+                errors[index] = self._invalid_arguments(kwargs, e)
+
+        return errors, prepared
+
+    def _execute_or_error(
+        self, prepared_args: tuple[dict[str, Any], dict[str, Any]], timeout: Optional[float] = None
+    ) -> str:
+        try:
+            return self._execute((), *prepared_args, timeout)
+        except Exception as e:
+            return execution_error_message(e)
+
+    async def _aexecute_or_error(
+        self, prepared_args: tuple[dict[str, Any], dict[str, Any]], timeout: Optional[float] = None
+    ) -> str:
+        try:
+            return await self._aexecute((), *prepared_args, timeout)
+        except Exception as e:
+            return execution_error_message(e)
+
+    def run_many(
+        self, arg_sets: list[dict[str, Any]], max_concurrency: int = 8, timeout: Optional[float] = None
+    ) -> list[str]:
+        """Execute the pack once for each set of arguments, running up to `max_concurrency` of them in parallel
+        threads. All arguments are validated before anything is executed.
+
+        Args:
+            arg_sets (list[dict]): The keyword arguments of each run
+            max_concurrency (int): The maximum number of runs executing at the same time
+            timeout (Optional[float]): The time limit of each run in seconds, defaults to the Pack's `timeout`
+
+        Returns:
+            list[str]: The response of each run, in the same order as `arg_sets`. Runs with invalid arguments or that
+            raised an exception get an error message instead.
+        """
+        results: list[Optional[str]] = [None] * len(arg_sets)
+        for index, result in self.run_many_as_completed(arg_sets, max_concurrency, timeout):
+            results[index] = result
+
+        return results
+
+    def run_many_as_completed(
+        self, arg_sets: list[dict[str, Any]], max_concurrency: int = 8, timeout: Optional[float] = None
+    ) -> Iterator[tuple[int, str]]:
+        """Like `run_many`, but yields (index, response) pairs as soon as each run completes"""
+        errors, prepared = self._prepare_many(arg_sets)
+        yield from errors.items()
+
+        if not prepared:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {
+                executor.submit(self._execute_or_error, prepared_args, timeout): index
+                for index, prepared_args in prepared.items()
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    async def arun_many(
+        self, arg_sets: list[dict[str, Any]], max_concurrency: int = 8, timeout: Optional[float] = None
+    ) -> list[str]:
+        """Asynchronously execute the pack once for each set of arguments, with at most `max_concurrency` runs in
+        flight at once. See `run_many`.
+        """
+        results: list[Optional[str]] = [None] * len(arg_sets)
+        async for index, result in self.arun_many_as_completed(arg_sets, max_concurrency, timeout):
+            results[index] = result
 
-        return await self._arun(*args, **kwargs)
+        return results
+
+    async def arun_many_as_completed(
+        self, arg_sets: list[dict[str, Any]], max_concurrency: int = 8, timeout: Optional[float] = None
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Like `arun_many`, but yields (index, response) pairs as soon as each run completes"""
+        errors, prepared = self._prepare_many(arg_sets)
+        for index, error in errors.items():
+            yield index, error
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(index: int, prepared_args: tuple[dict[str, Any], dict[str, Any]]) -> tuple[int, str]:
+            async with semaphore:
+                return index, await self._aexecute_or_error(prepared_args, timeout)
+
+        tasks = [asyncio.ensure_future(run_one(index, prepared_args)) for index, prepared_args in prepared.items()]
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                yield await next_completed
+        finally:
+            for task in tasks:
+                task.cancel()
 
     @abstractmethod
     def _run(self, *args, **kwargs):
         pass
 
-    @abstractmethod
-    def _arun(self, *args, **kwargs):
-        pass
+    async def _arun(self, *args, **kwargs):
+        """
+        Packs which only implement `_run` are run in `config.async_executor` (the event loop's thread pool by default),
+        so a blocking pack never stalls the event loop. Override this for a natively asynchronous implementation.
+        """
+        executor = self.config.async_executor
+        if isinstance(executor, ProcessPoolExecutor):
+            # The worker creates its own instance, without an LLM (see `run_pack_class`)
+            pack_class = type(self)
+            job = partial(
+                run_pack_class,
+                pack_class.__module__,
+                pack_class.__qualname__,
+                module_import_root(pack_class.__module__),
+                self.config.dict(include=WORKER_CONFIG_FIELDS),
+                args,
+                kwargs,
+            )
+        else:
+            job = partial(self._run, *args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(executor, job)
+
+    def _stream(self, *args, **kwargs) -> Iterator[str]:
+        """Override this to yield the output in chunks as it's produced. `_run` should return the same output, e.g.
+        by joining the chunks, as it's used where streaming isn't possible."""
+        yield self._run(*args, **kwargs)
+
+    async def _astream(self, *args, **kwargs) -> AsyncIterator[str]:
+        """Override this for a natively asynchronous `_stream`. By default the chunks of `_stream` are produced in
+        `config.async_executor` so they don't block the event loop. Generators can't be sent to other processes, so
+        with a ProcessPoolExecutor they are iterated in the event loop's thread pool instead."""
+        loop = asyncio.get_running_loop()
+        executor = self.config.async_executor
+        if isinstance(executor, ProcessPoolExecutor):
+            executor = None
+        chunks = self._stream(*args, **kwargs)
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(executor, next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk
 
     @property
     def args(self) -> dict:
@@ -115,12 +651,30 @@ class Pack(BaseModel):
     def call_llm(self, prompt: str) -> str:
         if self.llm is None:
             return "No LLM available, cannot proceed"
-        return call_llm(prompt, self.llm)
+
+        start = time.perf_counter()
+        response = call_llm(prompt, self.llm, self.response_cache, get_llm_rate_limiter(self.config))
+        self._on_llm_call(prompt, response, time.perf_counter() - start)
+        return response
 
     async def acall_llm(self, prompt: str) -> str:
-        if self.allm is None:
-            return self.call_llm(prompt)
-        return await acall_llm(prompt, self.allm)
+        # Without an async LLM the sync one is called in a thread, waiting for the rate limiter without blocking the loop
+        llm = self.allm if self.allm is not None else self.llm
+        if llm is None:
+            return "No LLM available, cannot proceed"
+
+        start = time.perf_counter()
+        response = await acall_llm(prompt, llm, self.response_cache, get_llm_rate_limiter(self.config))
+        self._on_llm_call(prompt, response, time.perf_counter() - start)
+        return response
+
+    @property
+    def response_cache(self) -> Optional[LLMResponseCache]:
+        return self.llm_cache if self.llm_cache is not None else self.config.llm_cache
+
+    def _on_llm_call(self, prompt: str, response: str, duration: float):
+        for handler in self.callback_handlers:
+            handler.on_llm_call(self, prompt, response, duration)
 
     @property
     def filesystem_manager(self) -> FileManager:
@@ -136,11 +690,44 @@ class Pack(BaseModel):
         Raises:
             ValidationError If any arguments are invalid.
         """
-        self.args_schema(**kwargs)
+        compile_args_validator(self.args_schema)(kwargs)
 
         return True
 
+    def prepare_tool_args(self, **kwargs) -> dict[str, Any]:
+        """Validate the arguments, returning the arguments that should be passed to _run or _arun: the validated
+        values if `pass_validated_args` is set, otherwise the arguments unchanged.
+
+        Raises:
+            ValidationError If any arguments are invalid.
+        """
+        return self._validate_args(kwargs)[0]
+
+    def _validate_args(self, kwargs: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Return both the arguments to pass to _run and the validated arguments"""
+        validated_args = compile_args_validator(self.args_schema)(kwargs)
+
+        return (validated_args if self.pass_validated_args else kwargs), validated_args
+
+    def close(self):
+        """Release any resources (clients, connections, ...) the Pack holds. Called by PackRegistry when the instance
+        is discarded."""
+        pass
+
     def init_langchain_tool(self):
         from autopack.langchain_wrapper import LangchainWrapper
 
         return LangchainWrapper(pack=self)
+
+
+def invalid_arguments_message(error: ValidationError) -> str:
+    error_list = ". ".join([f"{err['loc'][0]}: {err['msg']}" for err in error.errors()])
+    return f"Error: Invalid arguments. Details: {error_list}"
+
+
+def timeout_message(error: AutoPackTimeoutError) -> str:
+    return f"Error: Timed out. Details: {error}"
+
+
+def execution_error_message(error: Exception) -> str:
+    return f"Error: Pack execution failed. Details: {type(error).__name__}: {error}"
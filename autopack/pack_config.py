@@ -1,9 +1,12 @@
+from concurrent.futures import Executor
 from enum import Enum
 from typing import TYPE_CHECKING, ClassVar, Optional
 
 from pydantic import Field, BaseSettings
 
+from autopack.callbacks import PackCallbackHandler
 from autopack.filesystem_emulation.file_manager import FileManager
+from autopack.llm_cache import LLMResponseCache
 
 if TYPE_CHECKING:
     from autopack import Pack
@@ -18,6 +21,13 @@ class InstallerStyle(str, Enum):
     manual = "manual"
 
 
+class ExecutionMode(str, Enum):
+    # Packs run in the calling process and thread
+    in_process = "in_process"
+    # Packs run in a pool of warm worker processes, for multi-core throughput and crash isolation
+    process_pool = "process_pool"
+
+
 class PackConfig(BaseSettings):
     """
     Class for defining the configuration of AutoPack. This will either be set by:
@@ -31,6 +41,14 @@ class PackConfig(BaseSettings):
 
     _global_config: ClassVar["PackConfig"] = None
     filesystem_manager: Optional[FileManager] = None
+    # The executor that runs sync-only Packs when they're called asynchronously. Defaults to the event loop's thread
+    # pool. With a ProcessPoolExecutor, each run creates a new instance of the Pack in a worker, without an LLM and with
+    # only the basic settings of the config (see `autopack.process_pool.run_pack_class`).
+    async_executor: Optional[Executor] = None
+    # Hooks called around the execution of every Pack using this config, e.g. a MetricsCollector
+    callbacks: list[PackCallbackHandler] = []
+    # If set, LLM responses of Packs and selection are cached by prompt and LLM
+    llm_cache: Optional[LLMResponseCache] = None
 
     class Config:
         env_prefix = "AUTOPACK_"
@@ -47,9 +65,55 @@ class PackConfig(BaseSettings):
     api_url: str = Field(
         description="Scheme, hostname, and port of the AutoPack API you wish to use.", default="https://autopack.ai/"
     )
-    # Not implemented yet
+    unchecked_hash_bytecode: bool = Field(
+        description="If True, Pack bytecode is compiled without source checks. Use only for immutable installations",
+        default=False,
+    )
+    selection_top_k: Optional[int] = Field(
+        description="If set, only this many packs, ranked locally against the task, are shown to the LLM in selection",
+        default=None,
+    )
+    run_timeout: Optional[float] = Field(
+        description="The default time limit of a Pack run in seconds. Runs exceeding it return an error",
+        default=None,
+    )
+    llm_max_concurrency: Optional[int] = Field(
+        description="The maximum number of LLM requests in flight at once, across all Packs and selection",
+        default=None,
+    )
+    llm_requests_per_minute: Optional[int] = Field(
+        description="The maximum number of LLM requests started per minute, across all Packs and selection",
+        default=None,
+    )
+    llm_tokens_per_minute: Optional[int] = Field(
+        description="The maximum number of (estimated) LLM tokens per minute, across all Packs and selection",
+        default=None,
+    )
+    execution_mode: ExecutionMode = Field(
+        description="Where Packs are executed, unless a Pack sets its own execution_mode",
+        default=ExecutionMode.in_process,
+    )
+    process_pool_size: Optional[int] = Field(
+        description="The number of worker processes per Pack in the process pool mode, defaults to the CPU count",
+        default=None,
+    )
+    process_max_calls: Optional[int] = Field(
+        description="Worker processes are replaced after this many calls, to release leaked resources",
+        default=1000,
+    )
+    process_max_memory_mb: Optional[float] = Field(
+        description="Worker processes are replaced once their peak memory exceeds this many MB", default=None
+    )
+    ram_files_memory_budget_mb: Optional[float] = Field(
+        description="RAMFileManager compresses, then spills to disk, its least recently used files beyond this many MB",
+        default=None,
+    )
+    ram_files_compress_min_bytes: int = Field(
+        description="With a memory budget, RAMFileManager compresses files this large as they are written",
+        default=64 * 1024,
+    )
     local_packs: list[type["Pack"]] = Field(
-        description="A list of local Pack classes that you wish to be included in the selection process",
+        description="Pack classes defined in your own code, which are selected and looked up like installed packs",
         default_factory=list,
     )
 
@@ -17,3 +17,4 @@ class PackResponse:
     dependencies: list[str] = field(default_factory=list)
     run_args: dict[str, dict[str, str]] = field(default_factory=list)
     categories: list[str] = field(default_factory=list)
+    depends_on: list[str] = field(default_factory=list)
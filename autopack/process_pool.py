@@ -0,0 +1,298 @@
+import atexit
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from typing import TYPE_CHECKING, Any, Optional
+
+from autopack.errors import AutoPackError, AutoPackLoadError, AutoPackTimeoutError
+from autopack.pack_config import PackConfig
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, where the memory cap is not enforced
+    resource = None
+
+if TYPE_CHECKING:
+    from autopack.pack import Pack
+
+# The config settings workers are created with. Everything else (file managers, executors, callbacks) stays behind.
+WORKER_CONFIG_FIELDS = {"workspace_path", "installer_style", "restrict_code_execution", "api_url"}
+
+
+class AutoPackWorkerError(AutoPackError):
+    pass
+
+
+def module_import_root(module_name: str) -> Optional[str]:
+    """The sys.path entry a loaded module was imported from. Installed packs are imported with their `.autopack`
+    directories temporarily added to sys.path (see `autopack.utils.find_module`), so workers need them added again."""
+    module_file = getattr(sys.modules.get(module_name), "__file__", None)
+    if not module_file:
+        return None
+
+    root = os.path.dirname(os.path.abspath(module_file))
+    levels = module_name.count(".") + (1 if os.path.basename(module_file).startswith("__init__.") else 0)
+    for _ in range(levels):
+        root = os.path.dirname(root)
+    return root
+
+
+def _peak_memory_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _worker_main(
+    connection: Connection,
+    module_name: str,
+    class_name: str,
+    sys_path: list[str],
+    config_data: dict[str, Any],
+    max_memory_mb: Optional[float],
+):
+    """The loop of a worker process: import the pack once, then run it for every set of arguments received"""
+    sys.path[:] = sys_path
+    try:
+        pack = import_pack_class(module_name, class_name)(config=PackConfig.create(**config_data))
+    except Exception as e:
+        connection.send(("error", AutoPackLoadError(f"Could not load {module_name}.{class_name}: {e}")))
+        return
+    connection.send(("ready", None))
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        args, kwargs = message
+        try:
+            response = ("ok", pack._run(*args, **kwargs))
+        except Exception as e:
+            response = ("error", e)
+
+        peak_memory = _peak_memory_mb()
+        exceeded_memory = max_memory_mb is not None and peak_memory is not None and peak_memory > max_memory_mb
+        try:
+            connection.send((*response, exceeded_memory))
+        except Exception:
+            # The result or exception couldn't be pickled
+            connection.send(("error", AutoPackWorkerError(f"{type(response[1]).__name__}: {response[1]}"), False))
+
+        if exceeded_memory:
+            return
+
+
+def import_pack_class(module_name: str, class_name: str) -> type["Pack"]:
+    pack_class = importlib.import_module(module_name)
+    for name in class_name.split("."):
+        pack_class = getattr(pack_class, name)
+    return pack_class
+
+
+def run_pack_class(
+    module_name: str,
+    class_name: str,
+    import_root: Optional[str],
+    config_data: dict[str, Any],
+    args: tuple,
+    kwargs: dict[str, Any],
+) -> str:
+    """
+    Import a Pack class, create it with the basic settings of a config, and run it. This is what executors which pickle
+    their jobs (e.g. a ProcessPoolExecutor) run, as a Pack instance can't be pickled: its config holds the executor.
+    The class is passed by name, with the sys.path entry it was imported from (see `module_import_root`), as installed
+    packs can't be imported from the default sys.path.
+    """
+    if import_root and import_root not in sys.path:
+        sys.path.insert(0, import_root)
+    pack_class = import_pack_class(module_name, class_name)
+    return pack_class(config=PackConfig.create(**config_data))._run(*args, **kwargs)
+
+
+class _Worker:
+    def __init__(self, pool: "PackProcessPool"):
+        self.connection, child_connection = pool.context.Pipe()
+        self.process = pool.context.Process(
+            target=_worker_main,
+            args=(
+                child_connection,
+                pool.pack_class.__module__,
+                pool.pack_class.__qualname__,
+                pool.sys_path,
+                pool.config_data,
+                pool.max_memory_mb,
+            ),
+            name=f"autopack-{pool.pack_class.name}",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.calls = 0
+
+        try:
+            status, error = self.connection.recv()
+        except EOFError:
+            status, error = "error", AutoPackWorkerError(f"The worker process for {pool.pack_class.name} crashed")
+        if status != "ready":
+            self.kill()
+            raise error
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.connection.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class PackProcessPool:
+    """
+    A pool of warm worker processes which have a Pack class imported and instantiated, running its `_run` for the
+    caller. Arguments and results are sent over pipes, so they must be picklable. Workers are started on demand (or
+    up front with `warm`) and replaced after `max_calls` calls, once their peak memory exceeds `max_memory_mb`, when
+    they crash, or when a run exceeds its timeout.
+
+    Workers have no LLM, and only get the basic settings of the config (see `WORKER_CONFIG_FIELDS`).
+
+    Args:
+        pack_class (type[Pack]): The Pack to run. Must be importable from its module, i.e. not defined in a function
+        config (PackConfig): The config the workers' Packs are created with
+        size (Optional[int]): The maximum number of workers, defaults to the number of CPUs
+        max_calls (Optional[int]): Recycle a worker after this many calls, never if None
+        max_memory_mb (Optional[float]): Recycle a worker once its peak memory exceeds this, never if None
+    """
+
+    def __init__(
+        self,
+        pack_class: type["Pack"],
+        config: PackConfig,
+        size: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        max_memory_mb: Optional[float] = None,
+    ):
+        self.pack_class = pack_class
+        self.config_data = config.dict(include=WORKER_CONFIG_FIELDS)
+        import_root = module_import_root(pack_class.__module__)
+        self.sys_path = [import_root, *sys.path] if import_root and import_root not in sys.path else list(sys.path)
+        self.size = size or os.cpu_count() or 1
+        self.max_calls = max_calls
+        self.max_memory_mb = max_memory_mb
+        # Workers are spawned rather than forked, as forking a process with running threads isn't safe
+        self.context = multiprocessing.get_context("spawn")
+        self._idle: list[_Worker] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.workers_started = 0
+
+    def warm(self):
+        """Start all the workers now, rather than on the first calls"""
+        with self._lock:
+            missing = self.size - len(self._idle)
+        workers = [self._start_worker() for _ in range(missing)]
+        with self._lock:
+            self._idle.extend(workers)
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self)
+        with self._lock:
+            self.workers_started += 1
+        return worker
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._start_worker()
+
+    def run(self, args: tuple, kwargs: dict[str, Any], timeout: Optional[float] = None) -> str:
+        """Run the pack in a worker with the given arguments. If the run exceeds `timeout` seconds its worker is
+        killed and AutoPackTimeoutError is raised. Exceptions raised by the pack are raised again here."""
+        # Pickled before a worker is taken, so unpicklable arguments are raised to the caller without harming it
+        message = ForkingPickler.dumps((args, kwargs))
+        with self._slots:
+            worker = self._checkout()
+            try:
+                worker.connection.send_bytes(message)
+                finished = worker.connection.poll(timeout)
+                if finished:
+                    status, payload, exceeded_memory = worker.connection.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                raise AutoPackWorkerError(f"The worker process for {self.pack_class.name} crashed")
+            except BaseException:
+                worker.kill()
+                raise
+
+            if not finished:
+                worker.kill()
+                raise AutoPackTimeoutError(f"{self.pack_class.name} did not finish within {timeout} seconds")
+
+            worker.calls += 1
+            if exceeded_memory or (self.max_calls is not None and worker.calls >= self.max_calls):
+                worker.stop()
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+
+        if status == "error":
+            raise payload
+        return payload
+
+    def close(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+_pools: dict[tuple, PackProcessPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_process_pool(pack_class: type["Pack"], config: PackConfig) -> PackProcessPool:
+    """Return the process pool running `pack_class` with the settings of `config`, creating it if needed"""
+    config_data = config.dict(include=WORKER_CONFIG_FIELDS)
+    key = (
+        pack_class,
+        tuple(sorted(config_data.items())),
+        config.process_pool_size,
+        config.process_max_calls,
+        config.process_max_memory_mb,
+    )
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = PackProcessPool(
+                pack_class,
+                config,
+                size=config.process_pool_size,
+                max_calls=config.process_max_calls,
+                max_memory_mb=config.process_max_memory_mb,
+            )
+        return _pools[key]
+
+
+@atexit.register
+def shutdown_process_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
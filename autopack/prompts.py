@@ -40,3 +40,20 @@ Please respond with a comma-separated list of function names, excluding parenthe
 
 By providing more flexibility in the selection and emphasizing the consideration of alternative functions, we can ensure a wider range of function recommendations that align with the given task.
 """
+
+CATEGORY_SELECTION_TEMPLATE = """As the AI Tool Selector your responsibility is to identify categories of functions (tools) that could be useful for an autonomous AI agent to accomplish a given task.
+
+Analyze the task and available categories, and determine which categories could contain useful functions. Consider functions that can achieve the goal directly or indirectly, in combination with other tools.
+
+Only recommend programming categories if the task explicitly requires programming.
+
+Task:
+Your original task, given by the human, is:
+{task}
+{functions_request}
+Available categories:
+You may only recommend categories from the following list:
+{categories}
+
+Please respond with a comma-separated list of category names. Do not include any other explanatory text.
+"""
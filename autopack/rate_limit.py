@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from autopack.pack_config import PackConfig
+
+
+class TokenBucket:
+    """A bucket holding up to `per_minute` units, refilled continuously at `per_minute` units per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """The number of seconds until `amount` units are available. Amounts larger than the bucket are capped, so
+        they wait for a full bucket instead of forever."""
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount: float):
+        # The level can go negative when usage is only known afterwards (e.g. response tokens), delaying later requests
+        self.level -= amount
+
+
+class _Waiter:
+    def __init__(self, tokens: int, notify: Callable[[], Any]):
+        self.tokens = tokens
+        self.notify = notify
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.wait_time = 0.0
+
+
+class LLMRateLimiter:
+    """
+    Paces LLM requests to stay within a provider's rate limits: at most `max_concurrency` requests in flight, and
+    token buckets for `requests_per_minute` and `tokens_per_minute`. Any limit can be left out.
+
+    Requests are granted strictly in the order they arrive, whether they come from threads or from asyncio tasks,
+    so a large request is never starved by smaller ones. Token counts are estimated from the prompt when a request is
+    granted, and the response tokens are charged when it's released.
+
+    Args:
+        max_concurrency (Optional[int]): The maximum number of requests in flight at once
+        requests_per_minute (Optional[int]): The maximum number of requests started per minute
+        tokens_per_minute (Optional[int]): The maximum number of (estimated) prompt and response tokens per minute
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._queue: deque[_Waiter] = deque()
+        self._in_flight = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _dispatch(self):
+        """Grant requests from the front of the queue for as long as the limits allow. Must hold the lock."""
+        while self._queue:
+            if self.max_concurrency is not None and self._in_flight >= self.max_concurrency:
+                # `release` dispatches again
+                return
+
+            waiter = self._queue[0]
+            now = time.monotonic()
+            delay = max(
+                self._requests.delay(1, now) if self._requests else 0.0,
+                self._tokens.delay(waiter.tokens, now) if self._tokens else 0.0,
+            )
+            if delay > 0:
+                self._schedule_dispatch(delay)
+                return
+
+            self._queue.popleft()
+            if self._requests:
+                self._requests.consume(1)
+            if self._tokens:
+                self._tokens.consume(waiter.tokens)
+            self._in_flight += 1
+
+            waiter.granted = True
+            waiter.wait_time = now - waiter.enqueued_at
+            self.requests += 1
+            self.total_wait_time += waiter.wait_time
+            self.max_wait_time = max(self.max_wait_time, waiter.wait_time)
+            waiter.notify()
+
+    def _schedule_dispatch(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._dispatch_later)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _dispatch_later(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until the request may start, returning the time spent waiting in seconds. Call `release` after."""
+        granted = threading.Event()
+        waiter = _Waiter(tokens, granted.set)
+        with self._lock:
+            self._queue.append(waiter)
+            self._dispatch()
+
+        granted.wait()
+        return waiter.wait_time
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Wait until the request may start without blocking the event loop. See `acquire`."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = _Waiter(tokens, notify)
+        with self._lock:
+            self._queue.append(waiter)
+            self._dispatch()
+
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._queue:
+                    self._queue.remove(waiter)
+                    self._dispatch()
+            if waiter.granted:
+                self.release()
+            raise
+
+        return waiter.wait_time
+
+    def release(self, tokens: int = 0):
+        """Signal that a request has finished, charging the `tokens` that weren't known when it was acquired"""
+        with self._lock:
+            self._in_flight -= 1
+            if self._tokens:
+                self._tokens.consume(tokens)
+            self._dispatch()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "total_wait_time": self.total_wait_time,
+                "average_wait_time": self.total_wait_time / self.requests if self.requests else 0.0,
+                "max_wait_time": self.max_wait_time,
+            }
+
+
+_rate_limiters: dict[tuple[Optional[int], Optional[int], Optional[int]], LLMRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_llm_rate_limiter(config: PackConfig) -> Optional[LLMRateLimiter]:
+    """
+    Return the process-wide rate limiter for the LLM limits of `config`, or None if it doesn't set any. Configs with
+    the same limits share a limiter, so every Pack and selection call counts against the same budget.
+    """
+    limits = (config.llm_max_concurrency, config.llm_requests_per_minute, config.llm_tokens_per_minute)
+    if not any(limits):
+        return None
+
+    with _rate_limiters_lock:
+        if limits not in _rate_limiters:
+            _rate_limiters[limits] = LLMRateLimiter(*limits)
+        return _rate_limiters[limits]
@@ -0,0 +1,133 @@
+import threading
+from types import MethodType
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Optional, Union
+
+from autopack.errors import AutoPackError
+from autopack.pack import Pack
+from autopack.pack_config import PackConfig
+
+if TYPE_CHECKING:
+    from autopack.langchain_wrapper import LangchainWrapper
+
+
+class PackRegistry:
+    """
+    Builds each Pack once for a config and LLM, and hands out the shared instance (and LangChain tool) from then on.
+    Instances are created lazily and thread-safely. `reset` closes and forgets all instances; `close` also stops the
+    registry from creating new ones. Packs holding clients or connections release them in `Pack.close`.
+
+    Args:
+        config (PackConfig): The config the packs are created with
+        llm (Optional[Callable]): The LLM passed to the packs
+        allm (Optional[Callable]): The asynchronous LLM passed to the packs
+    """
+
+    def __init__(
+        self,
+        config: Optional[PackConfig] = None,
+        llm: Optional[Callable[[str], str]] = None,
+        allm: Union[None, Callable[[str], str], Coroutine[Any, Any, str]] = None,
+    ):
+        self.config = config or PackConfig.global_config()
+        self.llm = llm
+        self.allm = allm
+        self.closed = False
+        self._instances: dict[type[Pack], Pack] = {}
+        self._tools: dict[type[Pack], "LangchainWrapper"] = {}
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "PackRegistry":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, pack_class: type[Pack]) -> bool:
+        return pack_class in self._instances
+
+    def get(self, pack_class: type[Pack]) -> Pack:
+        """Return the shared instance of `pack_class`, creating it on first use"""
+        pack = self._instances.get(pack_class)
+        if pack is not None:
+            return pack
+
+        with self._lock:
+            if self.closed:
+                raise AutoPackError(f"Cannot create {pack_class.__name__}, the PackRegistry is closed")
+            if pack_class not in self._instances:
+                self._instances[pack_class] = pack_class(config=self.config, llm=self.llm, allm=self.allm)
+            return self._instances[pack_class]
+
+    def get_all(self, pack_classes: list[type[Pack]]) -> list[Pack]:
+        return [self.get(pack_class) for pack_class in pack_classes]
+
+    def langchain_tool(self, pack_class: type[Pack]) -> "LangchainWrapper":
+        """Return the shared LangChain tool wrapping the shared instance of `pack_class`"""
+        tool = self._tools.get(pack_class)
+        if tool is not None:
+            return tool
+
+        pack = self.get(pack_class)
+        with self._lock:
+            if pack_class not in self._tools:
+                self._tools[pack_class] = pack.init_langchain_tool()
+            return self._tools[pack_class]
+
+    def langchain_tools(self, pack_classes: list[type[Pack]]) -> list["LangchainWrapper"]:
+        return [self.langchain_tool(pack_class) for pack_class in pack_classes]
+
+    def reset(self):
+        """Close and forget every instance. New instances are created on the next `get`."""
+        with self._lock:
+            packs = list(self._instances.values())
+            self._instances.clear()
+            self._tools.clear()
+
+        for pack in packs:
+            pack.close()
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+        self.reset()
+
+
+_registries: dict[tuple, PackRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def _llm_key(llm: Any) -> Any:
+    # Bound methods are created anew on every attribute access, so `obj.complete` is keyed on the object and function
+    if isinstance(llm, MethodType):
+        return id(llm.__self__), llm.__func__
+    return id(llm)
+
+
+def get_pack_registry(
+    config: Optional[PackConfig] = None,
+    llm: Optional[Callable[[str], str]] = None,
+    allm: Union[None, Callable[[str], str], Coroutine[Any, Any, str]] = None,
+) -> PackRegistry:
+    """Return the shared registry for a config (the global config by default) and LLM, creating it if needed. Shared
+    registries are kept until they're closed or `reset_pack_registries` is called."""
+    config = config or PackConfig.global_config()
+    # The registry holds on to the config and LLMs (and the objects of bound methods), so their ids can't be reused
+    # while it's registered
+    key = (id(config), _llm_key(llm), _llm_key(allm))
+    with _registries_lock:
+        for stale_key in [key for key, registry in _registries.items() if registry.closed]:
+            del _registries[stale_key]
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = PackRegistry(config, llm, allm)
+        return registry
+
+
+def reset_pack_registries():
+    """Close every shared registry, and the packs in them"""
+    with _registries_lock:
+        registries = list(_registries.values())
+        _registries.clear()
+
+    for registry in registries:
+        registry.close()
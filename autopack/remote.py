@@ -0,0 +1,130 @@
+import asyncio
+import json
+from typing import Any, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from pydantic import BaseModel, Field, create_model
+
+from autopack.errors import AutoPackError, AutoPackNotFoundError
+from autopack.pack import Pack
+from autopack.utils import read_server_token
+
+DEFAULT_SERVER_URL = "http://127.0.0.1:8765"
+
+JSON_SCHEMA_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+class AutoPackRemoteError(AutoPackError):
+    pass
+
+
+class PackServerClient:
+    """
+    A client for a pack server started with `autopack serve`. `get_pack` and `get_all_packs` return Pack classes
+    which behave like the served packs but run them on the server, so the agent process never imports them.
+
+    Args:
+        url (str): The URL of the pack server
+        timeout (Optional[float]): The number of seconds to wait for a response, forever if None
+        token (Optional[str]): The token of the pack server, by default the one `autopack serve` left in the .autopack
+            directory
+    """
+
+    def __init__(self, url: str = DEFAULT_SERVER_URL, timeout: Optional[float] = None, token: Optional[str] = None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.token = token if token is not None else read_server_token()
+
+    def _request(self, method: str, path: str, payload: Optional[dict[str, Any]] = None) -> Any:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = Request(f"{self.url}{path}", data=data, method=method, headers=headers)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except HTTPError as e:
+            try:
+                error = json.load(e).get("error")
+            except ValueError:
+                error = e.reason
+            if e.code == 404:
+                raise AutoPackNotFoundError(error)
+            raise AutoPackRemoteError(error)
+        except URLError as e:
+            raise AutoPackRemoteError(f"Could not connect to the pack server at {self.url}: {e.reason}")
+
+    def list_packs(self) -> list[dict[str, Any]]:
+        return self._request("GET", "/packs")
+
+    def describe(self, pack_id: str) -> dict[str, Any]:
+        return self._request("GET", f"/describe?pack_id={quote(pack_id)}")
+
+    def run(self, pack_id: str, args: dict[str, Any]) -> str:
+        return self._request("POST", "/run", {"pack_id": pack_id, "args": args})["result"]
+
+    async def arun(self, pack_id: str, args: dict[str, Any]) -> str:
+        response = await asyncio.to_thread(self._request, "POST", "/arun", {"pack_id": pack_id, "args": args})
+        return response["result"]
+
+    def get_pack(self, pack_id: str) -> type[Pack]:
+        return remote_pack_class(self.describe(pack_id), self)
+
+    def get_all_packs(self) -> list[type[Pack]]:
+        return [remote_pack_class(info, self) for info in self.list_packs()]
+
+
+def args_schema_from_json_schema(schema: Optional[dict[str, Any]], model_name: str) -> Optional[type[BaseModel]]:
+    """Rebuild an args schema from its JSON schema. Types the schema doesn't spell out are accepted as they are; the
+    server validates the arguments again with the original schema."""
+    if not schema:
+        return None
+
+    required = set(schema.get("required", []))
+    fields = {}
+    for name, field_schema in schema.get("properties", {}).items():
+        field_type = JSON_SCHEMA_TYPES.get(field_schema.get("type"), Any)
+        default = ... if name in required else field_schema.get("default")
+        if name not in required:
+            field_type = Optional[field_type]
+        fields[name] = (field_type, Field(default, description=field_schema.get("description")))
+
+    return create_model(model_name, **fields)
+
+
+def remote_pack_class(info: dict[str, Any], client: PackServerClient) -> type[Pack]:
+    """Create a Pack class from the pack info returned by the server, which runs the pack through `client`"""
+    pack_id = info["pack_id"]
+    class_name = "Remote" + "".join(part.title() for part in info["name"].split("_"))
+
+    def _run(self, *args, **kwargs) -> str:
+        return client.run(pack_id, kwargs)
+
+    async def _arun(self, *args, **kwargs) -> str:
+        return await client.arun(pack_id, kwargs)
+
+    return type(
+        class_name,
+        (Pack,),
+        {
+            "__module__": __name__,
+            "name": info["name"],
+            "description": info["description"],
+            "categories": info.get("categories") or None,
+            "reversible": info.get("reversible", True),
+            "depends_on": info.get("depends_on") or None,
+            "args_schema": args_schema_from_json_schema(info.get("args_schema"), f"{class_name}Args"),
+            "_run": _run,
+            "_arun": _arun,
+        },
+    )
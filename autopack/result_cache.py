@@ -0,0 +1,71 @@
+import json
+import os
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional
+
+from autopack.cache import JSONFileStore, LRUCache
+from autopack.process_pool import WORKER_CONFIG_FIELDS
+from autopack.utils import find_or_create_autopack_dir, llm_identity
+
+if TYPE_CHECKING:
+    from autopack.pack import Pack
+
+_result_caches: dict[type["Pack"], LRUCache] = {}
+_result_caches_lock = Lock()
+
+
+def get_result_cache(pack_class: type["Pack"]) -> Optional[LRUCache]:
+    """
+    Return the result cache of a Pack class, or None if its results shouldn't be cached. Only packs that opt in with
+    `cache_results` and are `reversible` get a cache; irreversible packs always run.
+    """
+    if not pack_class.cache_results or not pack_class.reversible:
+        return None
+
+    result_cache = _result_caches.get(pack_class)
+    if result_cache is not None:
+        return result_cache
+
+    with _result_caches_lock:
+        if pack_class not in _result_caches:
+            store = None
+            if pack_class.result_cache_persist:
+                cache_dir = os.path.join(find_or_create_autopack_dir(), "result_cache")
+                os.makedirs(cache_dir, exist_ok=True)
+                file_name = f"{pack_class.__module__}.{pack_class.__qualname__}.json"
+                store = JSONFileStore(os.path.join(cache_dir, file_name), max_size=pack_class.result_cache_max_size)
+
+            _result_caches[pack_class] = LRUCache(
+                max_size=pack_class.result_cache_max_size, ttl=pack_class.result_cache_ttl, store=store
+            )
+
+        return _result_caches[pack_class]
+
+
+def result_cache_key(pack: "Pack", args: tuple, validated_args: dict[str, Any]) -> str:
+    """Canonicalize a run into a cache key: its arguments, the LLMs of the pack and the config settings it runs with"""
+    llms = [llm_identity(llm) if llm is not None else None for llm in (pack.llm, pack.allm)]
+    config = pack.config.dict(include=WORKER_CONFIG_FIELDS)
+    file_manager = type(pack.config.filesystem_manager)
+    config["filesystem_manager"] = f"{file_manager.__module__}.{file_manager.__qualname__}"
+    return json.dumps([args, validated_args, llms, config], sort_keys=True, default=str)
+
+
+def is_cacheable_result(result: Any) -> bool:
+    # Errors are often transient (e.g. a failed request), so they're never cached
+    return isinstance(result, str) and not result.startswith("Error")
+
+
+def result_cache_stats() -> dict[str, dict[str, Any]]:
+    """Return the size, hits, misses and hit rate of the result cache of each Pack class, by `module.QualifiedName`"""
+    return {
+        f"{pack_class.__module__}.{pack_class.__qualname__}": result_cache.stats()
+        for pack_class, result_cache in _result_caches.items()
+    }
+
+
+def clear_result_caches():
+    with _result_caches_lock:
+        for result_cache in _result_caches.values():
+            result_cache.clear()
+        _result_caches.clear()
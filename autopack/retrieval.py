@@ -0,0 +1,317 @@
+import json
+import math
+import os
+import re
+import uuid
+from collections import Counter
+from json import JSONDecodeError
+from typing import TYPE_CHECKING, Any, Callable, Optional, Protocol, Sequence, Union
+
+from autopack.cache import LRUCache
+from autopack.catalog import catalog_hash, pack_fingerprint, pack_run_args
+from autopack.errors import AutoPackError
+from autopack.pack_response import PackResponse
+from autopack.utils import find_or_create_autopack_dir
+
+if TYPE_CHECKING:
+    from autopack.pack import Pack
+
+PackLike = Union[PackResponse, type["Pack"]]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class Retriever(Protocol):
+    def retrieve(self, query: str, packs: list[PackLike], k: int) -> list[PackLike]:
+        """Return the (at most) `k` packs most relevant to `query`, most relevant first"""
+        ...
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def pack_document(pack: PackLike) -> str:
+    """The text describing a pack that retrievers match against: name, description, categories and arguments"""
+    parts = [pack.name.replace("_", " "), pack.description or ""]
+    parts.extend(pack.categories or [])
+    for name, arg in pack_run_args(pack).items():
+        parts.append(f"{name} {arg.get('description') or ''}")
+
+    return "\n".join(parts)
+
+
+class BM25Index:
+    """An Okapi BM25 index over a list of documents. Runs entirely locally."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths: list[int] = []
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+
+        for doc_index, document in enumerate(documents):
+            term_counts = Counter(tokenize(document))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                self.postings.setdefault(term, []).append((doc_index, count))
+
+        self.average_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        doc_count = len(documents)
+        self.idf = {
+            term: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def scores(self, query: str) -> dict[int, float]:
+        """Return the BM25 score of every document matching at least one query term"""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            for doc_index, count in self.postings.get(term, []):
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_index] / (self.average_length or 1)
+                term_score = self.idf[term] * count * (self.k1 + 1) / (count + self.k1 * length_norm)
+                scores[doc_index] = scores.get(doc_index, 0.0) + term_score
+
+        return scores
+
+    def top_k(self, query: str, k: int) -> list[int]:
+        scores = self.scores(query)
+        ranked = sorted(scores, key=lambda doc_index: (-scores[doc_index], doc_index))[:k]
+
+        # Fill up with unmatched documents so vague queries still get k candidates
+        for doc_index in range(len(self.doc_lengths)):
+            if len(ranked) >= k:
+                break
+            if doc_index not in scores:
+                ranked.append(doc_index)
+
+        return ranked
+
+
+class LexicalRetriever:
+    """Ranks packs against a query with BM25 over their names, descriptions, categories and argument descriptions"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._indexes = LRUCache(max_size=8)
+
+    def index_for(self, packs: list[PackLike]) -> BM25Index:
+        key = catalog_hash(packs)
+        index = self._indexes.get(key)
+        if index is None:
+            index = BM25Index([pack_document(pack) for pack in packs], k1=self.k1, b=self.b)
+            self._indexes.set(key, index)
+        return index
+
+    def retrieve(self, query: str, packs: list[PackLike], k: int) -> list[PackLike]:
+        return [packs[doc_index] for doc_index in self.index_for(packs).top_k(query, k)]
+
+
+_default_retriever = LexicalRetriever()
+
+
+def with_dependencies(selected: list[PackLike], packs: list[PackLike]) -> list[PackLike]:
+    """Add the `depends_on` closure of `selected` from `packs`, returning the result in pool order"""
+    by_id = {pack.pack_id: pack for pack in packs if isinstance(pack, PackResponse)}
+    by_name = {pack.name: pack for pack in packs}
+
+    included = {id(pack) for pack in selected}
+    pending = list(selected)
+    while pending:
+        pack = pending.pop()
+        for dependency_id in pack.depends_on or []:
+            dependency = by_id.get(dependency_id) or by_name.get(dependency_id)
+            if dependency is not None and id(dependency) not in included:
+                included.add(id(dependency))
+                pending.append(dependency)
+
+    return [pack for pack in packs if id(pack) in included]
+
+
+def prefilter_packs(
+    packs: list[PackLike],
+    task_description: str,
+    function_request: Optional[str],
+    k: int,
+    retriever: Optional[Retriever] = None,
+) -> list[PackLike]:
+    """
+    Narrow down a selection pool to the packs most relevant to the task before it is shown to the LLM.
+
+    Args:
+        packs (list[Pack | PackResponse]): The full selection pool
+        task_description (str): A description of the task to be used when selecting tools
+        function_request (Optional[str]): A specific type of function asked for (e.g. a `get_more_tools` function)
+        k (int): The number of candidates to keep, not counting their dependencies
+        retriever (Optional[Retriever]): The retriever used for ranking, defaults to a local BM25 retriever
+
+    Returns:
+        list[Pack | PackResponse]: The top `k` candidates plus the packs they depend on, in pool order
+    """
+    if len(packs) <= k:
+        return packs
+
+    query = "\n".join(filter(None, [task_description, function_request]))
+    candidates = (retriever or _default_retriever).retrieve(query, packs, k)
+
+    return with_dependencies(candidates, packs)
+
+
+class EmbeddingRetriever:
+    """
+    Ranks packs by the cosine similarity between their embeddings and the embedding of the query.
+
+    `embed` can be any callable turning a list of strings into a list of vectors, e.g. a local sentence-transformers
+    model; it is never called for packs whose description has already been embedded. Pack embeddings are stored as a
+    memory-mapped matrix in the .autopack directory so they are shared between processes and survive restarts.
+    Stored embeddings are only reused for the same `model` and vector size. Requires numpy.
+
+    Args:
+        embed (Callable): Turns a list of texts into a list of vectors
+        name (str): Names the stored embeddings, for keeping those of several retrievers apart
+        model (Optional[str]): Identifies the embedding model, defaults to the name of `embed`
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        name: str = "default",
+        model: Optional[str] = None,
+    ):
+        self.embed = embed
+        self.name = name
+        target = embed if hasattr(embed, "__qualname__") else type(embed)
+        self.model = model or f"{getattr(target, '__module__', '')}.{target.__qualname__}"
+        self._catalog_hash: Optional[str] = None
+        self._matrix = None
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(find_or_create_autopack_dir(), f"pack_embeddings_{self.name}.json")
+
+    @property
+    def matrix_path(self) -> Optional[str]:
+        """The stored embeddings, None if there are none yet"""
+        return self._matrix_file(self._load_index())
+
+    def _matrix_file(self, index: dict[str, Any]) -> Optional[str]:
+        return os.path.join(find_or_create_autopack_dir(), index["matrix"]) if index.get("matrix") else None
+
+    def _load_index(self) -> dict[str, Any]:
+        if not os.path.exists(self.index_path):
+            return {}
+
+        with open(self.index_path, "r") as f:
+            try:
+                index = json.load(f)
+            except JSONDecodeError:
+                return {}
+        return index if os.path.exists(self._matrix_file(index) or "") else {}
+
+    def _embed(self, texts: list[str]):
+        np = _import_numpy()
+
+        vectors = np.asarray(self.embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def sync(self, packs: list[PackLike], rebuild: bool = False):
+        """Make sure the stored embeddings match `packs`, embedding only the packs that changed unless `rebuild` is
+        set"""
+        np = _import_numpy()
+
+        key = catalog_hash(packs)
+        if (key == self._catalog_hash and not rebuild) or not packs:
+            return
+
+        index = self._load_index()
+        if rebuild or index.get("catalog_hash") != key or index.get("model") != self.model:
+            index = self._write_embeddings(packs, key, index, reuse=not rebuild)
+
+        self._matrix = np.load(self._matrix_file(index), mmap_mode="r")
+        self._catalog_hash = key
+
+    def _write_embeddings(
+        self, packs: list[PackLike], key: str, stored_index: dict[str, Any], reuse: bool = True
+    ) -> dict[str, Any]:
+        """Store the embeddings of `packs`, reusing the stored rows of unchanged packs, and return the new index"""
+        np = _import_numpy()
+
+        fingerprints = [pack_fingerprint(pack) for pack in packs]
+        stored_rows = {}
+        if reuse and stored_index.get("model") == self.model:
+            stored_rows = {fingerprint: row for row, fingerprint in enumerate(stored_index.get("fingerprints", []))}
+        missing = [row for row, fingerprint in enumerate(fingerprints) if fingerprint not in stored_rows]
+        new_vectors = self._embed([pack_document(packs[row]) for row in missing]) if missing else None
+        dimensions = new_vectors.shape[1] if new_vectors is not None else stored_index["dimensions"]
+        if stored_rows and dimensions != stored_index.get("dimensions"):
+            # The model changed without changing its name, so none of the stored rows fit
+            stored_rows = {}
+            missing = list(range(len(packs)))
+            new_vectors = self._embed([pack_document(pack) for pack in packs])
+            dimensions = new_vectors.shape[1]
+
+        # The new matrix gets a file of its own, which the index only points to once it's complete
+        matrix_name = f"pack_embeddings_{self.name}.{uuid.uuid4().hex}.npy"
+        matrix = np.lib.format.open_memmap(
+            os.path.join(find_or_create_autopack_dir(), matrix_name),
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(packs), dimensions),
+        )
+        if stored_rows:
+            stored_matrix = np.load(self._matrix_file(stored_index), mmap_mode="r")
+            for row, fingerprint in enumerate(fingerprints):
+                if fingerprint in stored_rows:
+                    matrix[row] = stored_matrix[stored_rows[fingerprint]]
+            del stored_matrix
+        if missing:
+            matrix[missing] = new_vectors
+        matrix.flush()
+        del matrix
+
+        index = {
+            "catalog_hash": key,
+            "model": self.model,
+            "dimensions": dimensions,
+            "matrix": matrix_name,
+            "fingerprints": fingerprints,
+        }
+        temporary_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(index, f)
+        os.replace(temporary_path, self.index_path)
+
+        old_matrix_path = self._matrix_file(stored_index)
+        if old_matrix_path is not None:
+            try:
+                os.remove(old_matrix_path)
+            except OSError:
+                # Already replaced by another process, or still mapped (on Windows)
+                pass
+        return index
+
+    def retrieve(self, query: str, packs: list[PackLike], k: int) -> list[PackLike]:
+        np = _import_numpy()
+
+        if not packs:
+            return []
+
+        query_vector = self._embed([query])[0]
+        self.sync(packs)
+        if self._matrix.shape[1] != query_vector.shape[0]:
+            # The model changed without changing its name, so none of the stored rows fit
+            self.sync(packs, rebuild=True)
+        similarities = self._matrix @ query_vector
+        k = min(k, len(packs))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        return [packs[row] for row in top[np.argsort(-similarities[top], kind="stable")]]
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise AutoPackError("EmbeddingRetriever requires numpy, please install it with `pip install numpy`")
+    return numpy
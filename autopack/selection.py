@@ -1,43 +1,24 @@
+import asyncio
 import re
 from typing import Callable, Union, Optional
 
 from langchain.chat_models.base import BaseChatModel
 
 from autopack import Pack
+from autopack.catalog import group_by_category, render_catalog, render_category_summaries, render_pack_line
 from autopack.get_pack import get_all_installed_packs, get_all_pack_info
+from autopack.local_packs import local_packs_by_name
 from autopack.pack_config import PackConfig, InstallerStyle
 from autopack.pack_response import PackResponse
-from autopack.prompts import GET_MORE_TOOLS_TEMPLATE, TOOL_SELECTION_TEMPLATE
-from autopack.utils import call_llm
-
-
-def functions_bulleted_list(packs: list[PackResponse]) -> str:
-    functions_string = []
-    grouped_packs: dict[str, list[type[PackResponse]]] = {}
-    for pack in packs:
-        if not pack.categories:
-            continue
-
-        for category in pack.categories:
-            if category not in grouped_packs:
-                grouped_packs[category] = []
-            grouped_packs[category].append(pack)
-
-    for category, category_packs in grouped_packs.items():
-        functions_string.append(f"\n## {category}")
-        sorted_by_name = sorted(category_packs, key=lambda p: p.name)
-        for pack in sorted_by_name:
-            args = pack.run_args
-            args_signature = ", ".join([f"{arg.get('name')}: {arg.get('type')}" for arg in args.values()])
-            args_descriptions = (
-                "; ".join([f"{arg.get('name')} ({arg.get('type')}): {arg.get('description')}" for arg in args.values()])
-                or "None."
-            )
-            functions_string.append(
-                f"- {pack.name}({args_signature}): {pack.description} | Arguments: {args_descriptions}"
-            )
+from autopack.prompts import CATEGORY_SELECTION_TEMPLATE, GET_MORE_TOOLS_TEMPLATE, TOOL_SELECTION_TEMPLATE
+from autopack.rate_limit import get_llm_rate_limiter
+from autopack.retrieval import Retriever, prefilter_packs
+from autopack.selection_cache import SelectionCache
+from autopack.utils import acall_llm, call_llm, estimate_tokens
+
 
-    return "\n".join(functions_string)
+def functions_bulleted_list(packs: list[Union[PackResponse, type[Pack]]]) -> str:
+    return render_catalog(packs)
 
 
 def select_packs_prompt(
@@ -65,11 +46,78 @@ def select_packs_prompt(
     )
 
 
+def select_categories_prompt(
+    packs: list[Union[Pack, PackResponse]], task_description: str, function_request: Optional[str] = None
+) -> str:
+    """
+    Generate a prompt for the first stage of hierarchical selection, which only shows the LLM a summary of each
+    category.
+
+    Args:
+        packs: (list[Pack | PackResponse]): Packs to include in selection
+        task_description (str): A description of the task to be used when selecting tools.
+        function_request (Optional[str]): A specific type of function asked for (e.g. a `get_more_tools` function).
+
+    Returns:
+        str: A prompt that can be fed to the LLM for category selection.
+    """
+    functions_request = ""
+    if function_request:
+        functions_request = f"\nThe Autonomous AI has made this request for more tools: {function_request}\n"
+
+    return CATEGORY_SELECTION_TEMPLATE.format(
+        task=task_description,
+        functions_request=functions_request,
+        categories=render_category_summaries(packs),
+    )
+
+
+def parse_category_response(response: str, packs: list[Union[Pack, PackResponse]]) -> list[str]:
+    """Extract the names of existing categories from the LLM's category selection, matching case-insensitively"""
+    categories = {category.lower(): category for category in group_by_category(packs)}
+    selected = [categories.get(name.strip("-*# ").lower()) for name in parse_pack_names(response)]
+    return list(dict.fromkeys(category for category in selected if category))
+
+
+def packs_in_categories(
+    packs: list[Union[Pack, PackResponse]], categories: list[str]
+) -> list[Union[Pack, PackResponse]]:
+    return [pack for pack in packs if set(pack.categories or []).intersection(categories)]
+
+
+def get_selection_pool(
+    task_description: str,
+    function_request: Optional[str] = None,
+    config: Optional[PackConfig] = None,
+    retriever: Optional[Retriever] = None,
+    top_k: Optional[int] = None,
+) -> list[Union[PackResponse, type[Pack]]]:
+    """Return the packs eligible for selection, narrowed down to the top candidates if `top_k` is set"""
+    config = config or PackConfig.global_config()
+    if config.installer_style == InstallerStyle.manual:
+        selection_pool = get_all_installed_packs(config)
+    else:
+        # Local packs take precedence over catalog packs of the same name
+        local_packs = local_packs_by_name(config)
+        catalog_packs = [pack for pack in get_all_pack_info() if pack.name not in local_packs]
+        selection_pool = [*local_packs.values(), *catalog_packs]
+
+    top_k = top_k or config.selection_top_k
+    if top_k:
+        selection_pool = prefilter_packs(selection_pool, task_description, function_request, top_k, retriever)
+
+    return selection_pool
+
+
 def select_packs(
     task_description: str,
     llm: Union[BaseChatModel, Callable],
     function_request: Optional[str] = None,
-    config: PackConfig = PackConfig.global_config(),
+    config: Optional[PackConfig] = None,
+    retriever: Optional[Retriever] = None,
+    top_k: Optional[int] = None,
+    cache: Optional[SelectionCache] = None,
+    hierarchical: bool = False,
 ) -> list[type[Pack]]:
     """Given a user input describing the task they wish to accomplish, return a list of Pack IDs that the given LLM
     thinks will be suitable for this task.
@@ -79,31 +127,220 @@ def select_packs(
 
     You can then further filter, install the packs if desired, and then fetch them using get_pack().
 
-    # TODO: Include user-provided packs into selection
-
     Args:
         task_description (str): A description of the task to be used when selecting tools
         llm (BaseChatModel): An LLM which will be used to evaluate the selection
         function_request (Optional[str]): A specific type of function asked for (e.g. a `get_more_tools` function)
         config (PackConfig): Custom config to use
+        retriever (Optional[Retriever]): Ranks packs to narrow down the pool shown to the LLM. Defaults to a local
+            BM25 retriever when `top_k` is set.
+        top_k (Optional[int]): Only show the LLM this many candidates (plus their dependencies). Defaults to
+            `config.selection_top_k`; if neither is set the whole pool is shown.
+        cache (Optional[SelectionCache]): If given, identical selections are answered from the cache
+        hierarchical (bool): If True, first ask the LLM which categories are relevant using only category summaries,
+            then select from the packs in those categories. Uses far fewer tokens for large catalogs.
 
     Returns:
         list[str]: A list of selected Pack IDs
     """
+    config = config or PackConfig.global_config()
+    selection_pool = get_selection_pool(task_description, function_request, config, retriever, top_k)
 
-    if config.installer_style == InstallerStyle.manual:
-        selection_pool = get_all_installed_packs()
-    else:
-        selection_pool = get_all_pack_info()
+    if cache:
+        cache_key = cache.key(task_description, function_request, llm, selection_pool, hierarchical=hierarchical)
+        pack_names = cache.get(cache_key)
+        if pack_names is not None:
+            return resolve_pack_names(pack_names, config)
+
+    if hierarchical:
+        response = call_llm(
+            select_categories_prompt(selection_pool, task_description, function_request),
+            llm,
+            config.llm_cache,
+            get_llm_rate_limiter(config),
+        )
+        categories = parse_category_response(response, selection_pool)
+        if categories:
+            selection_pool = packs_in_categories(selection_pool, categories)
 
     prompt = select_packs_prompt(selection_pool, task_description, function_request)
 
-    response = call_llm(prompt, llm)
+    response = call_llm(prompt, llm, config.llm_cache, get_llm_rate_limiter(config))
+    pack_names = parse_pack_names(response)
 
-    return parse_selection_response(response)
+    if cache:
+        cache.set(cache_key, pack_names)
 
+    return resolve_pack_names(pack_names, config)
 
-def parse_selection_response(response: str) -> list[type[Pack]]:
+
+def _header_tokens(categories: set[str]) -> int:
+    return sum(estimate_tokens(f"\n## {category}\n") for category in categories)
+
+
+def shard_packs(
+    packs: list[Union[PackResponse, type[Pack]]], max_shard_tokens: int
+) -> list[list[Union[PackResponse, type[Pack]]]]:
+    """
+    Split packs into shards whose rendered catalog stays within roughly `max_shard_tokens`, keeping categories
+    together where possible.
+    """
+    shards: list[list[Union[PackResponse, type[Pack]]]] = []
+    shard: list[Union[PackResponse, type[Pack]]] = []
+    shard_categories: set[str] = set()
+    shard_tokens = 0
+    # Packs with several categories are only sent once, in the shard of their first category
+    seen: set[int] = set()
+    for category, category_packs in group_by_category(packs).items():
+        for pack in sorted(category_packs, key=lambda p: p.name):
+            if id(pack) in seen:
+                continue
+            seen.add(id(pack))
+
+            # The shard's catalog lists the pack under each of its categories, with a header for each new category
+            line_tokens = estimate_tokens(render_pack_line(pack) + "\n")
+            pack_categories = set(pack.categories)
+            pack_tokens = line_tokens * len(pack_categories) + _header_tokens(pack_categories - shard_categories)
+            if shard and shard_tokens + pack_tokens > max_shard_tokens:
+                shards.append(shard)
+                shard, shard_categories, shard_tokens = [], set(), 0
+                pack_tokens = line_tokens * len(pack_categories) + _header_tokens(pack_categories)
+
+            shard.append(pack)
+            shard_categories |= pack_categories
+            shard_tokens += pack_tokens
+
+    if shard:
+        shards.append(shard)
+
+    return shards
+
+
+async def aselect_packs(
+    task_description: str,
+    llm: Union[BaseChatModel, Callable],
+    function_request: Optional[str] = None,
+    config: Optional[PackConfig] = None,
+    retriever: Optional[Retriever] = None,
+    top_k: Optional[int] = None,
+    max_shard_tokens: int = 4000,
+    max_concurrency: int = 4,
+    reduce: bool = False,
+    cache: Optional[SelectionCache] = None,
+    hierarchical: bool = False,
+) -> list[type[Pack]]:
+    """Asynchronously select packs for a task, like `select_packs`, but without putting the whole catalog in a single
+    prompt.
+
+    The selection pool is split into shards of at most `max_shard_tokens` (estimated) catalog tokens which are
+    evaluated concurrently. The selected names are merged and deduplicated, and optionally narrowed down by a final
+    "reduce" prompt containing only the selected packs.
+
+    Args:
+        task_description (str): A description of the task to be used when selecting tools
+        llm (BaseChatModel): An LLM which will be used to evaluate the selection
+        function_request (Optional[str]): A specific type of function asked for (e.g. a `get_more_tools` function)
+        config (PackConfig): Custom config to use
+        retriever (Optional[Retriever]): See `select_packs`
+        top_k (Optional[int]): See `select_packs`
+        max_shard_tokens (int): The approximate token budget of the catalog in each shard prompt
+        max_concurrency (int): The maximum number of shard prompts in flight at once
+        reduce (bool): If True, and there was more than one shard, ask the LLM to pick from the merged selection
+        cache (Optional[SelectionCache]): See `select_packs`
+        hierarchical (bool): See `select_packs`. Each selected category is then evaluated concurrently.
+
+    Returns:
+        list[str]: A list of selected Pack IDs
+    """
+    config = config or PackConfig.global_config()
+    selection_pool = await asyncio.to_thread(
+        get_selection_pool, task_description, function_request, config, retriever, top_k
+    )
+
+    if cache:
+        cache_key = await asyncio.to_thread(
+            cache.key,
+            task_description,
+            function_request,
+            llm,
+            selection_pool,
+            hierarchical=hierarchical,
+            reduce=reduce,
+            max_shard_tokens=max_shard_tokens,
+        )
+        pack_names = cache.get(cache_key)
+        if pack_names is not None:
+            return await asyncio.to_thread(resolve_pack_names, pack_names, config)
+
+    shards = []
+    if hierarchical:
+        response = await acall_llm(
+            select_categories_prompt(selection_pool, task_description, function_request),
+            llm,
+            config.llm_cache,
+            get_llm_rate_limiter(config),
+        )
+        grouped_packs = group_by_category(selection_pool)
+        # Packs in several of the selected categories are only sent once, with the first of them
+        seen: set[int] = set()
+        for category in parse_category_response(response, selection_pool):
+            category_packs = [pack for pack in grouped_packs[category] if id(pack) not in seen]
+            seen.update(id(pack) for pack in category_packs)
+            if category_packs:
+                shards.extend(shard_packs(category_packs, max_shard_tokens))
+    if not shards:
+        shards = shard_packs(selection_pool, max_shard_tokens)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def select_from_shard(shard: list[Union[PackResponse, type[Pack]]]) -> list[str]:
+        async with semaphore:
+            response = await acall_llm(
+                select_packs_prompt(shard, task_description, function_request),
+                llm,
+                config.llm_cache,
+                get_llm_rate_limiter(config),
+            )
+        return parse_pack_names(response)
+
+    shard_selections = await asyncio.gather(*[select_from_shard(shard) for shard in shards])
+    pack_names = list(dict.fromkeys(name for names in shard_selections for name in names))
+
+    if reduce and len(shards) > 1:
+        candidates = [pack for pack in selection_pool if pack.name in pack_names]
+        response = await acall_llm(
+            select_packs_prompt(candidates, task_description, function_request),
+            llm,
+            config.llm_cache,
+            get_llm_rate_limiter(config),
+        )
+        pack_names = parse_pack_names(response)
+
+    if cache:
+        cache.set(cache_key, pack_names)
+
+    return await asyncio.to_thread(resolve_pack_names, pack_names, config)
+
+
+def parse_pack_names(response: str) -> list[str]:
+    """Split an LLM selection response into pack names, removing any arguments"""
+    pack_names = [r.split("(")[0].strip() for r in re.split(r"(?<=\w),|\n", response)]
+    return [pack_name for pack_name in pack_names if pack_name]
+
+
+def resolve_pack_names(pack_names: list[str], config: Optional[PackConfig] = None) -> list[type[Pack]]:
+    """Return the installed packs matching the given names, in order. Names of uninstalled packs are skipped. Local
+    packs are resolved from memory; the installed packs are only loaded if a name isn't a local pack."""
+    config = config or PackConfig.global_config()
+    installed_packs = dict(local_packs_by_name(config))
+    if not all(pack_name in installed_packs for pack_name in pack_names):
+        for pack in get_all_installed_packs(config):
+            installed_packs.setdefault(pack.name, pack)
+
+    # If the pack selected is not installed it is skipped. This error should've been caught elsewhere
+    return [installed_packs[pack_name] for pack_name in pack_names if pack_name in installed_packs]
+
+
+def parse_selection_response(response: str, config: Optional[PackConfig] = None) -> list[type[Pack]]:
     """
     Parse the response from the LLM and extract pack IDs.
 
@@ -111,20 +348,10 @@ def parse_selection_response(response: str) -> list[type[Pack]]:
 
     Args:
         response (str): The response from the LLM.
+        config (PackConfig): Custom config to use, for its local packs
 
     Returns:
         list[str]: A list of parsed pack IDs.
     """
-    pack_names = [r.split("(")[0].strip() for r in re.split(r"(?<=\w),|\n", response)]
-
-    installed_packs = get_all_installed_packs()
-    selected_packs = []
-    for pack_name in pack_names:
-        try:
-            selected_pack = next(pack for pack in installed_packs if pack.name == pack_name)
-            selected_packs.append(selected_pack)
-        except StopIteration:
-            # This means that the pack selected is not installed. This error should've been caught elsewhere
-            continue
-
-    return selected_packs
+    config = config or PackConfig.global_config()
+    return resolve_pack_names(parse_pack_names(response), config)
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+from typing import Any, Callable, Optional, Union
+
+from langchain.chat_models.base import BaseChatModel
+
+from autopack.cache import JSONFileStore, LRUCache
+from autopack.catalog import catalog_hash
+from autopack.pack import Pack
+from autopack.pack_response import PackResponse
+from autopack.utils import find_or_create_autopack_dir, llm_identity, load_metadata_file
+
+
+class SelectionCache:
+    """
+    Caches the pack names chosen by `select_packs`, so that repeated selections for the same task skip the LLM.
+
+    Entries are keyed on the normalized task description and function request, the identity of the LLM, a hash of the
+    selection pool, a hash of the installed packs and the options of the selection (e.g. `hierarchical`). Any change
+    to the catalog or the installation therefore results in new keys, and the stale entries age out of the cache.
+
+    Args:
+        max_size (int): The maximum number of selections kept in memory
+        ttl (Optional[float]): The number of seconds a selection stays valid, forever if None
+        persist (bool): If True, selections are also stored in `selection_cache.json` in the .autopack directory
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None, persist: bool = False):
+        store = None
+        if persist:
+            store = JSONFileStore(
+                os.path.join(find_or_create_autopack_dir(), "selection_cache.json"), max_size=max_size
+            )
+        self._cache = LRUCache(max_size=max_size, ttl=ttl, store=store)
+
+    @staticmethod
+    def key(
+        task_description: str,
+        function_request: Optional[str],
+        llm: Union[BaseChatModel, Callable],
+        selection_pool: list[Union[PackResponse, type[Pack]]],
+        **options: Any,
+    ) -> str:
+        installed_hash = hashlib.sha256(json.dumps(load_metadata_file(), sort_keys=True).encode("utf-8")).hexdigest()
+        key_data = [
+            normalize_text(task_description),
+            normalize_text(function_request or ""),
+            llm_identity(llm),
+            catalog_hash(selection_pool),
+            installed_hash,
+            sorted(options.items()),
+        ]
+        return hashlib.sha256(json.dumps(key_data).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[list[str]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, pack_names: list[str]):
+        self._cache.set(key, pack_names)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
@@ -0,0 +1,198 @@
+import asyncio
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+from autopack.errors import AutoPackError
+from autopack.get_pack import get_all_pack_info, try_get_pack
+from autopack.installation import install_pack
+from autopack.local_packs import local_packs_by_name
+from autopack.pack import Pack
+from autopack.pack_config import InstallerStyle, PackConfig
+from autopack.selection import get_selection_pool, select_packs_prompt
+from autopack.utils import load_metadata_file
+
+SEPARATOR_PATTERN = re.compile(r"(?<=\w),|\n")
+
+# Installs write the shared metadata file, so only one runs at a time
+_install_lock = Lock()
+
+
+class SelectionStreamParser:
+    """Incrementally splits a streamed selection response into pack names, using the same rules as
+    `parse_selection_response`. Each name is only returned once."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.seen: set[str] = set()
+
+    def _emit(self, segment: str) -> list[str]:
+        pack_name = segment.split("(")[0].strip()
+        if not pack_name or pack_name in self.seen:
+            return []
+        self.seen.add(pack_name)
+        return [pack_name]
+
+    def feed(self, token: str) -> list[str]:
+        """Add a chunk of the response, returning any pack names it completed"""
+        self.buffer += token
+        pack_names = []
+        while True:
+            match = SEPARATOR_PATTERN.search(self.buffer)
+            if not match:
+                break
+            segment, self.buffer = self.buffer[: match.start()], self.buffer[match.end() :]
+            pack_names.extend(self._emit(segment))
+
+        return pack_names
+
+    def close(self) -> list[str]:
+        """Signal the end of the response, returning the final pack name if there is one"""
+        segment, self.buffer = self.buffer, ""
+        return self._emit(segment)
+
+
+class PackNameResolver:
+    """Resolves selected pack names to Pack classes, importing only the selected packs and installing them if allowed"""
+
+    def __init__(self, config: Optional[PackConfig] = None):
+        self.config = config or PackConfig.global_config()
+        self._installed_ids: Optional[dict[str, str]] = None
+        self._catalog_ids: Optional[dict[str, str]] = None
+        self._lock = Lock()
+
+    def installed_ids(self) -> dict[str, str]:
+        with self._lock:
+            if self._installed_ids is None:
+                self._installed_ids = {data.get("name"): pack_id for pack_id, data in load_metadata_file().items()}
+            return self._installed_ids
+
+    def catalog_ids(self) -> dict[str, str]:
+        with self._lock:
+            if self._catalog_ids is None:
+                self._catalog_ids = {pack.name: pack.pack_id for pack in get_all_pack_info()}
+            return self._catalog_ids
+
+    def resolve(self, pack_name: str) -> Optional[type[Pack]]:
+        local_pack = local_packs_by_name(self.config).get(pack_name)
+        if local_pack:
+            return local_pack
+
+        pack_id = self.installed_ids().get(pack_name)
+        if pack_id:
+            return try_get_pack(pack_id)
+
+        if self.config.installer_style == InstallerStyle.manual:
+            return None
+
+        pack_id = self.catalog_ids().get(pack_name)
+        if not pack_id:
+            return None
+
+        try:
+            with _install_lock:
+                return install_pack(pack_id, config=self.config)
+        except AutoPackError:
+            return None
+
+
+def stream_selection_response(
+    tokens: Iterable[str], config: Optional[PackConfig] = None, max_workers: int = 4
+) -> Iterator[type[Pack]]:
+    """
+    Parse a streamed selection response, yielding each selected pack as soon as it is available.
+
+    Every pack name is resolved (and, depending on `config.installer_style`, installed) in a background thread as soon
+    as it is complete, so loading the packs overlaps with the rest of the LLM's generation. Packs are yielded in the
+    order they were selected; names which can't be resolved are skipped.
+
+    Args:
+        tokens (Iterable[str]): The chunks of the LLM response as they arrive
+        config (PackConfig): Custom config to use
+        max_workers (int): The maximum number of packs resolved at the same time
+
+    Yields:
+        Pack: The selected packs
+    """
+    config = config or PackConfig.global_config()
+    parser = SelectionStreamParser()
+    resolver = PackNameResolver(config)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for token in tokens:
+            for pack_name in parser.feed(token):
+                pending.append(executor.submit(resolver.resolve, pack_name))
+            while pending and pending[0].done():
+                pack = pending.popleft().result()
+                if pack:
+                    yield pack
+
+        for pack_name in parser.close():
+            pending.append(executor.submit(resolver.resolve, pack_name))
+        while pending:
+            pack = pending.popleft().result()
+            if pack:
+                yield pack
+
+
+async def astream_selection_response(
+    tokens: AsyncIterable[str], config: Optional[PackConfig] = None
+) -> AsyncIterator[type[Pack]]:
+    """
+    Asynchronously parse a streamed selection response, yielding each selected pack as soon as it is available. See
+    `stream_selection_response`.
+    """
+    config = config or PackConfig.global_config()
+    parser = SelectionStreamParser()
+    resolver = PackNameResolver(config)
+    pending = deque()
+    try:
+        async for token in tokens:
+            for pack_name in parser.feed(token):
+                pending.append(asyncio.ensure_future(asyncio.to_thread(resolver.resolve, pack_name)))
+            while pending and pending[0].done():
+                pack = pending.popleft().result()
+                if pack:
+                    yield pack
+
+        for pack_name in parser.close():
+            pending.append(asyncio.ensure_future(asyncio.to_thread(resolver.resolve, pack_name)))
+        while pending:
+            pack = await pending.popleft()
+            if pack:
+                yield pack
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def stream_select_packs(
+    task_description: str,
+    stream_llm: Callable[[str], Iterable[str]],
+    function_request: Optional[str] = None,
+    config: Optional[PackConfig] = None,
+) -> Iterator[type[Pack]]:
+    """Like `select_packs`, but with an LLM that streams its response (a callable taking the prompt and returning an
+    iterator of tokens). Packs are yielded as soon as they are selected and loaded."""
+    config = config or PackConfig.global_config()
+    selection_pool = get_selection_pool(task_description, function_request, config)
+    prompt = select_packs_prompt(selection_pool, task_description, function_request)
+
+    yield from stream_selection_response(stream_llm(prompt), config=config)
+
+
+async def astream_select_packs(
+    task_description: str,
+    stream_llm: Callable[[str], AsyncIterable[str]],
+    function_request: Optional[str] = None,
+    config: Optional[PackConfig] = None,
+) -> AsyncIterator[type[Pack]]:
+    """Asynchronous `stream_select_packs`, for LLMs returning an async iterator of tokens"""
+    config = config or PackConfig.global_config()
+    selection_pool = await asyncio.to_thread(get_selection_pool, task_description, function_request, config)
+    prompt = select_packs_prompt(selection_pool, task_description, function_request)
+
+    async for pack in astream_selection_response(stream_llm(prompt), config=config):
+        yield pack
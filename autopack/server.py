@@ -0,0 +1,230 @@
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+from autopack.get_pack import try_get_pack
+from autopack.local_packs import local_packs_by_id
+from autopack.pack import Pack
+from autopack.pack_config import PackConfig
+from autopack.utils import load_metadata_file, server_token_path, write_server_token
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+
+def pack_info(pack_id: str, pack_class: type[Pack]) -> dict[str, Any]:
+    """Describe a pack in the JSON protocol of the pack server"""
+    return {
+        "pack_id": pack_id,
+        "name": pack_class.name,
+        "description": pack_class.description,
+        "categories": pack_class.categories or [],
+        "reversible": pack_class.reversible,
+        "depends_on": pack_class.depends_on or [],
+        "args_schema": pack_class.args_schema.schema() if pack_class.args_schema else None,
+    }
+
+
+class PackServer:
+    """
+    Keeps packs loaded in a long-lived process and runs them for clients over localhost HTTP, so short-lived agent
+    processes don't have to import them. See `autopack.remote` for the client.
+
+    The protocol is plain JSON:
+    - `GET /packs`: the info of every pack (see `pack_info`)
+    - `GET /describe?pack_id=...`: the info of one pack
+    - `POST /run` and `POST /arun` with `{"pack_id": ..., "args": {...}}`: run a pack, returning `{"result": ...}`
+
+    Every request needs the server's token as `Authorization: Bearer <token>`, and POST requests need a
+    `Content-Type: application/json` header, so web pages open in a browser can't run packs. A server bound to localhost
+    also only accepts localhost Host headers, against DNS rebinding. `autopack serve` shares its token with clients in
+    the .autopack directory (see `utils.read_server_token`).
+
+    Errors are returned as `{"error": ...}` with a 4xx or 5xx status. Packs run without an LLM.
+
+    Args:
+        packs (Optional[dict[str, type[Pack]]]): The packs to serve by pack ID, defaults to the local packs of the
+            config and all installed packs
+        config (PackConfig): The config the packs are created with
+        host (str): The interface to listen on. Only bind to localhost unless the network is trusted
+        port (int): The port to listen on, 0 for any free port
+        token (Optional[str]): The token clients authenticate with, a random one by default
+    """
+
+    def __init__(
+        self,
+        packs: Optional[dict[str, type[Pack]]] = None,
+        config: Optional[PackConfig] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        token: Optional[str] = None,
+    ):
+        config = config or PackConfig.global_config()
+        self.host = host
+        self.token = token or secrets.token_urlsafe(32)
+        self.packs = packs if packs is not None else installed_packs_by_id(config)
+        self.config = config
+        self._instances: dict[str, Pack] = {}
+        self._instances_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="autopack-server-loop", daemon=True)
+        self._server_thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), PackRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.pack_server = self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def instance(self, pack_id: str) -> Optional[Pack]:
+        """Return the shared instance of a pack, creating it on first use"""
+        pack_class = self.packs.get(pack_id)
+        if pack_class is None:
+            return None
+
+        with self._instances_lock:
+            if pack_id not in self._instances:
+                self._instances[pack_id] = pack_class(config=self.config)
+            return self._instances[pack_id]
+
+    def run(self, pack_id: str, args: dict[str, Any]) -> str:
+        return self.instance(pack_id).run(**args)
+
+    def arun(self, pack_id: str, args: dict[str, Any]) -> str:
+        # Async runs share one event loop instead of each starting their own, but the request thread still waits for
+        # the result
+        return asyncio.run_coroutine_threadsafe(self.instance(pack_id).arun(**args), self._loop).result()
+
+    def serve_forever(self):
+        if not self._loop_thread.is_alive():
+            self._loop_thread.start()
+        self.httpd.serve_forever()
+
+    def start(self) -> "PackServer":
+        """Serve in a background thread"""
+        self._server_thread = threading.Thread(target=self.serve_forever, name="autopack-server", daemon=True)
+        self._server_thread.start()
+        return self
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class PackRequestHandler(BaseHTTPRequestHandler):
+    server: ThreadingHTTPServer
+
+    @property
+    def pack_server(self) -> PackServer:
+        return self.server.pack_server
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def _send_json(self, status: int, body: Any):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self, json_body: bool = False) -> bool:
+        """Check the Host, token and (for requests with a body) Content-Type, sending an error if one is wrong"""
+        if self.pack_server.host in LOCAL_HOSTS:
+            host = urlparse(f"//{self.headers.get('Host', '')}").hostname
+            if host not in LOCAL_HOSTS:
+                self._send_json(403, {"error": f"Host {host} not allowed"})
+                return False
+
+        expected = f"Bearer {self.pack_server.token}".encode("utf-8")
+        if not hmac.compare_digest(self.headers.get("Authorization", "").encode("utf-8"), expected):
+            self._send_json(401, {"error": "Missing or invalid token of the pack server"})
+            return False
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if json_body and content_type != "application/json":
+            self._send_json(415, {"error": "Requests must have Content-Type application/json"})
+            return False
+
+        return True
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+
+        url = urlparse(self.path)
+        if url.path == "/packs":
+            packs = self.pack_server.packs
+            return self._send_json(200, [pack_info(pack_id, pack_class) for pack_id, pack_class in packs.items()])
+
+        if url.path == "/describe":
+            pack_id = parse_qs(url.query).get("pack_id", [""])[0]
+            pack_class = self.pack_server.packs.get(pack_id)
+            if pack_class is None:
+                return self._send_json(404, {"error": f"Pack {pack_id} not found"})
+            return self._send_json(200, pack_info(pack_id, pack_class))
+
+        self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self):
+        if not self._authorized(json_body=True):
+            return
+
+        url = urlparse(self.path)
+        if url.path not in ("/run", "/arun"):
+            return self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            pack_id, args = request["pack_id"], request.get("args") or {}
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send_json(400, {"error": f"Invalid request: {e}"})
+
+        if pack_id not in self.pack_server.packs:
+            return self._send_json(404, {"error": f"Pack {pack_id} not found"})
+
+        try:
+            if url.path == "/run":
+                result = self.pack_server.run(pack_id, args)
+            else:
+                result = self.pack_server.arun(pack_id, args)
+        except Exception as e:
+            return self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        self._send_json(200, {"result": result})
+
+
+def installed_packs_by_id(config: Optional[PackConfig] = None) -> dict[str, type[Pack]]:
+    """Return the local packs of the config and all installed packs, by pack ID"""
+    config = config or PackConfig.global_config()
+    packs = dict(local_packs_by_id(config))
+    for pack_id in load_metadata_file().keys():
+        pack_class = try_get_pack(pack_id, config=config)
+        if pack_class:
+            packs[pack_id] = pack_class
+
+    return packs
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    server = PackServer(host=host, port=port)
+    write_server_token(server.token)
+    print(f"Serving {len(server.packs)} packs on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        os.remove(server_token_path())
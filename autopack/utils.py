@@ -1,23 +1,31 @@
+import asyncio
 import importlib
+import itertools
 import json
 import os
 import re
 import sys
+import threading
+import uuid
+import weakref
 from asyncio import iscoroutinefunction
+from functools import partial, wraps
 from json import JSONDecodeError
-from types import ModuleType
+from types import BuiltinFunctionType, FunctionType, MappingProxyType, MethodType, ModuleType
 from typing import Callable
-from typing import TYPE_CHECKING, Any, Union, Coroutine
+from typing import TYPE_CHECKING, Any, Union, Coroutine, Optional
 
 from langchain.chat_models.base import BaseChatModel
 from langchain.schema import SystemMessage, BaseMessage
-from pydantic import BaseModel
+from pydantic import BaseModel, validate_model
 
 from autopack.errors import AutoPackLoadError
 from autopack.pack_response import PackResponse
 
 if TYPE_CHECKING:
+    from autopack.llm_cache import LLMResponseCache
     from autopack.pack import Pack
+    from autopack.rate_limit import LLMRateLimiter
 
 
 def find_or_create_autopack_dir(depth=0) -> str:
@@ -65,6 +73,27 @@ def write_metadata_file(data: dict[str, Any]):
         json.dump(data, f)
 
 
+def server_token_path() -> str:
+    """The file in which `autopack serve` shares its token with clients"""
+    return os.path.join(find_or_create_autopack_dir(), "server_token")
+
+
+def read_server_token() -> Optional[str]:
+    """Return the token of the running pack server, None if there is none"""
+    try:
+        with open(server_token_path()) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_server_token(token: str):
+    # Only readable by the user, who is trusted to run the served packs
+    fd = os.open(server_token_path(), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+
+
 def find_module(pack_data: PackResponse) -> ModuleType:
     autopack_dir = find_or_create_autopack_dir()
     package_path = pack_data.package_path
@@ -101,36 +130,90 @@ def fetch_pack_object(pack_data: PackResponse) -> type["Pack"]:
         )
 
 
-def format_packs_to_openai_functions(packs: list["Pack"]) -> list[dict[str, Any]]:
+def format_packs_to_openai_functions(packs: list[Union["Pack", type["Pack"]]]) -> list[dict[str, Any]]:
     return [format_pack_to_openai_function(pack) for pack in packs]
 
 
-def format_pack_to_openai_function(pack: "Pack") -> dict[str, Any]:
+def format_pack_to_openai_function(pack: Union["Pack", type["Pack"]]) -> dict[str, Any]:
+    pack_class = pack if isinstance(pack, type) else type(pack)
+    return thaw(_frozen_openai_function(pack_class))
+
+
+def openai_functions_json(packs: list[Union["Pack", type["Pack"]]]) -> bytes:
+    """Return the OpenAI function definitions of the packs as serialized JSON, joined from the JSON precomputed per Pack
+    class"""
+    pack_classes = [pack if isinstance(pack, type) else type(pack) for pack in packs]
+    return b"[" + b", ".join(_openai_function_json(pack_class) for pack_class in pack_classes) + b"]"
+
+
+_missing = object()
+
+
+def cached_on_class(function: Callable[[Optional[type]], Any]) -> Callable[[Optional[type]], Any]:
+    """
+    Memoize a function of a single class (or None) by storing its result on the class itself. Unlike `lru_cache`, the
+    result goes away together with the class, so classes created at runtime (e.g. remote packs, which are recreated on
+    every refresh) don't accumulate. Subclasses get their own result.
+    """
+    attribute = f"_autopack_cached_{function.__name__}"
+    results_for_none = []
+
+    @wraps(function)
+    def wrapper(cls: Optional[type]) -> Any:
+        if cls is None:
+            if not results_for_none:
+                results_for_none.append(function(None))
+            return results_for_none[0]
+
+        # Only the class's own __dict__, an inherited result would belong to the parent class
+        result = cls.__dict__.get(attribute, _missing)
+        if result is _missing:
+            result = function(cls)
+            setattr(cls, attribute, result)
+        return result
+
+    return wrapper
+
+
+@cached_on_class
+def _frozen_openai_function(pack_class: type["Pack"]) -> MappingProxyType:
     # Change this if/when other LLMs support functions
     required = []
-    run_args = pack.args
-    for arg_name, arg in run_args.items():
-        arg_required = arg.pop("required", [])
-        if arg_required:
+    properties = {}
+    for arg_name, arg in _frozen_run_args(pack_class.args_schema).items():
+        if arg.get("required"):
             required.append(arg_name)
-        run_args[arg_name] = arg
+        properties[arg_name] = {key: value for key, value in arg.items() if key != "required"}
+
+    return freeze(
+        {
+            "name": pack_class.name,
+            "description": pack_class.description,
+            "parameters": {"type": "object", "properties": properties},
+            "required": required,
+        }
+    )
 
-    return {
-        "name": pack.name,
-        "description": pack.description,
-        "parameters": {"type": "object", "properties": run_args},
-        "required": required,
-    }
+
+@cached_on_class
+def _openai_function_json(pack_class: type["Pack"]) -> bytes:
+    return json.dumps(thaw(_frozen_openai_function(pack_class))).encode("utf-8")
 
 
 def run_args_from_args_schema(args_schema: type[BaseModel]) -> dict[str, dict[str, str]]:
+    return thaw(_frozen_run_args(args_schema))
+
+
+@cached_on_class
+def _frozen_run_args(args_schema: Optional[type[BaseModel]]) -> MappingProxyType:
+    # Generating a pydantic schema is slow, so it's done only once per schema and the result kept immutable
     run_args: dict[str, Any] = {}
     if not args_schema:
-        return run_args
+        return freeze(run_args)
 
     schema = args_schema.schema()
     if not schema:
-        return run_args
+        return freeze(run_args)
 
     for param_name, param in schema.get("properties", []).items():
         run_args[param_name] = {
@@ -139,55 +222,136 @@ def run_args_from_args_schema(args_schema: type[BaseModel]) -> dict[str, dict[st
             "description": param.get("description", ""),
             "required": param_name in schema.get("required", []),
         }
-    return run_args
+    return freeze(run_args)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts and lists into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively copy the output of `freeze` back into dicts and lists"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+@cached_on_class
+def compile_args_validator(args_schema: Optional[type[BaseModel]]) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """
+    Return a function which validates run arguments against `args_schema`, returning the validated and coerced values.
+    Validators are cached per schema, and validation doesn't construct a model instance. Without a schema the
+    arguments are returned as-is.
+
+    Raises:
+        ValidationError: From the returned function, if any arguments are invalid.
+    """
+    if not args_schema:
+        return lambda kwargs: kwargs
+
+    def validate(kwargs: dict[str, Any]) -> dict[str, Any]:
+        values, _, error = validate_model(args_schema, kwargs)
+        if error:
+            raise error
+        return values
+
+    return validate
 
 
 def functions_bulleted_list(packs: list[Union[PackResponse, type["Pack"]]]) -> str:
-    functions_string = []
-    grouped_packs: dict[str, list[type[Pack]]] = {}
-    for pack in packs:
-        if not pack.categories:
-            continue
-
-        for category in pack.categories:
-            if category not in grouped_packs:
-                grouped_packs[category] = []
-            grouped_packs[category].append(pack)
-
-    for category, category_packs in grouped_packs.items():
-        functions_string.append(f"\n## {category}")
-        sorted_by_name = sorted(category_packs, key=lambda p: p.name)
-        for pack in sorted_by_name:
-            if hasattr(pack, "run_args"):
-                args = pack.run_args
-            elif hasattr(pack, "args_schema") and pack.args_schema:
-                args = run_args_from_args_schema(pack.args_schema)
-            else:
-                args = {}
-
-            args_signature = ", ".join([f"{name}: {arg.get('type')}" for name, arg in args.items()])
-            args_descriptions = (
-                "; ".join([f"{name} ({arg.get('type')}): {arg.get('description')}" for name, arg in args.items()])
-                or "None."
-            )
-            functions_string.append(
-                f"- {pack.name}({args_signature}): {pack.description} | Arguments: {args_descriptions}"
-            )
-
-    return "\n".join(functions_string)
+    from autopack.catalog import render_catalog
+
+    return render_catalog(packs)
 
 
 def functions_summary(packs: list["Pack"]) -> str:
     return ", ".join([f"{pack.name}" for pack in packs])
 
 
+def estimate_tokens(text: str) -> int:
+    """A rough, tokenizer-free estimate of the number of LLM tokens in `text` (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
 def extract_unique_directory_name(repo_url: str) -> str:
     repo_name = repo_url.split("/")[-1].replace(".git", "")
     # Replace any non-alphanumeric characters with underscores
     return re.sub(r"[^a-zA-Z0-9]", "_", repo_name)
 
 
-def call_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str]]) -> str:
+# Tokens of the LLM objects that are identified by instance rather than by name, see `_instance_token`
+_instance_tokens: dict[int, tuple[Callable[[], Any], str]] = {}
+_instance_token_counter = itertools.count()
+_instance_tokens_lock = threading.Lock()
+# Persisted caches are shared between processes, whose tokens must not collide
+_process_nonce = uuid.uuid4().hex
+
+
+def _instance_token(obj: Any) -> str:
+    """A token unique to a live object. Unlike its id, it's never reused once the object is garbage collected."""
+    key = id(obj)
+    with _instance_tokens_lock:
+        entry = _instance_tokens.get(key)
+        if entry is not None and entry[0]() is obj:
+            return entry[1]
+
+        token = f"{_process_nonce}:{next(_instance_token_counter)}"
+
+        def forget(ref):
+            if _instance_tokens.get(key, (None,))[0] is ref:
+                del _instance_tokens[key]
+
+        try:
+            ref = weakref.ref(obj, forget)
+        except TypeError:
+            # The object can't be weakly referenced, so it's kept alive to stop its id from being reused
+            ref = partial(lambda obj: obj, obj)
+        _instance_tokens[key] = (ref, token)
+        return token
+
+
+def llm_identity(llm: Union[BaseChatModel, Callable[[str], str], Coroutine[Any, Any, str]]) -> str:
+    """
+    Return a string identifying an LLM, which cached responses are keyed on. An LLM can name itself with a
+    `cache_namespace` attribute. Otherwise chat models are identified by their class and model parameters, and
+    module-level functions by their name. Anything else (partials, bound methods, callable objects, closures) can wrap
+    any model, so it's identified per instance, and its cached responses aren't shared between processes.
+    """
+    namespace = getattr(llm, "cache_namespace", None)
+    if namespace is not None:
+        return f"namespace:{namespace}"
+
+    if isinstance(llm, BaseChatModel):
+        params = json.dumps(getattr(llm, "_identifying_params", {}), sort_keys=True, default=str)
+        return f"{type(llm).__module__}.{type(llm).__qualname__}:{params}"
+
+    if isinstance(llm, MethodType):
+        # Bound methods are created anew on every attribute access, so the object they're bound to is identified
+        return f"{llm.__module__}.{llm.__qualname__}@{_instance_token(llm.__self__)}"
+
+    if isinstance(llm, (FunctionType, BuiltinFunctionType)):
+        name = f"{llm.__module__}.{llm.__qualname__}"
+        if getattr(llm, "__closure__", None) is None and "<locals>" not in llm.__qualname__:
+            return name
+        return f"{name}@{_instance_token(llm)}"
+
+    target = llm if hasattr(llm, "__qualname__") else type(llm)
+    return f"{getattr(target, '__module__', '')}.{target.__qualname__}@{_instance_token(llm)}"
+
+
+def call_llm(
+    prompt: str,
+    llm: Union[BaseChatModel, Callable[[str], str]],
+    cache: Optional["LLMResponseCache"] = None,
+    rate_limiter: Optional["LLMRateLimiter"] = None,
+) -> str:
     """
     Call the given LLM  with the specified prompt.
 
@@ -196,24 +360,31 @@ def call_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str]]) -> st
     Args:
         prompt (str): The prompt to feed to the LLM.
         llm (Union[BaseChatModel, Callable]): The LLM to call.
+        cache (Optional[LLMResponseCache]): If given, responses are reused for identical prompts to the same LLM.
+        rate_limiter (Optional[LLMRateLimiter]): If given, the request waits its turn to stay within the rate limits.
 
     Returns:
         str: The response from the LLM.
     """
-    if isinstance(llm, BaseChatModel):
-        message = SystemMessage(content=prompt)
-        response = llm(messages=[message])
-        if isinstance(response, BaseMessage):
-            return response.content
-        else:
-            return response
-    elif callable(llm):
-        return llm(prompt)
+    if cache is None:
+        return _call_llm_limited(prompt, llm, rate_limiter)
 
-    return ""
+    key = cache.key(prompt, llm)
+    response = cache.get(key)
+    if response is None:
+        response = _call_llm_limited(prompt, llm, rate_limiter)
+        if isinstance(response, str):
+            cache.set(key, response)
+
+    return response
 
 
-async def acall_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str], Coroutine[Any, Any, str]]) -> str:
+async def acall_llm(
+    prompt: str,
+    llm: Union[BaseChatModel, Callable[[str], str], Coroutine[Any, Any, str]],
+    cache: Optional["LLMResponseCache"] = None,
+    rate_limiter: Optional["LLMRateLimiter"] = None,
+) -> str:
     """
     Asynchronously call the given LLM  with the specified prompt.
 
@@ -222,10 +393,72 @@ async def acall_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str],
     Args:
         prompt (str): The prompt to feed to the LLM.
         llm (Union[BaseChatModel, Awaitable[Callable]]): The LLM to call.
+        cache (Optional[LLMResponseCache]): If given, responses are reused for identical prompts to the same LLM.
+        rate_limiter (Optional[LLMRateLimiter]): If given, the request waits its turn to stay within the rate limits.
 
     Returns:
         str: The response from the LLM.
     """
+    if cache is None:
+        return await _acall_llm_limited(prompt, llm, rate_limiter)
+
+    key = cache.key(prompt, llm)
+    response = cache.get(key)
+    if response is None:
+        response = await _acall_llm_limited(prompt, llm, rate_limiter)
+        if isinstance(response, str):
+            cache.set(key, response)
+
+    return response
+
+
+def _call_llm_limited(
+    prompt: str, llm: Union[BaseChatModel, Callable[[str], str]], rate_limiter: Optional["LLMRateLimiter"]
+) -> str:
+    if rate_limiter is None:
+        return _call_llm(prompt, llm)
+
+    rate_limiter.acquire(estimate_tokens(prompt))
+    response = ""
+    try:
+        response = _call_llm(prompt, llm)
+    finally:
+        rate_limiter.release(estimate_tokens(response) if isinstance(response, str) else 0)
+    return response
+
+
+async def _acall_llm_limited(
+    prompt: str,
+    llm: Union[BaseChatModel, Callable[[str], str], Coroutine[Any, Any, str]],
+    rate_limiter: Optional["LLMRateLimiter"],
+) -> str:
+    if rate_limiter is None:
+        return await _acall_llm(prompt, llm)
+
+    await rate_limiter.aacquire(estimate_tokens(prompt))
+    response = ""
+    try:
+        response = await _acall_llm(prompt, llm)
+    finally:
+        rate_limiter.release(estimate_tokens(response) if isinstance(response, str) else 0)
+    return response
+
+
+def _call_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str]]) -> str:
+    if isinstance(llm, BaseChatModel):
+        message = SystemMessage(content=prompt)
+        response = llm(messages=[message])
+        if isinstance(response, BaseMessage):
+            return response.content
+        else:
+            return response
+    elif callable(llm):
+        return llm(prompt)
+
+    return ""
+
+
+async def _acall_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str], Coroutine[Any, Any, str]]) -> str:
     if isinstance(llm, BaseChatModel):
         message = SystemMessage(content=prompt)
         response = await llm._call_async(messages=[message])
@@ -236,4 +469,4 @@ async def acall_llm(prompt: str, llm: Union[BaseChatModel, Callable[[str], str],
     elif callable(llm) and iscoroutinefunction(llm):
         return await llm(prompt)
 
-    return call_llm(prompt, llm)  # type: ignore
+    return await asyncio.to_thread(_call_llm, prompt, llm)  # type: ignore
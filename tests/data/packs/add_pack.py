@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+from autopack import Pack
+
+
+class AddArgs(BaseModel):
+    a: int = Field(..., description="The first number")
+    b: int = Field(0, description="The second number")
+
+
+class AddPack(Pack):
+    name = "add"
+    description = "Adds two numbers"
+    categories = ["Math"]
+    args_schema = AddArgs
+    pass_validated_args = True
+
+    def _run(self, a: int, b: int) -> str:
+        return str(a + b)
+
+    async def _arun(self, a: int, b: int) -> str:
+        return self._run(a, b)
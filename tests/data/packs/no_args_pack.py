@@ -0,0 +1,13 @@
+from autopack import Pack
+
+
+class NoArgsPack(Pack):
+    name = "no_args"
+    description = "Takes no arguments"
+    categories = ["Nothingness"]
+
+    def _run(self) -> str:
+        return "no args"
+
+    async def _arun(self) -> str:
+        return self._run()
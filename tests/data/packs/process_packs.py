@@ -0,0 +1,41 @@
+import os
+import time
+
+from pydantic import BaseModel, Field
+
+from autopack import Pack
+from autopack.pack_config import ExecutionMode
+
+
+class ProcessArgs(BaseModel):
+    action: str = Field("pid", description="One of 'pid', 'workspace', 'sleep', 'raise', 'crash' or 'allocate'")
+
+
+class ProcessPack(Pack):
+    name = "process_pack"
+    description = "Reports on the process it runs in, or misbehaves on request"
+    categories = ["Nothingness"]
+    args_schema = ProcessArgs
+    execution_mode = ExecutionMode.process_pool
+
+    def _run(self, action: str = "pid") -> str:
+        if action == "workspace":
+            return self.config.workspace_path
+        if action == "sleep":
+            time.sleep(5)
+        if action == "raise":
+            raise ValueError("misbehaving on request")
+        if action == "crash":
+            os._exit(1)
+        if action == "allocate":
+            # Raise the peak memory of the worker
+            bytearray(64 * 1024 * 1024)
+        return str(os.getpid())
+
+
+class StreamingProcessPack(ProcessPack):
+    name = "streaming_process_pack"
+
+    def _stream(self, action: str = "pid"):
+        yield "streamed in "
+        yield self._run(action)
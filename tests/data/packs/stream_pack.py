@@ -0,0 +1,78 @@
+import asyncio
+import itertools
+import threading
+import time
+
+from pydantic import BaseModel, Field
+
+from autopack import Pack
+
+
+class CountArgs(BaseModel):
+    count: int = Field(..., description="How many lines to produce")
+
+
+class CountPack(Pack):
+    name = "count"
+    description = "Produces one line per number up to count"
+    categories = ["Nothingness"]
+    args_schema = CountArgs
+    pass_validated_args = True
+
+    def _run(self, count: int) -> str:
+        return "".join(self._stream(count))
+
+    def _stream(self, count: int):
+        for number in range(count):
+            yield f"{number}\n"
+
+
+class AsyncCountPack(CountPack):
+    name = "async_count"
+
+    async def _astream(self, count: int):
+        for number in range(count):
+            await asyncio.sleep(0)
+            yield f"{number}\n"
+
+
+streamed_counts = []
+
+
+class SlowCountPack(CountPack):
+    name = "slow_count"
+    run_timeout = 0.5
+    cache_results = True
+
+    def _stream(self, count: int):
+        streamed_counts.append(count)
+        for number in range(count):
+            time.sleep(0.05)
+            yield f"{number}\n"
+
+
+class AsyncSlowCountPack(SlowCountPack):
+    name = "async_slow_count"
+
+    async def _astream(self, count: int):
+        streamed_counts.append(count)
+        for number in range(count):
+            await asyncio.sleep(0.05)
+            yield f"{number}\n"
+
+
+endless_counts = []
+endless_count_closed = threading.Event()
+
+
+class EndlessCountPack(CountPack):
+    name = "endless_count"
+    run_timeout = 5.0
+
+    def _stream(self, count: int):
+        try:
+            for number in itertools.count():
+                endless_counts.append(number)
+                yield f"{number}\n"
+        finally:
+            endless_count_closed.set()
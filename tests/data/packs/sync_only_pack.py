@@ -0,0 +1,31 @@
+import threading
+
+from pydantic import BaseModel, Field
+
+from autopack import Pack
+
+
+class SyncOnlyArgs(BaseModel):
+    text: str = Field(..., description="The text to echo")
+
+
+class SyncOnlyPack(Pack):
+    name = "sync_only"
+    description = "Echoes the text and the name of the thread it ran in"
+    categories = ["Nothingness"]
+    args_schema = SyncOnlyArgs
+
+    def _run(self, text: str) -> str:
+        return f"{text} from {threading.current_thread().name}"
+
+
+release_blocking_pack = threading.Event()
+
+
+class BlockingPack(Pack):
+    name = "blocking"
+    description = "Blocks until released, then returns 'released'"
+    categories = ["Nothingness"]
+
+    def _run(self) -> str:
+        return "released" if release_blocking_pack.wait(timeout=5) else "timed out"
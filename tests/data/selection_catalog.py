@@ -0,0 +1,84 @@
+"""A small, realistic pack catalog with labelled tasks, used to measure the recall of selection prefilters."""
+from autopack.pack_response import PackResponse
+
+
+def _pack(name: str, description: str, categories: list[str], args: dict[str, str], depends_on=None) -> PackResponse:
+    return PackResponse(
+        pack_id=f"autopack/catalog/{name}",
+        package_path=f"catalog.{name}",
+        class_name="".join(part.title() for part in name.split("_")),
+        repo_url="https://github.com/AutoPackAI/catalog.git",
+        name=name,
+        description=description,
+        run_args={
+            arg_name: {"name": arg_name, "type": "string", "description": arg_description}
+            for arg_name, arg_description in args.items()
+        },
+        categories=categories,
+        depends_on=depends_on or [],
+    )
+
+
+CATALOG = [
+    _pack("web_search", "Search the web for a query and return the top results", ["Web"], {"query": "Search terms"}),
+    _pack("fetch_url", "Download the HTML content of a web page", ["Web"], {"url": "The URL of the page to fetch"}),
+    _pack(
+        "scrape_links",
+        "Extract all hyperlinks from a web page",
+        ["Web"],
+        {"url": "The URL of the page to scrape"},
+        depends_on=["autopack/catalog/fetch_url"],
+    ),
+    _pack("wikipedia_lookup", "Look up the summary of a Wikipedia article", ["Web", "Knowledge"], {"title": "Title"}),
+    _pack("news_headlines", "Get the latest news headlines for a topic", ["Web", "News"], {"topic": "News topic"}),
+    _pack("read_file", "Read the contents of a file from the workspace", ["Files"], {"path": "Path of the file"}),
+    _pack(
+        "write_file",
+        "Write text content to a file in the workspace",
+        ["Files"],
+        {"path": "Path of the file", "content": "Text to write"},
+        depends_on=["autopack/catalog/read_file"],
+    ),
+    _pack("delete_file", "Delete a file from the workspace", ["Files"], {"path": "Path of the file to delete"}),
+    _pack("list_directory", "List the files in a workspace directory", ["Files"], {"path": "Directory path"}),
+    _pack("execute_python", "Execute Python code and return its output", ["Programming"], {"code": "Python code"}),
+    _pack("run_shell_command", "Run a shell command in a terminal", ["Programming"], {"command": "Command to run"}),
+    _pack("lint_python", "Run a linter on Python source code", ["Programming"], {"code": "Python source code"}),
+    _pack("git_commit", "Commit staged changes in a git repository", ["Programming"], {"message": "Commit message"}),
+    _pack("os_name_and_version", "Get the name and version of the operating system", ["System"], {}),
+    _pack("disk_usage", "Get the total, used and free disk space", ["System"], {}),
+    _pack("cpu_usage", "Get the current CPU load percentage", ["System"], {}),
+    _pack("list_processes", "List the running processes on the machine", ["System"], {}),
+    _pack("send_email", "Send an email message to a recipient", ["Communication"], {"to": "Recipient address"}),
+    _pack("send_slack_message", "Post a message to a Slack channel", ["Communication"], {"channel": "Channel name"}),
+    _pack("read_inbox", "Read the latest emails from the inbox", ["Communication"], {"count": "Number of emails"}),
+    _pack("text_summarization", "Summarize a long piece of text", ["Text"], {"text": "The text to summarize"}),
+    _pack("translate_text", "Translate text into another language", ["Text"], {"text": "Text", "language": "Target"}),
+    _pack("sentiment_analysis", "Determine whether text is positive or negative", ["Text"], {"text": "Text"}),
+    _pack("spell_check", "Correct spelling mistakes in text", ["Text"], {"text": "Text to correct"}),
+    _pack("calculator", "Evaluate a mathematical expression", ["Math"], {"expression": "Arithmetic expression"}),
+    _pack("unit_converter", "Convert a value between units of measurement", ["Math"], {"value": "Value and units"}),
+    _pack("current_weather", "Get the current weather forecast for a city", ["Weather"], {"city": "City name"}),
+    _pack("stock_price", "Get the latest stock price for a ticker symbol", ["Finance"], {"ticker": "Ticker symbol"}),
+    _pack("currency_exchange", "Convert money between currencies", ["Finance"], {"amount": "Amount and currency"}),
+    _pack("create_calendar_event", "Create an event in the calendar", ["Productivity"], {"title": "Event title"}),
+    _pack("set_reminder", "Set a reminder at a given time", ["Productivity"], {"time": "When to remind"}),
+    _pack("generate_image", "Generate an image from a text prompt", ["Images"], {"prompt": "Image description"}),
+]
+
+# Each task with the packs that a good selection must include
+TASKS = [
+    (
+        "Put my current OS version, OS name, and free disk space into a file called my_computer.txt",
+        ["os_name_and_version", "disk_usage", "write_file"],
+    ),
+    ("Search the web for the best pizza places in Chicago and summarize the results", ["web_search"]),
+    ("Email my boss a summary of today's news headlines about AI", ["send_email", "news_headlines"]),
+    ("Translate the contents of notes.txt into French", ["read_file", "translate_text"]),
+    ("What is the weather in Paris right now?", ["current_weather"]),
+    ("Write a Python script that prints the first 10 primes and run it", ["execute_python"]),
+    ("Convert 100 US dollars to euros", ["currency_exchange"]),
+    ("Collect every link on https://example.com", ["scrape_links", "fetch_url"]),
+    ("Remind me to call my mother at 5pm", ["set_reminder"]),
+    ("Check which processes are using the most CPU", ["list_processes", "cpu_usage"]),
+]
@@ -0,0 +1,38 @@
+import os
+
+from autopack.benchmark import benchmark_selection, generate_catalog, stub_llm, write_benchmark_packs
+from autopack.selection import select_packs_prompt
+from autopack.utils import find_or_create_autopack_dir, load_metadata_file
+
+
+def test_generate_catalog_is_deterministic():
+    assert generate_catalog(50) == generate_catalog(50)
+    assert len({pack.name for pack in generate_catalog(50)}) == 50
+
+
+def test_stub_llm():
+    catalog = generate_catalog(20)
+    selected = stub_llm(select_packs_prompt(catalog, "Do something")).split(", ")
+
+    assert len(selected) == 5
+    assert set(selected).issubset({pack.name for pack in catalog})
+
+
+def test_benchmark_selection():
+    results = benchmark_selection([20], installed_size=5, repeat=1)
+
+    assert results[0]["size"] == 20
+    assert results[0]["installed"] == 5
+    assert results[0]["prompt_tokens"] > 0
+    assert "parse_selection_response" in results[0]["timings"]
+    assert "AUTOPACK_DIR" not in os.environ
+
+
+def test_write_benchmark_packs_leaves_the_catalog_alone():
+    catalog = generate_catalog(3)
+    package_paths = [pack.package_path for pack in catalog]
+
+    write_benchmark_packs(find_or_create_autopack_dir(), catalog, "benchmark_packs_3")
+
+    assert [pack.package_path for pack in catalog] == package_paths
+    assert load_metadata_file()[catalog[0].pack_id]["package_path"] == "benchmark_packs_3"
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from autopack.cache import JSONFileStore, LRUCache, SQLiteStore
+
+
+def test_lru_eviction():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 0, "hit_rate": 1.0}
+
+
+def test_ttl():
+    cache = LRUCache(ttl=10)
+    with patch("autopack.cache.time.time", return_value=100):
+        cache.set("a", 1)
+    with patch("autopack.cache.time.time", return_value=105):
+        assert cache.get("a") == 1
+    with patch("autopack.cache.time.time", return_value=111):
+        assert cache.get("a") is None
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_json_file_store():
+    LRUCache(store=JSONFileStore("cache.json")).set("a", [1, 2])
+
+    cache = LRUCache(store=JSONFileStore("cache.json"))
+    assert cache.get("a") == [1, 2]
+    assert cache.hits == 1
+
+
+def test_json_file_store_shared_between_instances():
+    first, second = JSONFileStore("cache.json"), JSONFileStore("cache.json")
+    first.set("a", 1, None)
+    second.set("b", 2, None)
+    first.set("c", 3, None)
+
+    assert JSONFileStore("cache.json").get("b") == (2, None)
+    assert second.get("c") == (3, None)
+    second.delete("a")
+    assert first.get("a") is None
+
+
+def test_sqlite_store():
+    LRUCache(store=SQLiteStore("cache.sqlite3")).set("a", {"b": 1})
+
+    cache = LRUCache(store=SQLiteStore("cache.sqlite3"))
+    assert cache.get("a") == {"b": 1}
+    assert cache.hits == 1
+
+
+def test_sqlite_store_max_size():
+    store = SQLiteStore("cache.sqlite3", max_size=2)
+    for key in ["a", "b", "c"]:
+        store.set(key, key, None)
+
+    assert store.get("a") is None
+    assert store.get("c") == ("c", None)
+    assert store._connection.execute("SELECT COUNT(*) FROM entries").fetchone() == (2,)
+    plan = store._connection.execute(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM entries ORDER BY written_at, rowid"
+    ).fetchall()
+    assert "entries_written_at" in str(plan)
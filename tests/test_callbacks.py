@@ -0,0 +1,137 @@
+import pytest
+
+from autopack.callbacks import MetricsCollector, PackCallbackHandler
+from autopack.pack_config import PackConfig
+from tests.data.packs.add_pack import AddPack
+from tests.data.packs.noop import NoopPack
+
+
+class RecordingHandler(PackCallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    def before_run(self, pack, kwargs):
+        self.events.append(("before_run", pack.name, kwargs))
+
+    def after_run(self, pack, kwargs, result, duration):
+        self.events.append(("after_run", pack.name, result))
+
+    def on_error(self, pack, kwargs, error, duration):
+        self.events.append(("on_error", pack.name, type(error).__name__))
+
+    def on_llm_call(self, pack, prompt, response, duration):
+        self.events.append(("on_llm_call", pack.name, prompt, response))
+
+
+class FailingPack(NoopPack):
+    name = "failing_pack"
+
+    def _run(self, query: str):
+        raise ValueError(query)
+
+    async def _arun(self, query: str):
+        raise ValueError(query)
+
+
+class LLMPack(NoopPack):
+    name = "llm_pack"
+
+    def _run(self, query: str):
+        return self.call_llm(query)
+
+    async def _arun(self, query: str):
+        return await self.acall_llm(query)
+
+
+def test_hooks_are_called_in_order():
+    handler = RecordingHandler()
+    pack = NoopPack(callbacks=[handler])
+
+    assert pack.run(query="hi") == "noop: hi"
+    assert handler.events == [("before_run", "noop_pack", {"query": "hi"}), ("after_run", "noop_pack", "noop: hi")]
+
+
+def test_config_and_pack_handlers_are_both_called():
+    config_handler, pack_handler = RecordingHandler(), RecordingHandler()
+    pack = NoopPack(config=PackConfig(callbacks=[config_handler]), callbacks=[pack_handler])
+
+    pack.run(query="hi")
+
+    assert config_handler.events == pack_handler.events
+    assert len(pack_handler.events) == 2
+
+
+def test_on_error_is_called_and_exception_propagates():
+    handler = RecordingHandler()
+    pack = FailingPack(callbacks=[handler])
+
+    with pytest.raises(ValueError):
+        pack.run(query="boom")
+
+    assert handler.events[-1] == ("on_error", "failing_pack", "ValueError")
+
+
+def test_invalid_arguments_call_on_error_only():
+    handler = RecordingHandler()
+    pack = NoopPack(callbacks=[handler])
+
+    assert pack.run().startswith("Error: Invalid arguments")
+    assert handler.events == [("on_error", "noop_pack", "ValidationError")]
+
+
+def test_run_many_calls_hooks_for_every_run():
+    metrics = MetricsCollector()
+    pack = AddPack(callbacks=[metrics])
+
+    pack.run_many([{"a": 1}, {"a": "not a number"}, {"a": 2, "b": 3}])
+
+    stats = metrics.to_dict("add")
+    assert stats["calls"] == 2
+    assert stats["validation_failures"] == 1
+
+
+def test_metrics_collector():
+    metrics = MetricsCollector()
+    config = PackConfig(callbacks=[metrics])
+    NoopPack(config=config).run(query="hi")
+    NoopPack(config=config).run(query="there")
+    with pytest.raises(ValueError):
+        FailingPack(config=config).run(query="boom")
+    LLMPack(config=config, llm=lambda prompt: prompt.upper()).run(query="hello")
+
+    stats = metrics.to_dict()
+
+    assert stats["noop_pack"]["calls"] == 2
+    assert stats["noop_pack"]["output_characters"] == len("noop: hi") + len("noop: there")
+    assert stats["noop_pack"]["latency_seconds"]["count"] == 2
+    assert stats["failing_pack"]["calls"] == 1
+    assert stats["failing_pack"]["errors"] == 1
+    assert stats["llm_pack"]["llm_calls"] == 1
+    assert stats["llm_pack"]["llm_seconds"] <= stats["llm_pack"]["latency_seconds"]["sum"]
+
+
+@pytest.mark.asyncio
+async def test_async_hooks():
+    handler = RecordingHandler()
+    pack = LLMPack(callbacks=[handler], allm=_async_llm)
+
+    assert await pack.arun(query="hi") == "HI"
+    assert [event[0] for event in handler.events] == ["before_run", "on_llm_call", "after_run"]
+
+
+async def _async_llm(prompt: str) -> str:
+    return prompt.upper()
+
+
+def test_prometheus_export():
+    metrics = MetricsCollector(buckets=(0.1, 1.0))
+    NoopPack(callbacks=[metrics]).run(query="hi")
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE autopack_pack_calls_total counter" in text
+    assert 'autopack_pack_calls_total{pack="noop_pack"} 1' in text
+    assert 'autopack_pack_duration_seconds_bucket{pack="noop_pack",le="0.1"} 1' in text
+    assert 'autopack_pack_duration_seconds_bucket{pack="noop_pack",le="+Inf"} 1' in text
+    assert 'autopack_pack_duration_seconds_count{pack="noop_pack"} 1' in text
+    assert text.endswith("\n")
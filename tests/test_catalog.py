@@ -0,0 +1,75 @@
+import pytest
+from pydantic import Field, create_model
+
+from autopack.catalog import catalog_hash, category_sections, clear_catalog_cache, render_catalog, _catalog_cache
+from autopack.pack_response import PackResponse
+from tests.data.packs.noop import NoopPack
+from tests.data.packs.summarization_pack import SummarizationPack
+
+
+def pack_response(name: str, categories: list[str], description: str = "Does things") -> PackResponse:
+    return PackResponse(
+        pack_id=f"autopack/tests/{name}",
+        package_path=f"tests.{name}",
+        class_name=name.title(),
+        repo_url="https://github.com/AutoPackAI/tests.git",
+        name=name,
+        description=description,
+        run_args={"query": {"name": "query", "type": "string", "description": "The query"}},
+        categories=categories,
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog_cache():
+    clear_catalog_cache()
+
+
+def test_render_catalog():
+    packs = [pack_response("web_search", ["Web"]), pack_response("a_fetch", ["Web", "Files"]), NoopPack]
+
+    assert render_catalog(packs) == (
+        "\n## Web\n"
+        "- a_fetch(query: string): Does things | Arguments: query (string): The query\n"
+        "- web_search(query: string): Does things | Arguments: query (string): The query\n"
+        "\n## Files\n"
+        "- a_fetch(query: string): Does things | Arguments: query (string): The query\n"
+        "\n## Nothingness\n"
+        "- noop_pack(query: string): Does nothing | Arguments: query (string): The thing to do nothing about"
+    )
+
+
+def test_render_catalog_is_cached_on_content():
+    packs = [pack_response("web_search", ["Web"]), SummarizationPack]
+
+    first = render_catalog(packs)
+    second = render_catalog([pack_response("web_search", ["Web"]), SummarizationPack])
+
+    assert first == second
+    assert _catalog_cache.hits == 1
+
+    changed = render_catalog([pack_response("web_search", ["Web"], description="Searches the web"), SummarizationPack])
+    assert "Searches the web" in changed
+    assert _catalog_cache.hits == 1
+
+
+def test_catalog_hash_depends_on_order():
+    first, second = pack_response("one", ["Web"]), pack_response("two", ["Web"])
+    assert catalog_hash([first, second]) != catalog_hash([second, first])
+    assert catalog_hash([first, second]) == catalog_hash([pack_response("one", ["Web"]), second])
+
+
+def test_category_sections():
+    sections = category_sections([pack_response("one", ["Web", "Files"]), pack_response("two", ["Files"])])
+
+    assert list(sections.keys()) == ["Web", "Files"]
+    assert sections["Files"].count("\n- ") == 2
+
+
+def test_render_catalog_follows_runtime_schema_changes():
+    def remote_pack(args: dict[str, str]) -> type:
+        args_schema = create_model("RemoteArgs", **{name: (str, Field(..., description=d)) for name, d in args.items()})
+        return type("RemotePack", (NoopPack,), {"__module__": __name__, "args_schema": args_schema})
+
+    assert "query (string): The query" in render_catalog([remote_pack({"query": "The query"})])
+    assert "url (string): The URL" in render_catalog([remote_pack({"url": "The URL"})])
@@ -0,0 +1,51 @@
+import importlib.util
+import os
+
+from autopack.installation import compile_installed_packs, compile_pack_bytecode
+
+
+def write_pack_source(directory: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    source_path = os.path.join(directory, "some_pack.py")
+    with open(source_path, "w") as f:
+        f.write("VALUE = 1\n")
+    return source_path
+
+
+def test_compile_pack_bytecode():
+    source_path = write_pack_source("my_pack")
+
+    assert compile_pack_bytecode("my_pack")
+    assert os.path.exists(importlib.util.cache_from_source(source_path))
+
+
+def test_compile_pack_bytecode_unchecked_hash():
+    source_path = write_pack_source("my_pack")
+
+    assert compile_pack_bytecode("my_pack", unchecked_hash=True)
+    with open(importlib.util.cache_from_source(source_path), "rb") as f:
+        header = f.read(8)
+    # Flags word: bit 0 = hash based, bit 1 = check_source
+    assert int.from_bytes(header[4:8], "little") == 0b01
+
+
+def pyc_flags(source_path: str) -> int:
+    with open(importlib.util.cache_from_source(source_path), "rb") as f:
+        return int.from_bytes(f.read(8)[4:8], "little")
+
+
+def test_compile_unchecked_hash_after_install():
+    # Installing writes timestamp pycs, which `autopack compile --unchecked-hash` has to replace
+    source_path = write_pack_source("my_pack")
+    assert compile_pack_bytecode("my_pack")
+    assert pyc_flags(source_path) == 0
+
+    assert compile_pack_bytecode("my_pack", unchecked_hash=True)
+    assert pyc_flags(source_path) == 0b01
+
+
+def test_compile_installed_packs():
+    source_path = write_pack_source(os.path.join(".autopack", "some_repo"))
+
+    assert compile_installed_packs()
+    assert os.path.exists(importlib.util.cache_from_source(os.path.abspath(source_path)))
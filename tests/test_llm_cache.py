@@ -0,0 +1,160 @@
+from functools import partial
+
+import pytest
+
+from autopack.llm_cache import LLMResponseCache
+from autopack.pack_config import PackConfig
+from autopack.selection import select_packs
+from autopack.utils import acall_llm, call_llm
+from tests.data.packs.noop import NoopPack
+
+prompts = []
+
+
+def counting_llm(prompt: str) -> str:
+    prompts.append(prompt)
+    return prompt.upper()
+
+
+def other_llm(prompt: str) -> str:
+    prompts.append(prompt)
+    return prompt.lower()
+
+
+async def async_counting_llm(prompt: str) -> str:
+    return counting_llm(prompt)
+
+
+class LLMPack(NoopPack):
+    name = "llm_pack"
+
+    def _run(self, query: str):
+        return self.call_llm(query)
+
+    async def _arun(self, query: str):
+        return await self.acall_llm(query)
+
+
+@pytest.fixture(autouse=True)
+def reset_prompts():
+    prompts.clear()
+
+
+def test_call_llm_cache():
+    cache = LLMResponseCache()
+
+    assert call_llm("Hello", counting_llm, cache) == "HELLO"
+    assert call_llm("Hello", counting_llm, cache) == "HELLO"
+    assert call_llm("Bye", counting_llm, cache) == "BYE"
+
+    assert prompts == ["Hello", "Bye"]
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+
+def test_cache_key_includes_llm():
+    cache = LLMResponseCache()
+
+    assert call_llm("Hello", counting_llm, cache) == "HELLO"
+    assert call_llm("Hello", other_llm, cache) == "hello"
+
+
+def model_llm(prompt: str, model: str) -> str:
+    return f"{model}: {prompt}"
+
+
+class ModelLLM:
+    def __init__(self, model: str):
+        self.model = model
+
+    def __call__(self, prompt: str) -> str:
+        return model_llm(prompt, self.model)
+
+    def complete(self, prompt: str) -> str:
+        return model_llm(prompt, self.model)
+
+
+def test_wrapped_models_dont_share_responses():
+    cache = LLMResponseCache()
+
+    assert call_llm("Hello", partial(model_llm, model="a"), cache) == "a: Hello"
+    assert call_llm("Hello", partial(model_llm, model="b"), cache) == "b: Hello"
+    assert call_llm("Hello", ModelLLM("c"), cache) == "c: Hello"
+    assert call_llm("Hello", ModelLLM("d"), cache) == "d: Hello"
+    assert call_llm("Hello", ModelLLM("e").complete, cache) == "e: Hello"
+    assert call_llm("Hello", ModelLLM("f").complete, cache) == "f: Hello"
+    assert cache.hits == 0
+
+
+def test_cache_namespace():
+    cache = LLMResponseCache()
+    llm = partial(model_llm, model="a")
+    llm.cache_namespace = "model-a"
+    same_llm = ModelLLM("b")
+    same_llm.cache_namespace = "model-a"
+
+    call_llm("Hello", llm, cache)
+
+    assert call_llm("Hello", same_llm, cache) == "a: Hello"
+    assert LLMResponseCache.key("Hello", llm) == LLMResponseCache.key("Hello", same_llm)
+    assert LLMResponseCache.key("Hello", counting_llm) == LLMResponseCache.key("Hello", counting_llm)
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_cache():
+    cache = LLMResponseCache()
+
+    assert await acall_llm("Hello", async_counting_llm, cache) == "HELLO"
+    assert await acall_llm("Hello", async_counting_llm, cache) == "HELLO"
+
+    assert prompts == ["Hello"]
+
+
+def test_persisted_cache():
+    call_llm("Hello", counting_llm, LLMResponseCache(persist=True))
+    cache = LLMResponseCache(persist=True)
+
+    assert call_llm("Hello", counting_llm, cache) == "HELLO"
+    assert prompts == ["Hello"]
+    assert cache.hits == 1
+
+
+def test_ttl(mocker):
+    cache = LLMResponseCache(ttl=10)
+    time = mocker.patch("autopack.cache.time.time", return_value=1000)
+    call_llm("Hello", counting_llm, cache)
+
+    time.return_value = 1011
+    call_llm("Hello", counting_llm, cache)
+
+    assert prompts == ["Hello", "Hello"]
+
+
+def test_pack_uses_config_cache():
+    config = PackConfig(llm_cache=LLMResponseCache())
+
+    LLMPack(config=config, llm=counting_llm).run(query="Hello")
+    LLMPack(config=config, llm=counting_llm).run(query="Hello")
+
+    assert prompts == ["Hello"]
+    assert config.llm_cache.hits == 1
+
+
+def test_pack_cache_overrides_config_cache():
+    cache = LLMResponseCache()
+    config = PackConfig(llm_cache=LLMResponseCache())
+
+    LLMPack(config=config, llm=counting_llm, llm_cache=cache).run(query="Hello")
+
+    assert cache.stats()["size"] == 1
+    assert config.llm_cache.stats()["size"] == 0
+
+
+def test_selection_uses_config_cache(mocker):
+    mocker.patch("autopack.selection.get_all_pack_info", return_value=[])
+    mocker.patch("autopack.selection.get_all_installed_packs", return_value=[NoopPack])
+    config = PackConfig(llm_cache=LLMResponseCache())
+
+    assert select_packs("Do nothing", counting_llm, config=config) == []
+    select_packs("Do nothing", counting_llm, config=config)
+
+    assert len(prompts) == 1
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from autopack.get_pack import get_all_installed_packs, get_pack, try_get_pack
+from autopack.local_packs import local_pack_id, local_packs_by_id, local_packs_by_name
+from autopack.pack_config import InstallerStyle, PackConfig
+from autopack.selection import get_selection_pool, parse_selection_response, resolve_pack_names
+from autopack.utils import format_packs_to_openai_functions
+from tests.data.packs.add_pack import AddPack
+from tests.data.packs.noop import NoopPack
+from tests.data.selection_catalog import CATALOG
+
+
+class OtherNoopPack(NoopPack):
+    description = "Does nothing, but differently"
+
+
+def local_config(**kwargs) -> PackConfig:
+    return PackConfig(local_packs=[NoopPack, AddPack], **kwargs)
+
+
+def test_local_pack_index():
+    config = PackConfig(local_packs=[NoopPack, OtherNoopPack, AddPack])
+
+    assert local_pack_id(NoopPack) == "local/noop_pack"
+    assert dict(local_packs_by_name(config)) == {"noop_pack": NoopPack, "add": AddPack}
+    assert dict(local_packs_by_id(config)) == {"local/noop_pack": NoopPack, "local/add": AddPack}
+    assert local_packs_by_name(config) is local_packs_by_name(
+        PackConfig(local_packs=[NoopPack, OtherNoopPack, AddPack])
+    )
+
+
+@patch("autopack.get_pack.get_pack_details")
+def test_get_local_pack(mock_get_pack_details):
+    config = local_config()
+
+    assert get_pack("local/noop_pack", config=config) is NoopPack
+    assert try_get_pack("local/add", config=config) is AddPack
+    mock_get_pack_details.assert_not_called()
+
+
+@patch("autopack.get_pack.try_get_packs", return_value=[OtherNoopPack])
+@patch("autopack.get_pack.load_metadata_file", return_value={"installed/noop_pack": {}})
+def test_get_all_installed_packs_includes_local_packs(_mock_metadata, _mock_try_get_packs):
+    assert get_all_installed_packs(local_config()) == [NoopPack, AddPack]
+    assert get_all_installed_packs(PackConfig()) == [OtherNoopPack]
+
+
+@patch("autopack.selection.get_all_installed_packs")
+def test_resolve_local_pack_names(mock_get_all_installed_packs):
+    config = local_config()
+
+    assert resolve_pack_names(["add", "noop_pack"], config) == [AddPack, NoopPack]
+    assert parse_selection_response("noop_pack,\nadd", config) == [NoopPack, AddPack]
+    mock_get_all_installed_packs.assert_not_called()
+
+
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+def test_selection_pool_includes_local_packs(_mock_pack_info):
+    selection_pool = get_selection_pool("Add numbers", config=local_config(installer_style=InstallerStyle.automatic))
+
+    assert selection_pool[:2] == [NoopPack, AddPack]
+    assert [pack.name for pack in selection_pool[2:]] == [pack.name for pack in CATALOG if pack.name != "add"]
+
+
+def test_local_packs_openai_functions():
+    functions = format_packs_to_openai_functions(resolve_pack_names(["noop_pack"], local_config()))
+
+    assert functions[0]["name"] == "noop_pack"
+    assert functions[0]["parameters"]["properties"]["query"]["description"] == "The thing to do nothing about"
+
+
+@patch("autopack.selection.get_all_installed_packs")
+@patch("autopack.get_pack.get_pack_details")
+def test_local_packs_of_global_config(mock_get_pack_details, mock_get_all_installed_packs):
+    PackConfig.set_global_config(local_config())
+    try:
+        assert try_get_pack("local/noop_pack") is NoopPack
+        assert dict(local_packs_by_name()) == {"noop_pack": NoopPack, "add": AddPack}
+        assert parse_selection_response("noop_pack") == [NoopPack]
+    finally:
+        PackConfig.set_global_config(None)
+
+    mock_get_pack_details.assert_not_called()
+    mock_get_all_installed_packs.assert_not_called()
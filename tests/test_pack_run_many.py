@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tests.data.packs.add_pack import AddPack
+
+
+concurrency = {"in_flight": 0, "max_in_flight": 0}
+concurrency_lock = threading.Lock()
+
+
+class SlowAddPack(AddPack):
+    def _run(self, a: int, b: int) -> str:
+        with concurrency_lock:
+            concurrency["in_flight"] += 1
+            concurrency["max_in_flight"] = max(concurrency["max_in_flight"], concurrency["in_flight"])
+        time.sleep(0.02 if a == 0 else 0)
+        with concurrency_lock:
+            concurrency["in_flight"] -= 1
+        if a < 0:
+            raise ValueError("negative")
+        return str(a + b)
+
+    async def _arun(self, a: int, b: int) -> str:
+        await asyncio.sleep(0.02 if a == 0 else 0)
+        if a < 0:
+            raise ValueError("negative")
+        return str(a + b)
+
+
+def test_run_many():
+    results = SlowAddPack().run_many([{"a": 0, "b": 1}, {"a": "x"}, {"a": -1}, {"a": 2, "b": 2}], max_concurrency=2)
+
+    assert results[0] == "1"
+    assert results[1].startswith("Error: Invalid arguments. Details: a:")
+    assert results[2] == "Error: Pack execution failed. Details: ValueError: negative"
+    assert results[3] == "4"
+
+
+def test_run_many_concurrency_limit():
+    concurrency["max_in_flight"] = 0
+    SlowAddPack().run_many([{"a": 0} for _ in range(6)], max_concurrency=3)
+
+    assert concurrency["max_in_flight"] == 3
+
+
+def test_run_many_as_completed():
+    results = list(SlowAddPack().run_many_as_completed([{"a": 0}, {"a": 1}, {"a": "x"}]))
+
+    # Validation errors come first, then runs as they finish
+    assert [index for index, _ in results] == [2, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_arun_many():
+    results = await SlowAddPack().arun_many([{"a": 0, "b": 1}, {"a": "x"}, {"a": -1}, {"a": 2, "b": 2}])
+
+    assert results[0] == "1"
+    assert results[1].startswith("Error: Invalid arguments")
+    assert results[2] == "Error: Pack execution failed. Details: ValueError: negative"
+    assert results[3] == "4"
+
+
+@pytest.mark.asyncio
+async def test_arun_many_as_completed():
+    results = [result async for result in SlowAddPack().arun_many_as_completed([{"a": 0}, {"a": 5}])]
+
+    assert results == [(1, "5"), (0, "0")]
@@ -0,0 +1,169 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from langchain.callbacks.base import BaseCallbackHandler
+
+from autopack.callbacks import MetricsCollector, PackCallbackHandler
+from autopack.pack import STREAM_BUFFER_CHUNKS
+from autopack.pack_config import PackConfig
+from autopack.result_cache import clear_result_caches
+from tests.data.packs.noop import NoopPack
+from tests.data.packs.stream_pack import (
+    AsyncCountPack,
+    AsyncSlowCountPack,
+    CountPack,
+    EndlessCountPack,
+    SlowCountPack,
+    endless_count_closed,
+    endless_counts,
+    streamed_counts,
+)
+from tests.data.packs.sync_only_pack import SyncOnlyPack
+
+
+class TextRecorder(BaseCallbackHandler):
+    def __init__(self):
+        self.texts = []
+
+    def on_text(self, text, **kwargs):
+        self.texts.append(text)
+
+
+def test_stream():
+    assert CountPack.streams_output()
+    assert list(CountPack().stream(count=3)) == ["0\n", "1\n", "2\n"]
+
+
+def test_stream_falls_back_to_a_single_chunk():
+    assert not NoopPack.streams_output()
+    assert list(NoopPack().stream(query="hi")) == ["noop: hi"]
+
+
+def test_stream_invalid_arguments():
+    chunks = list(CountPack().stream(count="many"))
+
+    assert len(chunks) == 1
+    assert chunks[0].startswith("Error: Invalid arguments")
+
+
+class OutputRecorder(PackCallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    def after_run(self, pack, kwargs, result, duration):
+        self.events.append(("after_run", result))
+
+    def after_stream(self, pack, kwargs, output_length, duration):
+        self.events.append(("after_stream", output_length))
+
+
+def test_stream_calls_callbacks_with_the_output_length():
+    metrics, recorder = MetricsCollector(), OutputRecorder()
+
+    list(CountPack(callbacks=[metrics, recorder]).stream(count=3))
+
+    assert metrics.to_dict("count")["calls"] == 1
+    assert metrics.to_dict("count")["output_characters"] == 6
+    assert recorder.events == [("after_stream", 6)]
+
+
+def test_closing_a_timed_stream_stops_its_producer():
+    endless_counts.clear()
+    endless_count_closed.clear()
+    chunks = EndlessCountPack().stream(count=1)
+
+    assert next(chunks) == "0\n"
+    chunks.close()
+
+    assert endless_count_closed.wait(timeout=2)
+    assert len(endless_counts) <= STREAM_BUFFER_CHUNKS + 2
+
+
+@pytest.mark.asyncio
+async def test_astream():
+    assert [chunk async for chunk in AsyncCountPack().astream(count=3)] == ["0\n", "1\n", "2\n"]
+
+
+@pytest.mark.asyncio
+async def test_astream_of_sync_stream():
+    assert [chunk async for chunk in CountPack().astream(count=2)] == ["0\n", "1\n"]
+
+
+@pytest.mark.asyncio
+async def test_astream_falls_back_to_a_single_chunk():
+    chunks = [chunk async for chunk in SyncOnlyPack().astream(text="hi")]
+
+    assert len(chunks) == 1
+    assert chunks[0].startswith("hi from ")
+
+
+def test_langchain_tool_reports_chunks():
+    recorder = TextRecorder()
+    tool = CountPack().init_langchain_tool()
+
+    assert tool.run({"count": 2}, callbacks=[recorder]) == "0\n1\n"
+    assert recorder.texts == ["0\n", "1\n"]
+    assert list(tool.stream({"count": 2})) == ["0\n", "1\n"]
+    assert list(tool.stream(count=2)) == ["0\n", "1\n"]
+
+
+@pytest.mark.asyncio
+async def test_langchain_tool_reports_chunks_async():
+    recorder = TextRecorder()
+    tool = AsyncCountPack().init_langchain_tool()
+
+    assert await tool.arun({"count": 2}, callbacks=[recorder]) == "0\n1\n"
+    assert recorder.texts == ["0\n", "1\n"]
+    assert [chunk async for chunk in tool.astream({"count": 2})] == ["0\n", "1\n"]
+
+
+@pytest.mark.asyncio
+async def test_astream_with_process_executor():
+    # Generators can't be sent to worker processes, so they're iterated in threads instead
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        pack = CountPack(config=PackConfig(async_executor=executor))
+        assert [chunk async for chunk in pack.astream(count=2)] == ["0\n", "1\n"]
+
+
+@pytest.fixture
+def slow_count_packs():
+    clear_result_caches()
+    streamed_counts.clear()
+    yield
+    clear_result_caches()
+
+
+def test_stream_timeout(slow_count_packs):
+    chunks = list(SlowCountPack().stream(count=100))
+
+    assert chunks[:2] == ["0\n", "1\n"]
+    assert chunks[-1] == "Error: Timed out. Details: slow_count did not finish within 0.5 seconds"
+
+
+@pytest.mark.asyncio
+async def test_astream_timeout(slow_count_packs):
+    chunks = [chunk async for chunk in AsyncSlowCountPack().astream(count=100)]
+
+    assert chunks[:2] == ["0\n", "1\n"]
+    assert chunks[-1] == "Error: Timed out. Details: async_slow_count did not finish within 0.5 seconds"
+
+
+@pytest.mark.asyncio
+async def test_stream_uses_the_result_cache(slow_count_packs):
+    assert list(SlowCountPack().stream(count=3)) == ["0\n", "1\n", "2\n"]
+    assert list(SlowCountPack().stream(count=3)) == ["0\n1\n2\n"]
+    assert SlowCountPack().run(count=3) == "0\n1\n2\n"
+    assert [chunk async for chunk in AsyncSlowCountPack().astream(count=2)] == ["0\n", "1\n"]
+    assert [chunk async for chunk in AsyncSlowCountPack().astream(count=2)] == ["0\n1\n"]
+
+    assert streamed_counts == [3, 2]
+
+
+def test_langchain_tool_stream_timeout(slow_count_packs):
+    recorder = TextRecorder()
+    tool = SlowCountPack().init_langchain_tool()
+
+    assert tool.run({"count": 100}, callbacks=[recorder]).endswith("did not finish within 0.5 seconds")
+    assert tool.run({"count": 2}, callbacks=[recorder]) == "0\n1\n"
+    assert tool.run({"count": 2}, callbacks=[recorder]) == "0\n1\n"
+    assert streamed_counts == [100, 2]
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel, Field
+
+from autopack.callbacks import MetricsCollector
+from autopack.pack_config import PackConfig
+from tests.data.packs.noop import NoopPack
+from tests.data.packs.sync_only_pack import BlockingPack, release_blocking_pack
+
+cancelled = []
+
+
+class SlowAsyncPack(NoopPack):
+    name = "slow_async"
+    run_timeout = 0.05
+
+    async def _arun(self, query: str):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return query
+
+
+class FetchArgs(BaseModel):
+    url: str = Field(..., description="The URL to fetch")
+    timeout: float = Field(10, description="The request timeout in seconds")
+
+
+class FetchPack(NoopPack):
+    name = "fetch"
+    args_schema = FetchArgs
+
+    def _run(self, url: str, timeout: float = 10):
+        return f"{url} within {timeout}"
+
+    async def _arun(self, url: str, timeout: float = 10):
+        return self._run(url, timeout)
+
+
+@pytest.fixture(autouse=True)
+def reset_blocking_pack():
+    release_blocking_pack.clear()
+    cancelled.clear()
+    yield
+    # Let abandoned runs finish
+    release_blocking_pack.set()
+
+
+def test_sync_timeout_from_config():
+    pack = BlockingPack(config=PackConfig(run_timeout=0.05))
+
+    assert pack.run() == "Error: Timed out. Details: blocking did not finish within 0.05 seconds"
+
+
+def test_sync_timeout_per_call():
+    pack = BlockingPack()
+
+    assert pack.timeout is None
+    assert pack.run_with_timeout(0.05).startswith("Error: Timed out.")
+
+
+def test_sync_run_within_timeout():
+    release_blocking_pack.set()
+
+    assert BlockingPack().run_with_timeout(5) == "released"
+
+
+def test_sync_timeout_propagates_exceptions():
+    class FailingPack(NoopPack):
+        name = "failing"
+
+        def _run(self, query: str):
+            raise ValueError(query)
+
+    with pytest.raises(ValueError):
+        FailingPack().run_with_timeout(5, query="boom")
+
+
+@pytest.mark.asyncio
+async def test_async_timeout_cancels_the_run():
+    assert SlowAsyncPack().timeout == 0.05
+
+    result = await SlowAsyncPack().arun(query="hi")
+
+    assert result == "Error: Timed out. Details: slow_async did not finish within 0.05 seconds"
+    assert cancelled == ["hi"]
+
+
+@pytest.mark.asyncio
+async def test_per_call_timeout_overrides_pack_timeout():
+    result = await SlowAsyncPack().arun_with_timeout(0.01, query="hi")
+
+    assert result == "Error: Timed out. Details: slow_async did not finish within 0.01 seconds"
+
+
+@pytest.mark.asyncio
+async def test_async_timeout_for_sync_only_pack():
+    assert (await BlockingPack().arun_with_timeout(0.05)).startswith("Error: Timed out.")
+
+
+def test_run_many_timeout():
+    metrics = MetricsCollector()
+    pack = BlockingPack(callbacks=[metrics])
+
+    assert (
+        pack.run_many([{}, {}], timeout=0.05)
+        == ["Error: Timed out. Details: blocking did not finish within 0.05 seconds"] * 2
+    )
+    assert metrics.to_dict("blocking")["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_arun_many_timeout():
+    results = await SlowAsyncPack().arun_many([{"query": "a"}, {"query": "b"}])
+
+    assert all(result.startswith("Error: Timed out.") for result in results)
+    assert sorted(cancelled) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_pack_argument_named_timeout():
+    pack = FetchPack()
+
+    assert pack.run(url="x", timeout=3) == "x within 3"
+    assert await pack.arun(url="x", timeout=3) == "x within 3"
+    assert pack.run_with_timeout(5, url="x", timeout=3) == "x within 3"
+    assert await pack.arun_with_timeout(5, url="x", timeout=3) == "x within 3"
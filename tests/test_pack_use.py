@@ -1,6 +1,16 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pytest
 
+from autopack.pack_config import PackConfig
+from autopack.utils import compile_args_validator
+from tests.data.packs.add_pack import AddPack
+from tests.data.packs.no_args_pack import NoArgsPack
 from tests.data.packs.noop import NoopPack
+from tests.data.packs.sync_only_pack import BlockingPack, SyncOnlyPack, release_blocking_pack
 from tests.data.packs.summarization_pack import SummarizationPack
 
 
@@ -30,3 +40,68 @@ def test_noop():
 @pytest.mark.asyncio
 async def test_async_noop():
     assert await NoopPack().arun(query="some query") == "noop: some query"
+
+
+def test_invalid_args():
+    assert NoopPack().run() == "Error: Invalid arguments. Details: query: field required"
+
+
+def test_validated_args_are_passed():
+    assert AddPack().run(a="1", b="2") == "3"
+    assert AddPack().run(a="1") == "1"
+    assert AddPack().run(a="one").startswith("Error: Invalid arguments. Details: a:")
+
+
+@pytest.mark.asyncio
+async def test_async_validated_args_are_passed():
+    assert await AddPack().arun(a="1", b=2) == "3"
+
+
+def test_pack_without_args_schema():
+    assert NoArgsPack().run() == "no args"
+    assert NoArgsPack().validate_tool_args()
+
+
+def test_args_validator_is_cached():
+    assert compile_args_validator(AddPack.args_schema) is compile_args_validator(AddPack.args_schema)
+
+
+@pytest.mark.asyncio
+async def test_async_sync_only_pack():
+    result = await SyncOnlyPack().arun(text="hi")
+
+    assert result.startswith("hi from ")
+    assert result != f"hi from {threading.current_thread().name}"
+
+
+@pytest.mark.asyncio
+async def test_async_sync_only_pack_does_not_block_event_loop():
+    async def release():
+        release_blocking_pack.set()
+        return "set"
+
+    release_blocking_pack.clear()
+    # If the blocking pack ran on the event loop, `release` could never run and the pack would time out
+    assert await asyncio.gather(BlockingPack().arun(), release()) == ["released", "set"]
+
+
+@pytest.mark.asyncio
+async def test_async_sync_only_pack_custom_executor():
+    with ThreadPoolExecutor(thread_name_prefix="custom_executor") as executor:
+        pack = SyncOnlyPack(config=PackConfig(async_executor=executor))
+        assert (await pack.arun(text="hi")).startswith("hi from custom_executor")
+
+
+@pytest.mark.asyncio
+async def test_async_sync_only_pack_process_executor():
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pack = SyncOnlyPack(config=PackConfig(async_executor=executor))
+        # The pack runs in the main thread of the worker process
+        assert await pack.arun(text="hi") == "hi from MainThread"
+
+
+@pytest.mark.asyncio
+async def test_langchain_tool_arun():
+    tool = SyncOnlyPack().init_langchain_tool()
+
+    assert (await tool.arun({"text": "hi"})).startswith("hi from ")
@@ -0,0 +1,165 @@
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from autopack import Pack
+from autopack.pack_config import ExecutionMode, PackConfig
+from autopack.pack_response import PackResponse
+from autopack.process_pool import AutoPackWorkerError, PackProcessPool, get_process_pool, shutdown_process_pools
+from autopack.utils import fetch_pack_object
+from tests.data.packs.noop import NoopPack
+from tests.data.packs.process_packs import ProcessPack, StreamingProcessPack
+
+
+@pytest.fixture(autouse=True)
+def close_pools():
+    yield
+    shutdown_process_pools()
+
+
+def test_pack_runs_in_a_warm_worker():
+    config = PackConfig(process_pool_size=1, workspace_path="elsewhere")
+    pack = ProcessPack(config=config)
+
+    first_pid = pack.run()
+    assert first_pid != str(os.getpid())
+    assert pack.run() == first_pid
+    assert pack.run(action="workspace") == "elsewhere"
+    assert get_process_pool(ProcessPack, config).workers_started == 1
+
+
+def test_exceptions_are_raised_in_the_caller():
+    pack = ProcessPack(config=PackConfig(process_pool_size=1))
+
+    with pytest.raises(ValueError, match="misbehaving on request"):
+        pack.run(action="raise")
+    assert pack.run_many([{"action": "raise"}])[0].startswith("Error: Pack execution failed. Details: ValueError")
+
+
+def test_crashed_worker_is_replaced():
+    pack = ProcessPack(config=PackConfig(process_pool_size=1))
+    first_pid = pack.run()
+
+    with pytest.raises(AutoPackWorkerError):
+        pack.run(action="crash")
+    assert pack.run() != first_pid
+
+
+def test_unpicklable_arguments_keep_the_worker():
+    pool = PackProcessPool(ProcessPack, PackConfig(), size=1)
+    first_pid = pool.run((), {})
+
+    with pytest.raises((pickle.PicklingError, AttributeError)):
+        pool.run((), {"action": lambda: "pid"})
+    assert pool.run((), {}) == first_pid
+    assert pool.workers_started == 1
+    pool.close()
+
+
+def test_timeout_kills_the_worker():
+    pack = ProcessPack(config=PackConfig(process_pool_size=1, run_timeout=0.5))
+    first_pid = pack.run()
+
+    assert pack.run(action="sleep") == "Error: Timed out. Details: process_pack did not finish within 0.5 seconds"
+    assert pack.run() != first_pid
+
+
+def test_workers_are_recycled_after_max_calls():
+    pool = PackProcessPool(ProcessPack, PackConfig(), size=1, max_calls=2)
+    try:
+        pids = [pool.run((), {"action": "pid"}) for _ in range(3)]
+    finally:
+        pool.close()
+
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.workers_started == 2
+
+
+def test_workers_are_recycled_on_memory_cap():
+    pool = PackProcessPool(ProcessPack, PackConfig(), size=1, max_memory_mb=1)
+    try:
+        pids = [pool.run((), {"action": "allocate"}) for _ in range(2)]
+    finally:
+        pool.close()
+
+    assert pids[0] != pids[1]
+
+
+@pytest.mark.asyncio
+async def test_async_run_in_worker():
+    pack = ProcessPack(config=PackConfig(process_pool_size=2))
+
+    pids = await pack.arun_many([{}, {}, {}, {}])
+
+    assert str(os.getpid()) not in pids
+
+
+def test_execution_mode_from_config():
+    pack = NoopPack(config=PackConfig(execution_mode=ExecutionMode.process_pool))
+
+    assert pack.uses_process_pool
+    assert not NoopPack().uses_process_pool
+
+
+@pytest.mark.asyncio
+async def test_stream_runs_in_worker():
+    pack = StreamingProcessPack(config=PackConfig(process_pool_size=1))
+
+    chunks = list(pack.stream())
+    assert len(chunks) == 1 and chunks[0] != str(os.getpid())
+    assert [chunk async for chunk in pack.astream()] == chunks
+
+
+INSTALLED_PACK_SOURCE = """
+import os
+
+from autopack import Pack
+
+
+class PidPack(Pack):
+    name = "pid_pack"
+    description = "Returns the pid of its process"
+
+    def _run(self) -> str:
+        return str(os.getpid())
+"""
+
+
+@pytest.fixture
+def installed_pack() -> type[Pack]:
+    # The layout of a pack installed from https://github.com/example/myrepo.git, which is only on sys.path while it's
+    # being imported
+    package_dir = os.path.join(".autopack", "myrepo", "mypkg")
+    os.makedirs(package_dir)
+    open(os.path.join(package_dir, "__init__.py"), "w").close()
+    with open(os.path.join(package_dir, "tool.py"), "w") as f:
+        f.write(INSTALLED_PACK_SOURCE)
+
+    pack_data = PackResponse(
+        pack_id="example/myrepo/pid_pack",
+        package_path="mypkg.tool",
+        class_name="PidPack",
+        repo_url="https://github.com/example/myrepo.git",
+        name="pid_pack",
+        description="Returns the pid of its process",
+    )
+    yield fetch_pack_object(pack_data)
+    sys.modules.pop("mypkg.tool", None)
+    sys.modules.pop("mypkg", None)
+
+
+def test_installed_pack_runs_in_worker(installed_pack):
+    config = PackConfig(process_pool_size=1, execution_mode=ExecutionMode.process_pool)
+
+    assert installed_pack(config=config).run() != str(os.getpid())
+
+
+@pytest.mark.asyncio
+async def test_installed_pack_runs_in_process_executor(installed_pack):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pack = installed_pack(config=PackConfig(async_executor=executor))
+        assert await pack.arun() != str(os.getpid())
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from autopack.filesystem_emulation.ram_file_manager import RAMFileManager
+from autopack.pack_config import PackConfig
+
+
+@pytest.fixture
+def file_manager() -> RAMFileManager:
+    file_manager = RAMFileManager()
+    for path in ["foo/a.txt", "foo/sub/b.txt", "foo/sub/pyproject.toml", "foobar/c.txt", "top.txt", "/abs/d.txt"]:
+        file_manager.write_file(path, path)
+    return file_manager
+
+
+def test_paths_are_normalized(file_manager):
+    file_manager.write_file("./foo//e.txt", "e")
+
+    assert file_manager.read_file("foo/e.txt") == "e"
+    assert file_manager.read_file("foo/sub/../a.txt") == "foo/a.txt"
+    assert file_manager.read_file("//abs/d.txt") == "/abs/d.txt"
+    assert file_manager.write_file(".", "") == "Error: Invalid file path '.'"
+
+
+def test_paths_are_either_files_or_directories(file_manager):
+    assert (
+        file_manager.write_file("foo/a.txt/c.txt", "") == "Error: Cannot write 'foo/a.txt/c.txt', 'foo/a.txt' is a file"
+    )
+    assert file_manager.write_file("foo/sub", "") == "Error: Cannot write 'foo/sub', 'foo/sub' is a directory"
+    assert file_manager.list_files("foo", recursive=False).split("\n") == ["foo/a.txt", "foo/sub/"]
+    assert file_manager.read_file("foo/sub") == "Error: File not found"
+
+
+def test_paths_outside_of_the_top_level(file_manager):
+    assert file_manager.write_file("../etc/x", "") == "Error: Invalid file path '../etc/x'"
+    assert file_manager.write_file("foo/../../x", "") == "Error: Invalid file path 'foo/../../x'"
+    assert file_manager.write_file("/../x", "x") == "Successfully wrote 1 bytes to /../x"
+    assert file_manager.read_file("/x") == "x"
+    assert "../etc/x" not in file_manager.list_files(".")
+
+
+def test_list_files_recursive(file_manager):
+    assert file_manager.list_files("foo").split("\n") == ["foo/a.txt", "foo/sub/b.txt"]
+    assert file_manager.list_files("foo/") == file_manager.list_files("./foo")
+    assert file_manager.list_files("/") == "/abs/d.txt"
+    assert file_manager.list_files("fo") == "Error: No such directory fo."
+
+
+def test_list_files_non_recursive(file_manager):
+    assert file_manager.list_files("foo", recursive=False).split("\n") == ["foo/a.txt", "foo/sub/"]
+    assert file_manager.list_files("foo/sub", recursive=False) == "foo/sub/b.txt"
+    assert file_manager.list_files(".", recursive=False).split("\n") == ["top.txt", "foo/", "foobar/"]
+
+
+def test_delete_file_removes_empty_directories(file_manager):
+    file_manager.delete_file("foo/sub/b.txt")
+    assert file_manager.list_files("foo/sub") == ""
+
+    file_manager.delete_file("foo/sub/pyproject.toml")
+    assert file_manager.list_files("foo/sub") == "Error: No such directory foo/sub."
+    assert file_manager.list_files("foo", recursive=False) == "foo/a.txt"
+    assert file_manager.delete_file("foo/sub/b.txt") == "Error: File not found 'foo/sub/b.txt'"
+
+
+@pytest.mark.asyncio
+async def test_alist_files(file_manager):
+    assert await file_manager.alist_files("foobar") == "foobar/c.txt"
+    assert await file_manager.alist_files("foo", recursive=False) == "foo/a.txt\nfoo/sub/"
+
+
+def test_memory_budget():
+    config = PackConfig(ram_files_memory_budget_mb=1 / 1024, ram_files_compress_min_bytes=512)
+    file_manager = RAMFileManager(config)
+    contents = {f"dir/{i}.txt": os.urandom(200).hex() for i in range(20)}
+    for path, content in contents.items():
+        file_manager.write_file(path, content)
+
+    stats = file_manager.stats()
+    assert stats["bytes_held"] <= 1024
+    assert stats["compressed_files"] > 0 and stats["spilled_files"] > 0
+    assert stats["size"] == sum(len(content) for content in contents.values())
+
+    # Reading a spilled file brings it back into memory, spilling colder files instead
+    assert file_manager.read_file("dir/0.txt") == contents["dir/0.txt"]
+    assert "dir/0.txt" in file_manager._data_files
+    assert dict(file_manager.files) == contents
+    assert file_manager.stats()["bytes_held"] <= 1024
+
+    spill_dir = file_manager._spill_dir
+    file_manager.close()
+    assert not os.path.exists(spill_dir)
+    assert file_manager.stats()["files"] == 0
+
+
+def test_large_files_are_compressed():
+    config = PackConfig(ram_files_memory_budget_mb=1, ram_files_compress_min_bytes=1000)
+    file_manager = RAMFileManager(config)
+    file_manager.write_file("small.txt", "a" * 999)
+    file_manager.write_file("large.txt", "a" * 1000)
+
+    stats = file_manager.stats()
+    assert stats["text_files"] == 1 and stats["compressed_files"] == 1
+    assert stats["compressed_bytes"] < 100
+    assert file_manager.read_file("large.txt") == "a" * 1000
+
+
+def test_no_memory_budget(file_manager):
+    file_manager.write_file("large.txt", "a" * 100000)
+
+    assert file_manager.stats()["compressed_files"] == 0
+    assert file_manager.stats()["bytes_held"] == file_manager.stats()["size"]
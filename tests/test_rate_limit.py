@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from autopack.pack_config import PackConfig
+from autopack.rate_limit import LLMRateLimiter, TokenBucket, get_llm_rate_limiter
+from autopack.utils import acall_llm, call_llm
+from tests.data.packs.noop import NoopPack
+
+
+class LLMPack(NoopPack):
+    name = "llm_pack"
+
+    def _run(self, query: str):
+        return self.call_llm(query)
+
+    async def _arun(self, query: str):
+        return await self.acall_llm(query)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(per_minute=60)
+    bucket.updated = 0
+    bucket.consume(60)
+
+    assert bucket.delay(10, now=0) == 10
+    assert bucket.delay(10, now=4) == 6
+    # Requests larger than the bucket only wait for a full bucket
+    assert bucket.delay(1000, now=4) == 56
+
+
+def test_max_concurrency():
+    limiter = LLMRateLimiter(max_concurrency=2)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def llm(prompt: str) -> str:
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return prompt
+
+    threads = [threading.Thread(target=call_llm, args=(str(i), llm, None, limiter)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+    stats = limiter.stats()
+    assert stats["requests"] == 6
+    assert stats["in_flight"] == 0
+    assert stats["max_wait_time"] > 0
+
+
+def test_requests_are_granted_in_order():
+    limiter = LLMRateLimiter(max_concurrency=1)
+    limiter.acquire()
+    order = []
+
+    def request(index: int):
+        limiter.acquire()
+        order.append(index)
+        limiter.release()
+
+    threads = []
+    for index in range(5):
+        threads.append(threading.Thread(target=request, args=(index,)))
+        threads[-1].start()
+        # Make sure the requests are queued in order
+        while limiter.stats()["queued"] < index + 1:
+            time.sleep(0.001)
+
+    limiter.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_tokens_per_minute_paces_requests():
+    # 100 tokens per second, all used up by the first request
+    limiter = LLMRateLimiter(tokens_per_minute=6000)
+    call_llm("x" * 4 * 6000, lambda prompt: "", rate_limiter=limiter)
+
+    start = time.monotonic()
+    call_llm("x" * 4 * 20, lambda prompt: "", rate_limiter=limiter)
+
+    assert time.monotonic() - start >= 0.15
+    assert limiter.stats()["max_wait_time"] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_async_requests_share_the_limit():
+    limiter = LLMRateLimiter(max_concurrency=1)
+    active = []
+
+    async def llm(prompt: str) -> str:
+        active.append(prompt)
+        assert len(active) == 1
+        await asyncio.sleep(0.01)
+        active.remove(prompt)
+        return prompt
+
+    results = await asyncio.gather(*[acall_llm(str(i), llm, rate_limiter=limiter) for i in range(4)])
+
+    assert results == ["0", "1", "2", "3"]
+    assert limiter.stats()["requests"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = LLMRateLimiter(max_concurrency=1)
+    limiter.acquire()
+
+    waiting = asyncio.ensure_future(limiter.aacquire())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert limiter.stats()["queued"] == 0
+    limiter.release()
+    assert await limiter.aacquire() < 1
+
+
+def test_limiter_is_shared_per_config_limits():
+    assert get_llm_rate_limiter(PackConfig()) is None
+
+    limiter = get_llm_rate_limiter(PackConfig(llm_max_concurrency=3))
+    assert get_llm_rate_limiter(PackConfig(llm_max_concurrency=3)) is limiter
+    assert get_llm_rate_limiter(PackConfig(llm_requests_per_minute=3)) is not limiter
+
+
+def test_pack_llm_calls_go_through_the_limiter():
+    config = PackConfig(llm_max_concurrency=7)
+
+    LLMPack(config=config, llm=lambda prompt: prompt).run(query="hi")
+
+    assert get_llm_rate_limiter(config).stats()["requests"] >= 1
+
+
+def test_sync_llm_waits_for_the_limiter_without_blocking_the_loop():
+    config = PackConfig(llm_max_concurrency=1)
+
+    async def allm(prompt: str) -> str:
+        await asyncio.sleep(0.1)
+        return prompt
+
+    async def run_packs():
+        return await asyncio.gather(
+            LLMPack(config=config, allm=allm).arun(query="async"),
+            LLMPack(config=config, llm=lambda prompt: prompt).arun(query="sync"),
+        )
+
+    # Waiting for the limiter on the event loop would deadlock, so the loop runs in a thread we can give up on
+    results = []
+    thread = threading.Thread(target=lambda: results.append(asyncio.run(run_packs())), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert results == [["async", "sync"]]
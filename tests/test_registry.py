@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from autopack.errors import AutoPackError
+from autopack.pack_config import PackConfig
+from autopack.registry import PackRegistry, _registries, get_pack_registry, reset_pack_registries
+from tests.data.packs.noop import NoopPack
+
+created = []
+closed = []
+
+
+class TrackedPack(NoopPack):
+    name = "tracked_pack"
+
+    def __init__(self, **data):
+        # Slow construction makes races between threads likely
+        time.sleep(0.01)
+        super().__init__(**data)
+        created.append(self)
+
+    def close(self):
+        closed.append(self)
+
+
+@pytest.fixture(autouse=True)
+def reset_tracking():
+    created.clear()
+    closed.clear()
+    yield
+    reset_pack_registries()
+
+
+def test_instances_are_shared():
+    registry = PackRegistry()
+
+    assert registry.get(TrackedPack) is registry.get(TrackedPack)
+    assert TrackedPack in registry
+    assert len(created) == 1
+
+
+def test_instances_are_created_once_across_threads():
+    registry = PackRegistry()
+    threads = [threading.Thread(target=registry.get, args=(TrackedPack,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+
+
+def test_instances_use_the_config_and_llm():
+    def llm(prompt: str) -> str:
+        return prompt
+
+    config = PackConfig(workspace_path="elsewhere")
+    pack = PackRegistry(config, llm=llm).get(NoopPack)
+
+    assert pack.config.workspace_path == "elsewhere"
+    assert pack.llm is llm
+
+
+def test_langchain_tools_are_cached():
+    registry = PackRegistry()
+    tool = registry.langchain_tool(TrackedPack)
+
+    assert registry.langchain_tools([TrackedPack]) == [tool]
+    assert tool.pack is registry.get(TrackedPack)
+
+
+def test_reset_closes_instances():
+    registry = PackRegistry()
+    pack = registry.get(TrackedPack)
+
+    registry.reset()
+
+    assert closed == [pack]
+    assert registry.get(TrackedPack) is not pack
+
+
+def test_closed_registry():
+    with PackRegistry() as registry:
+        pack = registry.get(TrackedPack)
+
+    assert closed == [pack]
+    with pytest.raises(AutoPackError):
+        registry.get(TrackedPack)
+
+
+def test_shared_registries():
+    def llm(prompt: str) -> str:
+        return prompt
+
+    config = PackConfig()
+
+    assert get_pack_registry(config, llm) is get_pack_registry(config, llm)
+    assert get_pack_registry(config, llm) is not get_pack_registry(config)
+    assert get_pack_registry() is get_pack_registry(PackConfig.global_config())
+
+    registry = get_pack_registry(config)
+    registry.get(TrackedPack)
+    reset_pack_registries()
+
+    assert len(closed) == 1
+    assert get_pack_registry(config) is not registry
+
+
+def test_shared_registries_of_bound_methods():
+    class Model:
+        def complete(self, prompt: str) -> str:
+            return prompt
+
+    model = Model()
+    config = PackConfig()
+
+    assert get_pack_registry(config, model.complete) is get_pack_registry(config, model.complete)
+    assert get_pack_registry(config, model.complete) is not get_pack_registry(config, Model().complete)
+
+    # Closed registries are replaced and let go of
+    registry = get_pack_registry(config, model.complete)
+    registry.close()
+    assert get_pack_registry(config, model.complete) is not registry
+    assert registry not in _registries.values()
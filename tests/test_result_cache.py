@@ -0,0 +1,101 @@
+import pytest
+
+from autopack import result_cache
+from autopack.pack_config import PackConfig
+from autopack.result_cache import clear_result_caches, result_cache_stats
+from tests.data.packs.add_pack import AddPack
+
+calls = []
+
+
+class CachedAddPack(AddPack):
+    name = "cached_add"
+    cache_results = True
+
+    def _run(self, a: int, b: int) -> str:
+        calls.append((a, b))
+        return super()._run(a, b)
+
+    async def _arun(self, a: int, b: int) -> str:
+        return self._run(a, b)
+
+
+class IrreversibleAddPack(CachedAddPack):
+    name = "irreversible_add"
+    reversible = False
+
+
+class PersistentAddPack(CachedAddPack):
+    name = "persistent_add"
+    result_cache_persist = True
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    calls.clear()
+    clear_result_caches()
+
+
+def test_results_are_cached_on_validated_args():
+    pack = CachedAddPack()
+
+    assert pack.run(a=1, b=2) == "3"
+    assert pack.run(a="1", b="2") == "3"
+    assert CachedAddPack().run(b=2, a=1) == "3"
+
+    assert len(calls) == 1
+    assert result_cache_stats()[f"{__name__}.CachedAddPack"] == {"size": 1, "hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+@pytest.mark.asyncio
+async def test_async_results_are_cached():
+    pack = CachedAddPack()
+
+    assert await pack.arun(a=1) == "1"
+    assert pack.run(a=1) == "1"
+    assert len(calls) == 1
+
+
+def test_irreversible_packs_are_not_cached():
+    IrreversibleAddPack().run(a=1)
+    IrreversibleAddPack().run(a=1)
+
+    assert len(calls) == 2
+    assert f"{__name__}.IrreversibleAddPack" not in result_cache_stats()
+
+
+def test_results_are_cached_per_llm_and_config():
+    def llm(prompt: str) -> str:
+        return prompt
+
+    def other_llm(prompt: str) -> str:
+        return prompt.upper()
+
+    CachedAddPack(llm=llm).run(a=1)
+    CachedAddPack(llm=llm).run(a=1)
+    CachedAddPack(llm=other_llm).run(a=1)
+    CachedAddPack(config=PackConfig(workspace_path="other"), llm=llm).run(a=1)
+
+    assert len(calls) == 3
+
+
+def test_result_cache_stats_are_kept_per_class():
+    class OtherCachedAddPack(CachedAddPack):
+        pass
+
+    CachedAddPack().run(a=1)
+    OtherCachedAddPack().run(a=1)
+
+    stats = result_cache_stats()
+    assert stats[f"{__name__}.CachedAddPack"]["size"] == 1
+    assert stats[f"{__name__}.test_result_cache_stats_are_kept_per_class.<locals>.OtherCachedAddPack"]["size"] == 1
+
+
+def test_persistent_result_cache():
+    PersistentAddPack().run(a=1)
+
+    # Forget the in-memory caches but keep the files on disk
+    result_cache._result_caches.clear()
+    PersistentAddPack().run(a=1)
+
+    assert len(calls) == 1
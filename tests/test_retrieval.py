@@ -0,0 +1,121 @@
+import os
+from unittest.mock import patch
+
+from autopack.pack_config import PackConfig
+from autopack.retrieval import BM25Index, EmbeddingRetriever, LexicalRetriever, prefilter_packs, with_dependencies
+from autopack.selection import select_packs
+from tests.data.selection_catalog import CATALOG, TASKS
+
+TOP_K = 8
+
+
+def by_name(name: str):
+    return next(pack for pack in CATALOG if pack.name == name)
+
+
+def test_bm25_ranks_matching_documents_first():
+    index = BM25Index(["the cat sat", "dogs bark loudly", "a cat and a dog"])
+
+    assert index.top_k("cat", 2) == [0, 2]
+    # Unmatched documents fill the remaining slots
+    assert index.top_k("cat", 3) == [0, 2, 1]
+
+
+def test_lexical_prefilter_recall():
+    recalls = []
+    for task, expected in TASKS:
+        candidate_names = {pack.name for pack in prefilter_packs(CATALOG, task, None, TOP_K)}
+        recalls.append(len(candidate_names.intersection(expected)) / len(expected))
+
+    assert sum(recalls) / len(recalls) >= 0.9
+
+
+def test_prefilter_includes_dependencies():
+    assert with_dependencies([by_name("write_file")], CATALOG) == [by_name("read_file"), by_name("write_file")]
+
+    candidates = prefilter_packs(CATALOG, "scrape links", None, 1)
+    assert [pack.name for pack in candidates] == ["fetch_url", "scrape_links"]
+
+
+def test_prefilter_keeps_small_pools():
+    assert prefilter_packs(CATALOG[:3], "anything", None, TOP_K) == CATALOG[:3]
+
+
+def test_lexical_retriever_reuses_index():
+    retriever = LexicalRetriever()
+    retriever.retrieve("weather", CATALOG, 3)
+    retriever.retrieve("stock price", CATALOG, 3)
+
+    assert retriever._indexes.stats()["misses"] == 1
+    assert retriever._indexes.stats()["hits"] == 1
+
+
+@patch("autopack.selection.get_all_installed_packs", return_value=[])
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+def test_select_packs_with_top_k(_mock_pack_info, _mock_installed):
+    prompts = []
+
+    def mock_llm(prompt: str) -> str:
+        prompts.append(prompt)
+        return "current_weather"
+
+    select_packs("What is the weather in Paris?", mock_llm, config=PackConfig(selection_top_k=3))
+
+    assert "current_weather" in prompts[0]
+    assert prompts[0].count("\n- ") == 3
+
+
+def keyword_embedding(texts: list[str]) -> list[list[float]]:
+    vocabulary = ["weather", "stock", "email", "file", "python", "disk"]
+    return [[float(word in text.lower()) for word in vocabulary] + [0.1] for text in texts]
+
+
+def test_embedding_retriever():
+    retriever = EmbeddingRetriever(keyword_embedding)
+
+    results = retriever.retrieve("Will the weather be nice tomorrow?", CATALOG, 2)
+
+    assert results[0].name == "current_weather"
+    assert os.path.exists(retriever.matrix_path)
+
+
+def test_embedding_retriever_only_embeds_new_packs():
+    embedded = []
+
+    def counting_embedding(texts: list[str]) -> list[list[float]]:
+        embedded.extend(texts)
+        return keyword_embedding(texts)
+
+    EmbeddingRetriever(counting_embedding).sync(CATALOG[:-1])
+    embedded.clear()
+
+    # A fresh retriever reuses the stored matrix
+    retriever = EmbeddingRetriever(counting_embedding)
+    retriever.sync(CATALOG)
+    assert len(embedded) == 1
+
+    results = retriever.retrieve("send an email", CATALOG, 3)
+    assert "send_email" in [pack.name for pack in results]
+
+
+def test_embedding_retriever_rebuilds_for_another_model():
+    embedded = []
+
+    def wider_embedding(texts: list[str]) -> list[list[float]]:
+        embedded.extend(texts)
+        return [vector + [0.0] for vector in keyword_embedding(texts)]
+
+    EmbeddingRetriever(keyword_embedding).sync(CATALOG[:-1])
+
+    # Another model under the same name isn't mixed with the stored embeddings
+    EmbeddingRetriever(wider_embedding, model="wider").sync(CATALOG[:-1])
+    assert len(embedded) == len(CATALOG) - 1
+
+    # Neither is a changed model whose vectors don't fit, whether found when embedding new packs or the query
+    EmbeddingRetriever(keyword_embedding, model="wider").sync(CATALOG)
+    retriever = EmbeddingRetriever(wider_embedding, model="wider")
+    assert retriever.retrieve("send an email", CATALOG, 1)[0].name == "send_email"
+    assert retriever._matrix.shape == (len(CATALOG), len(wider_embedding(["query"])[0]))
+
+    matrix_files = [name for name in os.listdir(".autopack") if name.endswith(".npy")]
+    assert matrix_files == [os.path.basename(retriever.matrix_path)]
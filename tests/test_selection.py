@@ -0,0 +1,164 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from autopack.benchmark import generate_catalog
+from autopack.catalog import render_catalog
+from autopack.selection import aselect_packs, parse_pack_names, select_packs, shard_packs
+from autopack.selection_cache import SelectionCache
+from autopack.utils import estimate_tokens
+from tests.data.selection_catalog import CATALOG
+
+
+def test_parse_pack_names():
+    assert parse_pack_names("web_search, fetch_url(url)\nread_file,\n") == ["web_search", "fetch_url", "read_file"]
+
+
+def test_shard_packs():
+    shards = shard_packs(CATALOG, max_shard_tokens=200)
+
+    assert len(shards) > 1
+    assert sorted(pack.name for shard in shards for pack in shard) == sorted(pack.name for pack in CATALOG)
+    for shard in shards:
+        assert estimate_tokens(render_catalog(shard)) < 300
+
+
+def test_shard_packs_sends_each_pack_once():
+    catalog = generate_catalog(300)
+    shards = shard_packs(catalog, max_shard_tokens=500)
+
+    assert sum(len(shard) for shard in shards) == len(catalog)
+
+
+def test_shard_packs_counts_every_category_of_a_pack():
+    catalog = generate_catalog(300)
+    assert any(len(pack.categories) > 1 for pack in catalog)
+
+    for shard in shard_packs(catalog, max_shard_tokens=500):
+        assert len(shard) == 1 or estimate_tokens(render_catalog(shard)) <= 500
+
+
+@pytest.mark.asyncio
+@patch("autopack.selection.resolve_pack_names", side_effect=lambda names, config: names)
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+async def test_aselect_packs(_mock_pack_info, _mock_resolve):
+    in_flight = 0
+    max_in_flight = 0
+    prompts = []
+
+    async def mock_allm(prompt: str) -> str:
+        nonlocal in_flight, max_in_flight
+        prompts.append(prompt)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return ", ".join(name for name in ["web_search", "read_file"] if f"- {name}(" in prompt) or "web_search"
+
+    selected = await aselect_packs("Find things", mock_allm, max_shard_tokens=200, max_concurrency=2)
+
+    assert len(prompts) == len(shard_packs(CATALOG, 200))
+    assert max_in_flight == 2
+    assert selected == ["web_search", "read_file"]
+
+
+@pytest.mark.asyncio
+@patch("autopack.selection.resolve_pack_names", side_effect=lambda names, config: names)
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+async def test_aselect_packs_reduce(_mock_pack_info, _mock_resolve):
+    prompts = []
+
+    async def mock_allm(prompt: str) -> str:
+        prompts.append(prompt)
+        if "- read_file(" in prompt and "- web_search(" in prompt:
+            return "read_file"
+        return "web_search, read_file"
+
+    selected = await aselect_packs("Find things", mock_allm, max_shard_tokens=200, reduce=True)
+
+    assert selected == ["read_file"]
+    assert prompts[-1].count("\n- ") == 2
+
+
+@patch("autopack.selection.resolve_pack_names", side_effect=lambda names, config: names)
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+def test_select_packs_cache(_mock_pack_info, _mock_resolve):
+    calls = []
+
+    def mock_llm(prompt: str) -> str:
+        calls.append(prompt)
+        return "current_weather"
+
+    cache = SelectionCache(persist=True)
+    assert select_packs("What's the weather?", mock_llm, cache=cache) == ["current_weather"]
+    assert select_packs("  what's the   WEATHER? ", mock_llm, cache=cache) == ["current_weather"]
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Persisted entries are shared with new caches
+    assert select_packs("What's the weather?", mock_llm, cache=SelectionCache(persist=True)) == ["current_weather"]
+    assert len(calls) == 1
+
+    # Hierarchical selections are cached separately
+    select_packs("What's the weather?", mock_llm, cache=cache, hierarchical=True)
+    assert len(calls) == 3
+
+    # Changing the catalog invalidates the entry
+    with patch("autopack.selection.get_all_pack_info", return_value=CATALOG[:-1]):
+        select_packs("What's the weather?", mock_llm, cache=cache)
+    assert len(calls) == 4
+
+
+@patch("autopack.selection.resolve_pack_names", side_effect=lambda names, config: names)
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+def test_select_packs_hierarchical(_mock_pack_info, _mock_resolve):
+    prompts = []
+
+    def mock_llm(prompt: str) -> str:
+        prompts.append(prompt)
+        if "categories" in prompt:
+            return "system, Files"
+        return "disk_usage, write_file"
+
+    selected = select_packs("Save my free disk space to a file", mock_llm, hierarchical=True)
+
+    assert selected == ["disk_usage", "write_file"]
+    assert "- System (4 functions, e.g. cpu_usage, disk_usage, list_processes, os_name_and_version)" in prompts[0]
+    assert "## System" in prompts[1]
+    assert "## Files" in prompts[1]
+    assert "## Web" not in prompts[1]
+
+
+@pytest.mark.asyncio
+@patch("autopack.selection.resolve_pack_names", side_effect=lambda names, config: names)
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+async def test_aselect_packs_hierarchical(_mock_pack_info, _mock_resolve):
+    prompts = []
+
+    async def mock_allm(prompt: str) -> str:
+        prompts.append(prompt)
+        if "categories" in prompt:
+            return "Weather, Finance, Not a category"
+        return "current_weather" if "## Weather" in prompt else "stock_price"
+
+    selected = await aselect_packs("Weather and stocks", mock_allm, hierarchical=True)
+
+    assert selected == ["current_weather", "stock_price"]
+    assert len(prompts) == 3
+
+
+@pytest.mark.asyncio
+@patch("autopack.selection.resolve_pack_names", side_effect=lambda names, config: names)
+@patch("autopack.selection.get_all_pack_info", return_value=CATALOG)
+async def test_aselect_packs_hierarchical_sends_each_pack_once(_mock_pack_info, _mock_resolve):
+    categories = list(dict.fromkeys(category for pack in CATALOG for category in pack.categories))
+
+    async def mock_allm(prompt: str) -> str:
+        return ", ".join(categories) if "categories" in prompt else ""
+
+    with patch("autopack.selection.shard_packs", side_effect=shard_packs) as mock_shard_packs:
+        await aselect_packs("Anything", mock_allm, hierarchical=True)
+
+    sharded = [pack.name for call in mock_shard_packs.call_args_list for pack in call.args[0]]
+    assert sorted(sharded) == sorted(pack.name for pack in CATALOG)
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from autopack.pack_config import InstallerStyle, PackConfig
+from autopack.selection_stream import (
+    SelectionStreamParser,
+    astream_selection_response,
+    stream_select_packs,
+    stream_selection_response,
+)
+from autopack.utils import write_metadata_file
+from tests.data.packs.noop import NoopPack
+from tests.data.packs.summarization_pack import SummarizationPack
+
+
+@pytest.fixture(autouse=True)
+def installed_packs():
+    def metadata(name: str, module: str, class_name: str) -> dict:
+        return {
+            "pack_id": f"autopack/tests/{name}",
+            "package_path": module,
+            "class_name": class_name,
+            "repo_url": "https://github.com/AutoPackAI/tests.git",
+            "name": name,
+            "description": "A test pack",
+        }
+
+    write_metadata_file(
+        {
+            "autopack/tests/noop_pack": metadata("noop_pack", "tests.data.packs.noop", "NoopPack"),
+            "autopack/tests/text_summarization": metadata(
+                "text_summarization", "tests.data.packs.summarization_pack", "SummarizationPack"
+            ),
+        }
+    )
+
+
+def test_parser():
+    parser = SelectionStreamParser()
+    tokens = ["noop", "_pack, text_sum", "marization(text", ")\nnoop_pack", ",", " other"]
+
+    pack_names = [pack_name for token in tokens for pack_name in parser.feed(token)]
+
+    assert pack_names == ["noop_pack", "text_summarization"]
+    assert parser.close() == ["other"]
+
+
+def test_stream_selection_response():
+    def tokens():
+        yield "text_summar"
+        yield "ization, not_installed, "
+        yield "noop_pack"
+
+    packs = list(stream_selection_response(tokens(), config=PackConfig(installer_style=InstallerStyle.manual)))
+
+    assert packs == [SummarizationPack, NoopPack]
+
+
+def test_stream_selection_response_installs_missing_packs():
+    config = PackConfig(installer_style=InstallerStyle.automatic)
+    with patch("autopack.selection_stream.get_all_pack_info") as mock_pack_info, patch(
+        "autopack.selection_stream.install_pack", return_value=NoopPack
+    ) as mock_install:
+        mock_pack_info.return_value = [
+            type("Response", (), {"name": "remote_pack", "pack_id": "autopack/remote/remote_pack"})
+        ]
+
+        assert list(stream_selection_response(["remote_pack"], config=config)) == [NoopPack]
+
+    mock_install.assert_called_once_with("autopack/remote/remote_pack", config=config)
+
+
+@pytest.mark.asyncio
+async def test_astream_selection_response():
+    async def tokens():
+        for token in ["noop_pack,", " text_summarization"]:
+            await asyncio.sleep(0)
+            yield token
+
+    packs = [pack async for pack in astream_selection_response(tokens())]
+
+    assert packs == [NoopPack, SummarizationPack]
+
+
+@patch("autopack.selection_stream.get_selection_pool", return_value=[NoopPack])
+def test_stream_select_packs(_mock_pool):
+    prompts = []
+
+    def stream_llm(prompt: str):
+        prompts.append(prompt)
+        yield from ["noop", "_pack"]
+
+    assert list(stream_select_packs("Do nothing", stream_llm)) == [NoopPack]
+    assert "noop_pack" in prompts[0]
@@ -0,0 +1,119 @@
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from autopack.errors import AutoPackNotFoundError
+from autopack.remote import AutoPackRemoteError, PackServerClient
+from autopack.server import PackServer
+from autopack.utils import format_packs_to_openai_functions, write_server_token
+from tests.data.packs.add_pack import AddPack
+from tests.data.packs.noop import NoopPack
+from tests.data.packs.sync_only_pack import SyncOnlyPack
+
+
+class FailingPack(NoopPack):
+    name = "failing_pack"
+
+    def _run(self, query: str):
+        raise ValueError(query)
+
+
+@pytest.fixture
+def server():
+    packs = {
+        "tests/noop": NoopPack,
+        "tests/add": AddPack,
+        "tests/sync_only": SyncOnlyPack,
+        "tests/failing": FailingPack,
+    }
+    server = PackServer(packs=packs, port=0).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(server):
+    return PackServerClient(server.url, timeout=10, token=server.token)
+
+
+def post_status(server: PackServer, headers: dict[str, str]) -> int:
+    request = Request(f"{server.url}/run", data=b'{"pack_id": "tests/add", "args": {}}', method="POST", headers=headers)
+    try:
+        with urlopen(request, timeout=10) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+def test_list_and_describe(client):
+    assert [info["name"] for info in client.list_packs()] == ["noop_pack", "add", "sync_only", "failing_pack"]
+
+    info = client.describe("tests/noop")
+    assert info["description"] == "Does nothing"
+    assert info["args_schema"]["required"] == ["query"]
+
+    with pytest.raises(AutoPackNotFoundError):
+        client.describe("tests/missing")
+
+
+def test_run(client):
+    assert client.run("tests/add", {"a": 1, "b": 2}) == "3"
+    assert client.run("tests/add", {}).startswith("Error: Invalid arguments")
+
+
+def test_run_errors(client):
+    with pytest.raises(AutoPackRemoteError, match="ValueError: boom"):
+        client.run("tests/failing", {"query": "boom"})
+    with pytest.raises(AutoPackNotFoundError):
+        client.run("tests/missing", {})
+
+
+@pytest.mark.asyncio
+async def test_arun(client):
+    assert (await client.arun("tests/sync_only", {"text": "hi"})).startswith("hi from ")
+
+
+def test_remote_pack(client):
+    remote_add = client.get_pack("tests/add")
+
+    assert remote_add.name == "add"
+    assert remote_add().run(a=2, b=5) == "7"
+    assert remote_add().run(b=5).startswith("Error: Invalid arguments")
+    assert remote_add().args == AddPack().args
+
+
+@pytest.mark.asyncio
+async def test_remote_pack_async(client):
+    remote_noop = client.get_pack("tests/noop")
+
+    assert await remote_noop().arun(query="hi") == "noop: hi"
+
+
+def test_remote_packs_format_like_local_packs(client):
+    remote_packs = [pack for pack in client.get_all_packs() if pack.name in ("noop_pack", "add")]
+
+    assert format_packs_to_openai_functions(remote_packs) == format_packs_to_openai_functions([NoopPack, AddPack])
+
+
+def test_connection_error():
+    with pytest.raises(AutoPackRemoteError, match="Could not connect"):
+        PackServerClient("http://127.0.0.1:1", timeout=1).list_packs()
+
+
+def test_requests_need_the_token(server):
+    with pytest.raises(AutoPackRemoteError, match="token"):
+        PackServerClient(server.url, timeout=10, token="wrong").list_packs()
+
+    write_server_token(server.token)
+    assert PackServerClient(server.url, timeout=10).run("tests/add", {"a": 1, "b": 2}) == "3"
+
+
+def test_browser_requests_are_rejected(server):
+    authorization = f"Bearer {server.token}"
+
+    assert post_status(server, {"Content-Type": "application/json", "Authorization": authorization}) == 200
+    assert post_status(server, {"Content-Type": "text/plain"}) == 401
+    assert post_status(server, {"Content-Type": "text/plain", "Authorization": authorization}) == 415
+    headers = {"Content-Type": "application/json", "Authorization": authorization, "Host": "attacker.example:8765"}
+    assert post_status(server, headers) == 403
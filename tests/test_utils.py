@@ -0,0 +1,79 @@
+import gc
+import json
+import weakref
+
+from pydantic import create_model
+
+from autopack.utils import (
+    compile_args_validator,
+    format_pack_to_openai_function,
+    format_packs_to_openai_functions,
+    openai_functions_json,
+    run_args_from_args_schema,
+)
+from tests.data.packs.add_pack import AddPack
+from tests.data.packs.no_args_pack import NoArgsPack
+from tests.data.packs.noop import NoopPack
+
+ADD_FUNCTION = {
+    "name": "add",
+    "description": "Adds two numbers",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "a": {"type": "integer", "name": "a", "description": "The first number"},
+            "b": {"type": "integer", "name": "b", "description": "The second number"},
+        },
+    },
+    "required": ["a"],
+}
+
+
+def test_format_pack_to_openai_function():
+    assert format_pack_to_openai_function(AddPack()) == ADD_FUNCTION
+    assert format_pack_to_openai_function(AddPack) == ADD_FUNCTION
+
+
+def test_format_pack_to_openai_function_returns_copies():
+    format_pack_to_openai_function(AddPack)["parameters"]["properties"].pop("a")
+    AddPack().args.pop("a")
+
+    assert format_pack_to_openai_function(AddPack) == ADD_FUNCTION
+    assert AddPack().args["a"]["required"]
+
+
+def test_openai_functions_json():
+    packs = [AddPack(), NoArgsPack, NoopPack()]
+
+    serialized = openai_functions_json(packs)
+
+    assert json.loads(serialized) == format_packs_to_openai_functions(packs)
+    assert openai_functions_json([AddPack, NoArgsPack, NoopPack]) == serialized
+
+
+def test_run_args_from_args_schema():
+    assert run_args_from_args_schema(None) == {}
+    assert run_args_from_args_schema(AddPack.args_schema)["b"] == {
+        "type": "integer",
+        "name": "b",
+        "description": "The second number",
+        "required": False,
+    }
+
+
+def test_runtime_pack_classes_are_not_kept_alive():
+    args_schema = create_model("RuntimeArgs", query=(str, ...))
+    pack_class = type(
+        "RuntimePack", (NoopPack,), {"__module__": __name__, "name": "runtime", "args_schema": args_schema}
+    )
+    subclass = type("RuntimeSubPack", (pack_class,), {"__module__": __name__, "name": "runtime_sub"})
+
+    format_pack_to_openai_function(pack_class)
+    assert format_pack_to_openai_function(subclass)["name"] == "runtime_sub"
+    assert json.loads(openai_functions_json([pack_class, NoopPack]))[0]["name"] == "runtime"
+    compile_args_validator(args_schema)({"query": "x"})
+
+    schema_ref, class_ref = weakref.ref(args_schema), weakref.ref(pack_class)
+    del args_schema, pack_class, subclass
+    gc.collect()
+    assert schema_ref() is None and class_ref() is None